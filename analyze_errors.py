@@ -4,10 +4,12 @@ Find which definitions are being missed and why
 """
 
 from src.note_processor.unified_processor import UnifiedProcessor
+from src.note_processor.result_cache import ResultCache
 import json
 
 def analyze_errors():
     processor = UnifiedProcessor()
+    cache = ResultCache()  # unchanged notes are not re-extracted
     
     # Focus on worst performing notes
     problem_notes = [
@@ -34,7 +36,7 @@ def analyze_errors():
             annotation = json.load(f)
         
         # Extract definitions
-        result = processor.structure_note(text)
+        result = cache.structure_note(processor, text)
         
         gt_terms = {d['term'].lower(): d['definition'] for d in annotation['ground_truth']['definitions']}
         ex_terms = {d['term'].lower(): d for d in result['definitions']}
@@ -7,7 +7,7 @@ import json
 from collections import Counter
 
 def analyze_patterns():
-    processor = UnifiedProcessor()
+    processor = UnifiedProcessor(profile=True)
     
     all_notes = []
     for domain in ['bio', 'hist', 'math', 'lit']:
@@ -74,6 +74,12 @@ def analyze_patterns():
             f.write(f"{pattern},{count},{pct:.1f}\n")
     
     print("\n✅ Saved to results/pattern_usage.csv")
+    
+    # What each pattern costs, and how much of its output survives
+    print("\n" + "=" * 70)
+    print("PATTERN COST (time, raw matches, rejections, duplicates):")
+    print("=" * 70)
+    print(processor.profile.report())
 
 if __name__ == "__main__":
     analyze_patterns()
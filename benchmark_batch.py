@@ -0,0 +1,54 @@
+"""
+Benchmark: UnifiedProcessor.structure_notes scaling with worker count
+
+Usage:
+    python benchmark_batch.py [--notes 20000] [--chunksize 64]
+"""
+
+import argparse
+import glob
+import os
+import time
+
+from src.note_processor.unified_processor import UnifiedProcessor
+
+
+def semester_of_notes(count):
+    """Cycle the research dataset into `count` (note_id, text) pairs."""
+    texts = []
+    for path in sorted(glob.glob('data/research_dataset/notes/*.txt')):
+        with open(path, 'r') as f:
+            texts.append(f.read())
+    for i in range(count):
+        yield f'note_{i:06d}', texts[i % len(texts)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="structure_notes scaling benchmark")
+    parser.add_argument('--notes', type=int, default=20000)
+    parser.add_argument('--chunksize', type=int, default=64)
+    args = parser.parse_args()
+
+    processor = UnifiedProcessor()
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+
+    print("=" * 70)
+    print(f"BATCH SCALING: {args.notes} notes, {cores} cores available")
+    print("=" * 70)
+
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        count = sum(1 for _ in processor.structure_notes(
+            semester_of_notes(args.notes), workers=workers, chunksize=args.chunksize))
+        elapsed = time.perf_counter() - start
+        rate = count / elapsed
+        baseline = baseline or rate
+        print(f"  {workers:>2} workers: {rate:>8.0f} notes/s  (speedup {rate / baseline:.2f}x)")
+
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
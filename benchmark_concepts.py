@@ -0,0 +1,53 @@
+"""
+Benchmark: three-pass vs single-scan concept extraction
+Times the original extract_concepts (sentence phrases, capitalized words
+and lowercase words in three passes, then a full sort) against
+NoteProcessor.extract_concepts on the research dataset joined into notes
+of doubling length, and checks both rank the same concepts.
+
+Usage:
+    python benchmark_concepts.py [--max-words 80000] [--repeat 7]
+"""
+
+import argparse
+import time
+
+from src.note_processor.final_processor import NoteProcessor
+from test_concept_extraction import long_note, three_pass_concepts
+
+
+def best_time(func, text, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--max-words', type=int, default=80000)
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args()
+
+    processor = NoteProcessor()
+
+    print("=" * 70)
+    print("CONCEPT EXTRACTION BENCHMARK: three-pass vs single-scan")
+    print("=" * 70)
+
+    text = long_note(5000)
+    while len(text.split()) <= args.max_words:
+        assert processor.extract_concepts(text) == three_pass_concepts(processor, text)
+        three = best_time(lambda t: three_pass_concepts(processor, t), text, args.repeat)
+        single = best_time(processor.extract_concepts, text, args.repeat)
+        print(f"  {len(text.split()):>7} words: three passes {three * 1000:>8.1f} ms, "
+              f"single scan {single * 1000:>8.1f} ms ({three / single:.2f}x)")
+        text += '\n\n' + text
+
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
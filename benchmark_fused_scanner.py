@@ -0,0 +1,97 @@
+"""
+Benchmark: classic (prefiltered re.findall per pattern) vs fused definition engine
+Runs on the 40-note research dataset and on a synthetic corpus built from
+shuffled dataset lines (default 100 MB).
+
+Usage:
+    python benchmark_fused_scanner.py [--synthetic-mb 100] [--repeat 50]
+"""
+
+import argparse
+import glob
+import random
+import time
+
+from src.note_processor.unified_processor import UnifiedProcessor
+
+
+def load_dataset():
+    notes = []
+    for path in sorted(glob.glob('data/research_dataset/notes/*.txt')):
+        with open(path, 'r') as f:
+            notes.append(f.read())
+    return notes
+
+
+def synthetic_notes(notes, total_mb, seed=42):
+    """Yield ~2 KB notes made of shuffled dataset lines until total_mb is reached."""
+    rnd = random.Random(seed)
+    lines = [line for note in notes for line in note.split('\n')]
+    target = int(total_mb * 1024 * 1024)
+    produced = 0
+    while produced < target:
+        note = '\n'.join(rnd.choice(lines) for _ in range(40))
+        produced += len(note)
+        yield note
+
+
+def run(engine, notes, scan_only=False):
+    """Time extract_definitions, or just the pattern matching with scan_only."""
+    processor = UnifiedProcessor(engine=engine)
+    count = 0
+    size = 0
+    found = 0
+    start = time.perf_counter()
+    for text in notes:
+        if scan_only:
+            found += sum(len(matches) for _, matches in processor._scan(text))
+        else:
+            found += len(processor.extract_definitions(text))
+        count += 1
+        size += len(text)
+    elapsed = time.perf_counter() - start
+    return elapsed, count, size, found
+
+
+def report(label, engine, result):
+    elapsed, count, size, found = result
+    print(f"  {label:<10} {engine:<8} {elapsed:>8.3f}s  "
+          f"{count / elapsed:>9.0f} notes/s  {size / elapsed / 1e6:>6.2f} MB/s  "
+          f"({found} found)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--synthetic-mb', type=float, default=100)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    notes = load_dataset()
+
+    print("=" * 70)
+    print("DEFINITION ENGINE BENCHMARK: classic vs fused")
+    print("=" * 70)
+
+    corpora = [
+        ('dataset', f"Research dataset ({len(notes)} notes x {args.repeat})",
+         lambda: notes * args.repeat),
+        ('synthetic', f"Synthetic corpus ({args.synthetic_mb:g} MB)",
+         lambda: synthetic_notes(notes, args.synthetic_mb)),
+    ]
+
+    for label, title, corpus in corpora:
+        for scan_only in (True, False):
+            stage = 'pattern matching only' if scan_only else 'full extract_definitions'
+            print(f"\n{title} - {stage}:")
+            timings = {}
+            for engine in ('classic', 'fused'):
+                timings[engine] = run(engine, corpus(), scan_only)
+                report(label, engine, timings[engine])
+            assert timings['classic'][3] == timings['fused'][3]
+            print(f"  Speedup: {timings['classic'][0] / timings['fused'][0]:.2f}x")
+
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark: every pattern vs the trigger prefilter on the classic engine
+Times re.findall of every definition pattern against the prefiltered
+UnifiedProcessor._scan on the short note of test_prefilter and on the
+40-note research dataset, and checks both find the same matches.
+
+Usage:
+    python benchmark_prefilter.py [--repeat 2000]
+"""
+
+import argparse
+import time
+
+from src.note_processor.unified_processor import UnifiedProcessor
+from test_prefilter import SHORT_NOTE, load_notes
+
+
+def run(scan, notes, repeat):
+    found = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in notes:
+            found += sum(len(matches) for _, matches in scan(text))
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeat * len(notes)), found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    processor = UnifiedProcessor(engine='classic')
+
+    def unfiltered(text):
+        return [(entry, entry.regex.findall(text)) for entry in processor.patterns]
+
+    print("=" * 70)
+    print("TRIGGER PREFILTER BENCHMARK: every pattern vs prefiltered")
+    print("=" * 70)
+
+    notes = load_notes()
+    corpora = [
+        ('short note', [SHORT_NOTE], args.repeat),
+        (f"dataset ({len(notes)} notes)", notes, max(1, args.repeat // 100)),
+    ]
+
+    for title, corpus, repeat in corpora:
+        full, full_found = run(unfiltered, corpus, repeat)
+        filtered, filtered_found = run(processor._scan, corpus, repeat)
+        assert full_found == filtered_found
+        print(f"  {title:<20} {full * 1e6:>8.1f} us -> {filtered * 1e6:>8.1f} us per note "
+              f"({full / filtered:.2f}x)")
+
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
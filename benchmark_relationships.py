@@ -0,0 +1,97 @@
+"""
+Benchmark: three-pass vs single-pass relationship extraction
+Times the original extractor (one text.split, lowercase and uncompiled
+re.search per relationship family) against RelationshipExtractor on the
+40-note research dataset and on a synthetic corpus of shuffled dataset
+lines with relationship sentences mixed in, and checks both give the
+same relationships.
+
+Usage:
+    python benchmark_relationships.py [--synthetic-mb 2] [--repeat 5]
+"""
+
+import argparse
+import random
+import time
+
+from src.note_processor.relationship_extractor import RelationshipExtractor
+from src.note_processor.segmentation import SegmentedDocument
+from test_relationship_pass import RELATED, TEMPLATES, dataset_cases, three_pass_relationships
+
+
+def synthetic_cases(cases, total_mb, seed=42):
+    """~2 KB notes of shuffled dataset and relationship lines, with definitions."""
+    rnd = random.Random(seed)
+    lines = [line for text, _ in cases for line in text.split('\n')]
+    lines += [template.format(*rnd.sample(RELATED, 2)) for template in TEMPLATES for _ in range(20)]
+    terms = [d for _, definitions in cases for d in definitions]
+    target = int(total_mb * 1024 * 1024)
+    produced = 0
+    synthetic = []
+    while produced < target:
+        text = '\n'.join(rnd.choice(lines) for _ in range(40))
+        definitions = rnd.sample(terms, 10) + [{'term': t} for t in rnd.sample(RELATED, 4)]
+        produced += len(text)
+        synthetic.append((text, definitions))
+    return synthetic
+
+
+def run(extract, cases):
+    count = 0
+    size = 0
+    found = []
+    start = time.perf_counter()
+    for text, definitions in cases:
+        found.append(extract(text, definitions))
+        count += 1
+        size += len(text)
+    elapsed = time.perf_counter() - start
+    return elapsed, count, size, found
+
+
+def report(label, engine, result):
+    elapsed, count, size, found = result
+    print(f"  {label:<10} {engine:<12} {elapsed:>8.3f}s  "
+          f"{count / elapsed:>9.0f} notes/s  {size / elapsed / 1e6:>6.2f} MB/s  "
+          f"({sum(len(r) for r in found)} found)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--synthetic-mb', type=float, default=2)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    cases = dataset_cases()
+    extractor = RelationshipExtractor()
+
+    print("=" * 70)
+    print("RELATIONSHIP BENCHMARK: three-pass vs single-pass")
+    print("=" * 70)
+
+    corpora = [
+        ('dataset', f"Research dataset ({len(cases)} notes x {args.repeat})",
+         cases * args.repeat),
+        ('synthetic', f"Synthetic corpus ({args.synthetic_mb:g} MB)",
+         synthetic_cases(cases, args.synthetic_mb)),
+    ]
+
+    for label, title, corpus in corpora:
+        print(f"\n{title}:")
+        timings = {
+            'three-pass': run(three_pass_relationships, corpus),
+            'single-pass': run(extractor.extract_relationships, corpus),
+        }
+        # Documents built up front, as a caller running several extractors would
+        documents = [(SegmentedDocument(text), definitions) for text, definitions in corpus]
+        timings['segmented'] = run(extractor.extract_relationships, documents)
+        for engine, result in timings.items():
+            report(label, engine, result)
+            assert result[3] == timings['three-pass'][3]
+        print(f"  Speedup: {timings['three-pass'][0] / timings['single-pass'][0]:.2f}x")
+
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
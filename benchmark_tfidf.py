@@ -0,0 +1,84 @@
+"""
+Benchmark: ConceptIndex.rank cost as the vocabulary grows
+Fills concept indexes with synthetic notes of made-up words until they
+hold 1k -> 1M distinct terms, then times ranking each of the 40 research
+dataset notes against them. Ranking only looks up the note's own terms,
+so the time per note should stay flat as the vocabulary grows.
+
+Usage:
+    python benchmark_tfidf.py [--max-terms 1000000] [--repeat 5]
+"""
+
+import argparse
+import glob
+import string
+import time
+
+from src.note_processor.tfidf import ConceptIndex
+
+WORDS_PER_NOTE = 1000
+
+
+def load_dataset():
+    notes = []
+    for path in sorted(glob.glob('data/research_dataset/notes/*.txt')):
+        with open(path, 'r') as f:
+            notes.append(f.read())
+    return notes
+
+
+def made_up_word(i):
+    """Distinct lowercase concept word: conceptaaaa, conceptaaab, ..."""
+    letters = ''
+    for _ in range(5):
+        i, r = divmod(i, 26)
+        letters = string.ascii_lowercase[r] + letters
+    return 'concept' + letters
+
+
+def grow(index, terms):
+    """Add synthetic notes of new words until the index has terms columns."""
+    while len(index.terms) < terms:
+        first = len(index.terms)
+        words = [made_up_word(i) for i in range(first, min(first + WORDS_PER_NOTE, terms))]
+        index.add(f"synthetic_{len(index)}", ' '.join(words))
+
+
+def best_rank_time(index, texts, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            index.rank(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--max-terms', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    texts = load_dataset()
+    index = ConceptIndex()
+
+    print("=" * 70)
+    print("TF-IDF RANK BENCHMARK: rank time per note vs vocabulary size")
+    print("=" * 70)
+
+    baseline = None
+    terms = 1000
+    while terms <= args.max_terms:
+        grow(index, terms)
+        elapsed = best_rank_time(index, texts, args.repeat)
+        baseline = baseline or elapsed
+        print(f"  {len(index.terms):>8} terms, {len(index):>5} notes: "
+              f"{elapsed * 1e6:>8.0f} us per rank ({elapsed / baseline:.2f}x)")
+        terms *= 10
+
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark: worst-case inputs for the definition and relationship patterns
+Times every extractor on the adversarial corpus of test_adversarial_inputs
+(OCR dumps without periods, long capitalized runs, anchors with no
+definition end) at doubling sizes, and prints the growth exponent between
+the two largest sizes: 1.0 is linear, 2.0 quadratic.
+
+Usage:
+    python benchmark_worst_case.py [--max-words 64000] [--time-budget 0.5]
+"""
+
+import argparse
+import math
+import time
+
+from src.note_processor.unified_processor import UnifiedProcessor
+from test_adversarial_inputs import ADVERSARIAL_INPUTS, extractors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--max-words', type=int, default=64000)
+    parser.add_argument('--time-budget', type=float, default=0.5)
+    args = parser.parse_args()
+
+    sizes = []
+    n = 2000
+    while n <= args.max_words:
+        sizes.append(n)
+        n *= 2
+
+    print("=" * 70)
+    print(f"WORST-CASE BENCHMARK ({', '.join(str(s) for s in sizes)} words)")
+    print("=" * 70)
+
+    for name, make in ADVERSARIAL_INPUTS.items():
+        print(f"\n{name}")
+        texts = [make(size) for size in sizes]
+        for label, func in extractors().items():
+            timings = []
+            for text in texts:
+                start = time.perf_counter()
+                func(text)
+                timings.append(time.perf_counter() - start)
+            exponent = float('nan')
+            if len(timings) > 1:
+                exponent = math.log2(max(timings[-1], 1e-6) / max(timings[-2], 1e-6))
+            cells = ' '.join(f"{t * 1000:>8.1f}" for t in timings)
+            print(f"  {label:<14} {cells} ms   growth ~n^{exponent:.2f}")
+
+    print(f"\nPer-note time budget of {args.time_budget}s on the largest inputs:")
+    processor = UnifiedProcessor(time_budget=args.time_budget)
+    for name, make in ADVERSARIAL_INPUTS.items():
+        result = processor.structure_note(make(sizes[-1]))
+        aborted = result['aborted']
+        if aborted:
+            print(f"  {name:<22} aborted in {aborted['pattern']} after {aborted['elapsed']:.2f}s, "
+                  f"{len(aborted['skipped'])} patterns skipped")
+        else:
+            print(f"  {name:<22} finished ({len(result['definitions'])} definitions)")
+
+
+if __name__ == "__main__":
+    main()
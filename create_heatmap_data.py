@@ -3,10 +3,12 @@ Create heatmap data showing performance across all notes
 """
 
 from src.note_processor.unified_processor import UnifiedProcessor
+from src.note_processor.result_cache import ResultCache
 import json
 
 def create_heatmap():
     processor = UnifiedProcessor()
+    cache = ResultCache()  # unchanged notes are not re-extracted
     
     domains = {
         'Biology': ['bio_001', 'bio_002', 'bio_003', 'bio_004', 'bio_005',
@@ -43,7 +45,7 @@ def create_heatmap():
                 with open(f'data/research_dataset/annotations/{note_id}.json', 'r') as f:
                     annotation = json.load(f)
                 
-                extracted = processor.structure_note(text)
+                extracted = cache.structure_note(processor, text)
                 
                 gt = [d['term'].lower() for d in annotation['ground_truth']['definitions']]
                 ex = [d['term'].lower() for d in extracted['definitions']]
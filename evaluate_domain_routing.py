@@ -0,0 +1,57 @@
+"""
+Evaluation: domain-aware pattern routing
+Definition F1 per domain and throughput with every pattern, with the
+domain taken from the note id prefix, and with the domain classifier.
+Throughput is measured on the notes as they are and on lecture-length
+notes (each note repeated --scale times). Exits non-zero when routing
+costs more F1 than --tolerance.
+
+Usage:
+    python evaluate_domain_routing.py [--tolerance 0.01] [--scale 10]
+"""
+
+import argparse
+import sys
+
+from src.note_processor.domain_routing import evaluate_routing, load_dataset
+
+MODES = ('all_patterns', 'prefix_domain', 'classified')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--tolerance', type=float, default=0.01)
+    parser.add_argument('--scale', type=int, default=10)
+    parser.add_argument('--rounds', type=int, default=10)
+    args = parser.parse_args()
+
+    notes = load_dataset()
+    report = evaluate_routing(notes, rounds=args.rounds, tolerance=args.tolerance)
+    long_notes = evaluate_routing(notes, rounds=max(1, args.rounds // 2), scale=args.scale,
+                                  tolerance=args.tolerance)
+
+    print("=" * 70)
+    print(f"DOMAIN ROUTING EVALUATION ({len(notes)} notes)")
+    print("=" * 70)
+
+    domains = [key for key in report['f1']['all_patterns'] if key != 'overall'] + ['overall']
+    print(f"\n{'Definition F1':<16}" + ''.join(f"{mode:>15}" for mode in MODES))
+    for domain in domains:
+        print(f"{domain:<16}" + ''.join(f"{report['f1'][mode][domain]:>15.1%}" for mode in MODES))
+
+    print(f"\n{'Notes/second':<16}" + ''.join(f"{mode:>15}" for mode in MODES))
+    for label, r in (('as written', report), (f"x{args.scale} length", long_notes)):
+        print(f"{label:<16}" + ''.join(
+            f"{r['notes_per_second'][mode]:>8.0f} ({r['speedup'][mode]:.2f}x)" for mode in MODES))
+
+    print(f"\nClassifier accuracy: {report['classifier_accuracy']:.1%}")
+    if report['within_tolerance']:
+        print(f"✅ F1 within {args.tolerance:.1%} of all patterns")
+    else:
+        print(f"❌ F1 dropped by more than {args.tolerance:.1%}")
+    print("=" * 70)
+    return 0 if report['within_tolerance'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,10 +9,16 @@ This is our FIRST working prototype!
 """
 
 import re
-from typing import List, Dict, Set
+from typing import List, Dict, Set, Union
 from collections import Counter
 import os
 
+from src.note_processor.keyword_matcher import NoteTypeClassifier
+from src.note_processor.records import compact
+from src.note_processor.reports import markdown_lines
+from src.note_processor.segmentation import SegmentedDocument, as_document
+from src.note_processor.source_text import StructuredNote, read_source, text_digest
+
 
 class BasicNoteProcessor:
     """
@@ -23,9 +29,31 @@ class BasicNoteProcessor:
     2. Identify definitions
     3. Detect examples
     4. Structure output
+    
+    compact=True returns definitions as slotted Definition records instead
+    of dicts. With a tfidf.ConceptIndex as concept_index, key concepts are
+    ranked against document frequencies over the indexed corpus. With a
+    trained note_classifier.LinearNoteClassifier as note_classifier, note
+    types come from the model instead of indicator phrases; a model whose
+    labels are not note types (a domain model, say) raises ValueError.
+    text_reference=True makes structure_note results given a source path
+    refer to the file instead of holding the note (source_text.StructuredNote).
     """
     
-    def __init__(self):
+    # Built once, shared by every instance
+    note_types = NoteTypeClassifier()
+    
+    def __init__(self, compact=False, concept_index=None, note_classifier=None,
+                 text_reference=False):
+        if note_classifier is not None:
+            unknown = set(note_classifier.labels) - self.note_types.note_types
+            if unknown:
+                raise ValueError(f"note_classifier predicts {sorted(unknown)}, "
+                                 f"expected note types {sorted(self.note_types.note_types)}")
+        self.compact = compact
+        self.text_reference = text_reference
+        self.concept_index = concept_index
+        self.note_classifier = note_classifier
         # Common words to ignore when identifying key concepts
         self.stop_words = {
             'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
@@ -38,19 +66,25 @@ class BasicNoteProcessor:
             'own', 'same', 'so', 'than', 'too', 'very', 's', 't', 'just', 'also'
         }
         
-    def extract_key_concepts(self, text: str, top_n: int = 10) -> List[str]:
+    def extract_key_concepts(self, text: Union[str, SegmentedDocument], top_n: int = 10) -> List[str]:
         """
         Extract key concepts from text using frequency analysis and pattern matching.
         
         Args:
-            text: Raw note text
+            text: Raw note text or a SegmentedDocument
             top_n: Number of top concepts to return
             
         Returns:
             List of key concepts
         """
+        if self.concept_index is not None:
+            return [concept.lower() for concept in self.concept_index.rank(text, top_n)]
+        
+        doc = as_document(text)
+        text = doc.text
+        
         # Convert to lowercase
-        text_lower = text.lower()
+        text_lower = doc.lower
         
         # Remove punctuation except hyphens (for compound terms)
         text_clean = re.sub(r'[^\w\s-]', ' ', text_lower)
@@ -79,7 +113,7 @@ class BasicNoteProcessor:
         
         return all_concepts[:top_n]
     
-    def extract_definitions(self, text: str) -> List[Dict[str, str]]:
+    def extract_definitions(self, text: Union[str, SegmentedDocument]) -> List[Dict[str, str]]:
         """
         Extract definitions from text using pattern matching.
         
@@ -91,6 +125,7 @@ class BasicNoteProcessor:
         Returns:
             List of dictionaries with 'term' and 'definition'
         """
+        text = as_document(text).text
         definitions = []
         
         # Pattern 1: "X is/means/refers to Y"
@@ -114,9 +149,11 @@ class BasicNoteProcessor:
                     'definition': definition.strip()
                 })
         
+        if self.compact:
+            return compact(definitions)
         return definitions
     
-    def extract_examples(self, text: str) -> List[str]:
+    def extract_examples(self, text: Union[str, SegmentedDocument]) -> List[str]:
         """
         Extract examples from text.
         
@@ -125,6 +162,7 @@ class BasicNoteProcessor:
         - "e.g."
         - "such as"
         """
+        text = as_document(text).text
         examples = []
         
         # Pattern: sentences containing example indicators
@@ -139,7 +177,7 @@ class BasicNoteProcessor:
         
         return examples
     
-    def identify_note_type(self, text: str) -> str:
+    def identify_note_type(self, text: Union[str, SegmentedDocument]) -> str:
         """
         Classify note type based on content.
         
@@ -149,43 +187,45 @@ class BasicNoteProcessor:
         - Factual: lists, data, facts
         - Analytical: comparisons, arguments
         """
-        text_lower = text.lower()
-        
-        # Count indicators
-        procedural_indicators = ['step', 'first', 'second', 'then', 'next', 'finally', 'how to']
-        conceptual_indicators = ['define', 'concept', 'theory', 'principle', 'means', 'refers to']
-        factual_indicators = ['fact', 'data', 'statistic', 'number', 'date', 'year']
-        analytical_indicators = ['compare', 'contrast', 'analyze', 'however', 'whereas', 'although']
-        
-        scores = {
-            'procedural': sum(1 for ind in procedural_indicators if ind in text_lower),
-            'conceptual': sum(1 for ind in conceptual_indicators if ind in text_lower),
-            'factual': sum(1 for ind in factual_indicators if ind in text_lower),
-            'analytical': sum(1 for ind in analytical_indicators if ind in text_lower)
-        }
-        
-        # Return type with highest score
-        note_type = max(scores, key=scores.get)
-        return note_type if scores[note_type] > 0 else 'general'
+        if self.note_classifier is not None:
+            return self.note_classifier.predict([text])[0]
+        return self.note_types.classify(text)
     
-    def structure_note(self, text: str) -> Dict:
+    def identify_note_types(self, texts) -> List[str]:
+        """
+        Classify many notes with one scan over their joined text, or
+        one matrix product with a note_classifier.
+        """
+        if self.note_classifier is not None:
+            return self.note_classifier.predict(texts)
+        return self.note_types.classify_many(texts)
+    
+    def structure_note(self, text: Union[str, SegmentedDocument, None],
+                       source: str = None) -> Dict:
         """
         Main function: Process raw note and return structured output.
         
         Args:
-            text: Raw note text
+            text: Raw note text or a SegmentedDocument (None: read source)
+            source: Path of the note file
             
         Returns:
-            Dictionary with structured note components
+            Dictionary with structured note components; with text_reference
+            and a source, a StructuredNote that reads original_text from it
         """
+        doc = as_document(read_source(source) if text is None else text)
         structured = {
-            'original_text': text,
-            'note_type': self.identify_note_type(text),
-            'key_concepts': self.extract_key_concepts(text),
-            'definitions': self.extract_definitions(text),
-            'examples': self.extract_examples(text),
-            'word_count': len(text.split())
+            'original_text': doc.text,
+            'note_type': self.identify_note_type(doc),
+            'key_concepts': self.extract_key_concepts(doc),
+            'definitions': self.extract_definitions(doc),
+            'examples': self.extract_examples(doc),
+            'word_count': len(doc.words)
         }
+        if self.text_reference and source is not None:
+            del structured['original_text']
+            structured = StructuredNote(structured, source=source,
+                                        source_sha256=text_digest(doc.text))
         
         return structured
     
@@ -193,29 +233,7 @@ class BasicNoteProcessor:
         """
         Format structured note into readable markdown.
         """
-        output = []
-        output.append(f"# Structured Note")
-        output.append(f"\n**Note Type**: {structured['note_type'].title()}")
-        output.append(f"**Word Count**: {structured['word_count']}")
-        
-        output.append(f"\n## Key Concepts")
-        for concept in structured['key_concepts']:
-            output.append(f"- {concept.title()}")
-        
-        if structured['definitions']:
-            output.append(f"\n## Definitions")
-            for defn in structured['definitions']:
-                output.append(f"- **{defn['term']}**: {defn['definition']}")
-        
-        if structured['examples']:
-            output.append(f"\n## Examples")
-            for example in structured['examples']:
-                output.append(f"- {example}")
-        
-        output.append(f"\n## Original Text")
-        output.append(f"{structured['original_text']}")
-        
-        return '\n'.join(output)
+        return '\n'.join(markdown_lines(structured))
 
 
 def main():
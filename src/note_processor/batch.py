@@ -0,0 +1,157 @@
+"""
+Batch Processing
+Fan notes out over a process pool.
+
+Each worker process builds its processor (and with it the compiled
+pattern tables) exactly once, in the pool initializer. Notes travel in
+chunks to amortize pickling and IPC. Only a bounded number of chunks is
+in flight at any time, so the input iterable can be a lazy generator
+over a whole semester of notes.
+
+When a PatternProfile is passed, workers profile their notes and send
+their statistics back with each chunk, to be merged into it.
+
+Processors built with compact=True return slotted records, which pickle
+more slowly than dicts one by one. Workers then send the chunk's
+definitions as one columnar RecordTable, and the records are rebuilt
+from it on arrival.
+
+With sources=True the note ids are the notes' file paths. Processors
+built with text_reference=True then get each id as the note's source,
+and return results that refer to the file instead of carrying the text
+back. Such notes may be sent as (path, None): the worker reads the file
+itself, so no note text is pickled either way. Without sources=True ids
+are only labels, and results hold their text.
+
+By default an exception raised for any one note ends the run. With
+return_exceptions=True it is yielded as that note's result instead, and
+the other notes carry on.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+
+from src.note_processor.profiling import PatternProfile
+from src.note_processor.records import RecordTable
+
+# Per-worker processor, created by _init_worker
+_worker_processor = None
+
+
+def _init_worker(processor_cls, processor_kwargs):
+    global _worker_processor
+    _worker_processor = processor_cls(**processor_kwargs)
+
+
+def _structure(processor, note_id, text, sources=False, return_exceptions=False):
+    try:
+        if sources and getattr(processor, 'text_reference', False):
+            return processor.structure_note(text, source=note_id)
+        return processor.structure_note(text)
+    except Exception as error:
+        if not return_exceptions:
+            raise
+        return error
+
+
+def _process_chunk(chunk, sources=False, return_exceptions=False):
+    results = [(note_id, _structure(_worker_processor, note_id, text, sources, return_exceptions))
+               for note_id, text in chunk]
+    profile = getattr(_worker_processor, 'profile', None)
+    if profile is not None:
+        # Ship this chunk's statistics and start afresh
+        _worker_processor.profile = PatternProfile()
+    table = None
+    if getattr(_worker_processor, 'compact', False):
+        structured = [result for _, result in results if not isinstance(result, Exception)]
+        table = RecordTable().extend(result['definitions'] for result in structured)
+        for result in structured:
+            result['definitions'] = None
+    return results, profile, table
+
+
+def _collect(future, profile):
+    results, chunk_profile, table = future.result()
+    if profile is not None and chunk_profile is not None:
+        profile.merge(chunk_profile)
+    if table is not None:
+        structured = [result for _, result in results if not isinstance(result, Exception)]
+        for result, definitions in zip(structured, table):
+            result['definitions'] = definitions
+    return results
+
+
+def _chunks(notes, chunksize):
+    notes = iter(notes)
+    while True:
+        chunk = list(islice(notes, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def structure_notes(processor_cls, notes, processor_kwargs=None, workers=None,
+                    chunksize=16, ordered=True, profile=None, sources=False,
+                    return_exceptions=False):
+    """
+    Run processor_cls(**processor_kwargs).structure_note over many notes.
+
+    Args:
+        processor_cls: Processor class, built once per worker
+        notes: Iterable of (note_id, text) pairs
+        processor_kwargs: Constructor arguments for processor_cls
+        workers: Pool size (default: os.cpu_count()); 1 runs in-process
+        chunksize: Notes sent to a worker per task
+        ordered: Yield in input order (True) or as chunks complete (False)
+        profile: PatternProfile to merge the workers' pattern statistics into
+        sources: The note ids are file paths, for text_reference processors
+        return_exceptions: Yield a note's exception as its result instead
+            of raising it
+
+    Yields:
+        (note_id, structured_note) pairs
+    """
+    processor_kwargs = dict(processor_kwargs or {})
+    if profile is not None:
+        processor_kwargs['profile'] = True
+    workers = workers or os.cpu_count() or 1
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+
+    if workers == 1:
+        processor = processor_cls(**processor_kwargs)
+        try:
+            for note_id, text in notes:
+                yield note_id, _structure(processor, note_id, text, sources, return_exceptions)
+        finally:
+            if profile is not None:
+                profile.merge(processor.profile)
+        return
+
+    chunks = _chunks(notes, chunksize)
+    max_in_flight = workers * 2
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(processor_cls, processor_kwargs)) as pool:
+        if ordered:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(_process_chunk, chunk, sources, return_exceptions))
+                if len(pending) >= max_in_flight:
+                    yield from _collect(pending.popleft(), profile)
+            while pending:
+                yield from _collect(pending.popleft(), profile)
+        else:
+            pending = set()
+            for chunk in chunks:
+                pending.add(pool.submit(_process_chunk, chunk, sources, return_exceptions))
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from _collect(future, profile)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from _collect(future, profile)
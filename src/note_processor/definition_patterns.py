@@ -0,0 +1,270 @@
+"""
+Definition Pattern Registry
+Every definition pattern, defined once and grouped into pattern packs.
+
+A pack (the general patterns, or one domain's) is compiled the first time
+a processor loads it, and its entries are then shared by every processor
+in the process: UnifiedProcessor composes all packs, HistoryProcessor the
+history pack, and a processor limited to some domains compiles only
+theirs.
+
+Each entry describes one definition pattern: the compiled regex, the flags
+it was compiled with, the length thresholds, the validator that filters its
+candidates and the label stored in the 'pattern' field of each result.
+
+Entries also record their anchor (the verb or punctuation every match must
+contain) and the first characters a match can start with. The fused scanner
+uses these to run a pattern only next to its anchors.
+"""
+
+import re
+import time
+from functools import partial
+
+from src.note_processor.token_classes import PRONOUN, SKIP_WORD
+
+
+def validate_term(term, definition, entry, classes):
+    """Standard check: length thresholds + no pronouns in the term.
+
+    classes is the processor's TokenClasses.
+    """
+    if len(term) < entry.min_term_len or len(definition) < entry.min_len:
+        return False
+    return not classes.any(term, PRONOUN)
+
+
+def validate_definition_length(term, definition, entry, classes):
+    """Only the definition length matters (multi-word 'of' terms)."""
+    return len(definition) >= entry.min_len
+
+
+def validate_multiword(term, definition, entry, classes):
+    """Like validate_term, but also rejects generic leading words."""
+    if len(term) < entry.min_term_len or len(definition) < entry.min_len:
+        return False
+    return not classes.any(term, PRONOUN | SKIP_WORD)
+
+
+# Skip words of UnifiedProcessor's TokenClasses
+MULTIWORD_SKIP_WORDS = frozenset({'key', 'main', 'new', 'old', 'first', 'last', 'next'})
+
+
+class DefinitionPattern:
+    """One row of the pattern table."""
+
+    __slots__ = ('label', 'regex', 'flags', 'min_len', 'min_term_len',
+                 'validator', 'title_case', 'anchors', 'start')
+
+    def __init__(self, label, pattern, min_len, flags=0, min_term_len=3,
+                 validator=validate_term, title_case=False,
+                 anchors=('is', 'are'), start=r'[A-Z]'):
+        self.label = label
+        self.flags = flags
+        self.regex = re.compile(pattern, flags)
+        self.min_len = min_len
+        self.min_term_len = min_term_len
+        self.validator = validator
+        self.title_case = title_case
+        # Anchor tokens: whitespace-delimited words (or ':') every match contains
+        self.anchors = anchors
+        # Regex for the first characters of a match
+        self.start = re.compile(start)
+
+    def __repr__(self):
+        return f"DefinitionPattern({self.label!r})"
+
+
+# Worst-case bounds. Every pattern is matched in time linear in the note:
+# a term spans at most MAX_TERM_WORDS words and a definition at most
+# MAX_DEFINITION_CHARS characters, so each start position costs O(1).
+MAX_TERM_WORDS = 24
+MAX_DEFINITION_CHARS = 1000
+MORE_WORDS = f'{{0,{MAX_TERM_WORDS - 1}}}'
+
+# Shared building blocks
+_TERM = r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)' + MORE_WORDS + ')'
+_ARTICLE = r'(?:a|an|the)?\s*'
+# Definition tail: one character, then everything up to the first '.' on the line.
+# A longer definition is cut off after MAX_DEFINITION_CHARS characters: the
+# run is possessive, so it only stops short of a terminator at the limit,
+# and the lookahead accepts it there.
+LONGER = r'(?=[^.\n])'
+TAIL = r'(.[^.\n]' + f'{{0,{MAX_DEFINITION_CHARS - 1}}}+' + r')(?:\.|$|' + LONGER + ')'
+
+
+def tail_until(*terminators):
+    """Definition tail ending at '.' or the first of the given terminator phrases."""
+    words = '|'.join(terminators)
+    return (r'(.(?:(?!' + words + r')[^.\n])' + f'{{0,{MAX_DEFINITION_CHARS - 1}}}+'
+            + r')(?:\.|' + words + '|' + LONGER + ')')
+
+
+# Reach of a match attempt. Before its definition tail a match holds at most
+# LEAD_WORDS runs of ASCII letters and digits (multiword_of, the longest, has
+# 3 * MAX_TERM_WORDS - 2), and the tail with its terminator spans less than
+# MAX_DEFINITION_CHARS + TAIL_SLACK characters. An attempt starting before a
+# position therefore never reads past the start of the (LEAD_WORDS + 1)th
+# run after it plus that many characters.
+LEAD_WORDS = 3 * MAX_TERM_WORDS + 8
+TAIL_SLACK = 32
+ALNUM_RUN = re.compile(r'[A-Za-z0-9]+')
+# Characters of match starts searched between two deadline checks
+SEARCH_WINDOW = 8192
+
+
+def reach(text, pos):
+    """End of the text any match attempt starting before pos can read."""
+    runs = ALNUM_RUN.finditer(text, pos)
+    run = None
+    for _, run in zip(range(LEAD_WORDS + 1), runs):
+        pass
+    if run is None:
+        return len(text)
+    return min(len(text), run.start() + MAX_DEFINITION_CHARS + TAIL_SLACK)
+
+
+def finditer_windows(regex, text, pos=0, deadline=None, window=SEARCH_WINDOW, reach=reach):
+    """
+    regex.finditer(text, pos), searched window by window: the matches
+    starting in each window are found with endpos cut at reach(text, end),
+    past every character their attempts read, so they are exactly
+    finditer's. Stops early, between windows, once time.perf_counter()
+    passes deadline.
+    """
+    n = len(text)
+    while pos < n:
+        end = pos + window
+        if end >= n:
+            yield from regex.finditer(text, pos)
+            return
+        last = pos
+        for m in regex.finditer(text, pos, reach(text, end)):
+            if m.start() >= end:
+                break  # may depend on the cut; found again in the next window
+            yield m
+            last = m.end()
+        pos = max(end, last)
+        if deadline is not None and time.perf_counter() > deadline:
+            return
+
+
+_WAS = ('was', 'were')
+_COLON = (':',)
+
+
+def _spec(label, *args, **kwargs):
+    """(label, constructor of its DefinitionPattern); nothing is compiled yet."""
+    return label, partial(DefinitionPattern, label, *args, **kwargs)
+
+
+# Every pattern, in the order processors run them
+PATTERN_SPECS = dict((
+    # GENERAL PATTERNS (1-9)
+    _spec('is_are', _TERM + r'\s+(?:is|are)\s+' + _ARTICLE + TAIL, 10, re.MULTILINE),
+    _spec('was_were', r'^' + _TERM + r'\s+(?:was|were)\s+' + _ARTICLE + TAIL, 10, re.MULTILINE,
+          anchors=_WAS),
+    _spec('colon', r'^' + _TERM + r':\s*' + TAIL, 10, re.MULTILINE, anchors=_COLON),
+    _spec('which', _TERM + r',?\s+which\s+(?:is|are|was|were)\s+' + TAIL, 10,
+          anchors=('which',)),
+    _spec('means', _TERM + r'\s+means\s+' + TAIL, 10, anchors=('means',)),
+    _spec('refers_to', _TERM + r'\s+refers to\s+' + TAIL, 10, anchors=('refers',)),
+    _spec('known_as', _TERM + r'\s+(?:is |are )?known as\s+' + TAIL, 10, anchors=('known',)),
+    _spec('consists_of', _TERM + r'\s+consists? of\s+' + TAIL, 10,
+          anchors=('consist', 'consists')),
+    _spec('contains', _TERM + r'\s+contains?\s+' + TAIL, 10,
+          anchors=('contain', 'contains')),
+
+    # HISTORY PATTERNS (10-13)
+    _spec(
+        'the_was_were',
+        r'The\s+([A-Z][a-z]+(?:\s+(?:of|the|and|in)\s+[A-Z][a-z]+|\s+[A-Z][a-z]+)' + MORE_WORDS
+        + r')\s+(?:was|were)\s+' + _ARTICLE + tail_until('Led by', 'Marked', 'Involved'), 10,
+        anchors=_WAS, start=r'The\s'),
+    _spec(
+        'the_colon',
+        r'The\s+([A-Z][a-z]+(?:[-\s][A-Z][a-z]+)' + MORE_WORDS + r'):\s*'
+        + tail_until('Led by', 'Marked', 'Adopted'), 15,
+        anchors=_COLON, start=r'The\s'),
+    _spec(
+        'multiword_of',
+        r'([A-Z][a-z]+(?:\s+of\s+(?:the\s+)?[A-Z][a-z]+)' + f'{{1,{MAX_TERM_WORDS - 1}}}' + r'):\s*'
+        + tail_until('Led by', 'Adopted'), 15,
+        validator=validate_definition_length, anchors=_COLON),
+    _spec(
+        'simple_colon',
+        r'^([A-Z][A-Za-z0-9]+(?:\s+[A-Z][A-Za-z0-9]+)' + MORE_WORDS + r'):\s*' + TAIL, 15, re.MULTILINE,
+        anchors=_COLON),
+
+    # Pattern 14: "A/An X is Y" (math and literature style!)
+    # Catches: "A derivative is...", "A metaphor is...", "A triangle is..."
+    _spec(
+        'a_an_is',
+        r'[Aa]n?\s+([a-z][a-z]+(?:\s+[a-z]+)' + MORE_WORDS + r')\s+(?:is|are)\s+' + _ARTICLE + TAIL, 10, re.MULTILINE,
+        title_case=True, start=r'[Aa]n?\s'),
+
+    # Pattern 15: "The X is/are Y" (present tense with article)
+    # Catches: "The mean is...", "The limit is...", "The chain rule is..."
+    _spec(
+        'the_is_are',
+        r'The\s+([A-Za-z][a-z]+(?:\s+[a-z]+)' + MORE_WORDS + r')\s+(?:is|are)\s+' + _ARTICLE + TAIL, 10, re.MULTILINE,
+        start=r'The\s'),
+
+    # Pattern 16: Multi-word with lowercase second word + colon (conservative)
+    # Catches: "Factory system:", "Labor unions:", but keeps high threshold
+    _spec(
+        'multiword_lower',
+        r'^([A-Z][a-z]+\s+[a-z]+):\s*' + TAIL, 20, re.MULTILINE,
+        min_term_len=8, validator=validate_multiword, title_case=True, anchors=_COLON),
+
+    # Pattern 17: Multi-word starting with capital, lowercase words, then is/are
+    # Catches: "Rational numbers are...", "Prime numbers are..."
+    _spec(
+        'multiword_cap_lower_are',
+        r'^([A-Z][a-z]+\s+[a-z]+(?:\s+[a-z]+)' + MORE_WORDS + r')\s+(?:is|are)\s+' + _ARTICLE + TAIL, 15, re.MULTILINE,
+        min_term_len=8, title_case=True),
+))
+
+
+# Pattern packs. 'general' runs in every domain; a domain pack holds the
+# patterns that only pay off in that domain (see domain_routing).
+PACKS = {
+    'general': ('is_are', 'was_were', 'colon', 'which', 'means', 'refers_to', 'known_as',
+                'consists_of', 'contains', 'the_is_are', 'multiword_lower'),
+    'biology': ('a_an_is', 'multiword_cap_lower_are'),
+    'history': ('the_was_were', 'the_colon', 'multiword_of', 'simple_colon'),
+    'math': ('a_an_is', 'multiword_cap_lower_are'),
+    'literature': ('a_an_is', 'multiword_cap_lower_are'),
+}
+
+_compiled = {}  # label -> DefinitionPattern
+_tables = {}  # frozenset of pack names -> pattern table
+
+
+def load_patterns(*packs):
+    """
+    Pattern table of the given packs (default: all of them), in table order.
+
+    Each pattern is compiled the first time a pack holding it is loaded,
+    and the same entries (and the same table, for the same packs) are
+    shared by every processor in the process.
+    """
+    key = frozenset(packs or PACKS)
+    table = _tables.get(key)
+    if table is None:
+        unknown = key - PACKS.keys()
+        if unknown:
+            raise ValueError(f"Unknown pattern packs {sorted(unknown)}, expected {tuple(PACKS)}")
+        labels = {label for pack in key for label in PACKS[pack]}
+        for label in labels - _compiled.keys():
+            _compiled[label] = PATTERN_SPECS[label]()
+        table = _tables[key] = tuple(_compiled[label] for label in PATTERN_SPECS
+                                     if label in labels)
+    return table
+
+
+def __getattr__(name):
+    # UNIFIED_PATTERNS, every pack's patterns, is only compiled when imported
+    if name == 'UNIFIED_PATTERNS':
+        return load_patterns()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -7,15 +7,69 @@ Date: January 26, 2026
 """
 
 import re
-from typing import List, Dict
+import heapq
+from typing import List, Dict, Union
 from collections import Counter
+from itertools import filterfalse
+from operator import itemgetter
 import os
 
+from src.note_processor.definition_patterns import MAX_TERM_WORDS, MORE_WORDS
+from src.note_processor.segmentation import SegmentedDocument, as_document
+from src.note_processor.records import compact
+from src.note_processor.reports import text_lines
+from src.note_processor.spans import TextSpan
+from src.note_processor.token_classes import PRONOUN, SKIP_WORD, STOP_WORD, TokenClasses, WordSet
+
+EXAMPLE_PATTERNS = [
+    re.compile(r'(?:for example|e\.g\.|such as|for instance)[,:]?\s+([^.!?]+)', re.IGNORECASE),
+    re.compile(r'Example:\s+([^.!?\n]+)', re.IGNORECASE)
+]
+
+# Words a definition term may not contain
+INVALID_TERM_WORDS = frozenset({
+    'he', 'she', 'it', 'they', 'we', 'you', 'i', 'this', 'that',
+    'what', 'which', 'who', 'when', 'where', 'most', 'some', 'all',
+    'these', 'those', 'them', 'him', 'her', 'us', 'our'
+})
+
+# One scan feeds all three concept methods: a run of 2-5 capitalized words
+# (method 1) or any other word of 4+ letters (methods 2 and 3)
+CONCEPT_TOKEN = re.compile(r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,4}|[A-Za-z]{4,})\b')
+PHRASE_SKIP = frozenset({'The', 'But', 'And', 'Or', 'A', 'An'})
+GENERIC_WORDS = ('summary', 'class', 'chapter', 'book')
+
+# The only characters whose lowercase is ASCII or splits a word ('İ' -> 'i' +
+# combining dot, Kelvin sign -> 'k'). Without them, the lowercase words of a
+# note are exactly its ASCII words, lowercased.
+LOWER_CHANGES_WORDS = '\u0130\u212a'
+
+# Capitalized words that are never concepts
+NON_CONCEPTS = frozenset({'The', 'This', 'That', 'These', 'Those', 'Some', 'There'})
+
 
 class NoteProcessor:
-    """Simple, reliable note processor."""
+    """Simple, reliable note processor.
+    
+    spans=True returns examples as TextSpan offsets into the note, sliced
+    only when read, instead of strings. compact=True returns definitions as
+    slotted Definition records instead of dicts. With a
+    tfidf.ConceptIndex as concept_index, extract_concepts ranks the
+    note's terms against document frequencies over the indexed corpus
+    instead of by frequency in the note alone.
+    
+    Word checks look up self.token_classes, built from self.stop_words,
+    self.pronouns (frozensets) and INVALID_TERM_WORDS; assign new sets to
+    change them.
+    """
+    
+    stop_words = WordSet()
+    pronouns = WordSet()
     
-    def __init__(self):
+    def __init__(self, spans=False, compact=False, concept_index=None):
+        self.spans = spans
+        self.compact = compact
+        self.concept_index = concept_index
         self.stop_words = {
             'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
             'of', 'with', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
@@ -30,55 +84,85 @@ class NoteProcessor:
         
         self.pronouns = {'he', 'she', 'it', 'we', 'you', 'i', 'they', 'them', 'him', 'her', 'us', 'our'}
     
-    def extract_concepts(self, text: str, top_n: int = 10) -> List[str]:
-        """Extract key concepts from text."""
-        concepts = []
+    @property
+    def token_classes(self):
+        """TokenClasses of the concept and term checks."""
+        if self._token_classes is None:
+            self._token_classes = TokenClasses(pronouns=self.pronouns, stop_words=self.stop_words,
+                                               skip_words=INVALID_TERM_WORDS)
+        return self._token_classes
+    
+    def extract_concepts(self, text: Union[str, SegmentedDocument], top_n: int = 10) -> List[str]:
+        """Extract key concepts from text (or a pre-segmented document)."""
+        if self.concept_index is not None:
+            return self.concept_index.rank(text, top_n)
+        phrases, capitalized, lowercase = self.concept_counts(text)
+        return self.rank_concepts(phrases, capitalized, lowercase, top_n)
+    
+    def concept_counts(self, text: Union[str, SegmentedDocument]):
+        """
+        Raw concept evidence: (capitalized phrases in text order, Counter of
+        capitalized words, Counter of meaningful lowercase words).
         
-        # Method 1: Multi-word capitalized phrases (stop at punctuation!)
-        # Only match within sentence boundaries
-        sentences = re.split(r'[.!?]+', text)
+        Counts of several pieces of a note can be merged in note order and
+        ranked with rank_concepts, giving the same concepts as the whole note.
+        """
+        doc = as_document(text)
+        text = doc.text
+        tokens = CONCEPT_TOKEN.findall(text)
         
-        for sentence in sentences:
-            # Match 2-5 capitalized words in a row
-            matches = re.findall(r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,4})\b', sentence)
+        # Method 1: Multi-word capitalized phrases. Their words are only
+        # separated by whitespace, so they never cross a sentence boundary.
+        phrases = []
+        for phrase in filterfalse(str.isalpha, tokens):
+            # Skip if starts with article/conjunction
+            if phrase.split()[0] in PHRASE_SKIP:
+                continue
+            
+            # Skip if contains generic words
+            phrase_lower = phrase.lower()
+            if any(generic in phrase_lower for generic in GENERIC_WORDS):
+                continue
             
-            for phrase in matches:
-                phrase = phrase.strip()
-                words = phrase.split()
-                
-                # Skip if starts with article/conjunction
-                if words[0] in ['The', 'But', 'And', 'Or', 'A', 'An']:
-                    continue
-                
-                # Skip if contains generic words
-                phrase_lower = phrase.lower()
-                if any(generic in phrase_lower for generic in ['summary', 'class', 'chapter', 'book']):
-                    continue
-                
-                concepts.append((phrase, 10.0))
+            phrases.append(phrase)
         
         # Method 2: Important single words
-        single_words = re.findall(r'\b[A-Z][a-z]{3,}\b', text)
-        word_freq = Counter(single_words)
+        # Method 3: Frequent meaningful words (for technical notes)
+        # Both from the distinct tokens in order of first occurrence; a
+        # phrase counts each of its words.
+        capitalized = Counter()
+        lowercase = Counter()
+        exact = not any(c in text for c in LOWER_CHANGES_WORDS)
+        for token, count in Counter(tokens).items():
+            for word in (token,) if token.isalpha() else token.split():
+                if len(word) > 3 and word[0].isupper() and word[1:].islower():
+                    capitalized[word] += count
+                if exact and len(word) > 4:
+                    lowercase[word.lower()] += count
+        if not exact:
+            lowercase = Counter(re.findall(r'\b[a-z]{5,}\b', doc.lower))
         
-        for word, freq in word_freq.items():
-            word_lower = word.lower()
-            
+        # Drop the distinct stop words
+        classes = self.token_classes
+        for word in [w for w in lowercase if classes[w] & STOP_WORD]:
+            del lowercase[word]
+        
+        return phrases, capitalized, lowercase
+    
+    def rank_concepts(self, phrases, capitalized, lowercase, top_n: int = 10) -> List[str]:
+        """Score and rank the evidence gathered by concept_counts."""
+        concepts = [(phrase, 10.0) for phrase in phrases]
+        classes = self.token_classes
+        
+        for word, freq in capitalized.items():
             # Skip common words and pronouns
-            if word in ['The', 'This', 'That', 'These', 'Those', 'Some', 'There']:
-                continue
-            if word_lower in self.pronouns or word_lower in self.stop_words:
+            if word in NON_CONCEPTS or classes[word] & (PRONOUN | STOP_WORD):
                 continue
             
             concepts.append((word, freq * 2.0))
         
-        # Method 3: Frequent meaningful words (for technical notes)
-        words = re.findall(r'\b[a-z]{5,}\b', text.lower())
-        words = [w for w in words if w not in self.stop_words]
-        word_freq = Counter(words)
-        
         # Only add if appears multiple times
-        for word, freq in word_freq.items():
+        for word, freq in lowercase.items():
             if freq >= 3:  # Must appear at least 3 times
                 concepts.append((word.capitalize(), freq * 0.8))
         
@@ -90,20 +174,15 @@ class NoteProcessor:
                 if key not in concept_dict or score > concept_dict[key][1]:
                     concept_dict[key] = (concept, score)
         
-        # Sort and return
-        ranked = sorted(concept_dict.values(), key=lambda x: x[1], reverse=True)
-        return [concept for concept, score in ranked[:top_n]]
+        # Top n by score; ties keep first-seen order, as a stable sort would
+        ranked = heapq.nlargest(top_n, concept_dict.values(), key=itemgetter(1))
+        return [concept for concept, score in ranked]
     
-    def extract_definitions(self, text: str) -> List[Dict[str, str]]:
+    def extract_definitions(self, text: Union[str, SegmentedDocument]) -> List[Dict[str, str]]:
         """Extract definitions using proven patterns."""
+        text = as_document(text).text
         definitions = []
-        
-        # Invalid terms
-        invalid = {
-            'he', 'she', 'it', 'they', 'we', 'you', 'i', 'this', 'that',
-            'what', 'which', 'who', 'when', 'where', 'most', 'some', 'all',
-            'these', 'those', 'them', 'him', 'her', 'us', 'our'
-        }
+        classes = self.token_classes
         
         def is_valid_term(term: str) -> bool:
             """Check if term is valid."""
@@ -113,13 +192,9 @@ class NoteProcessor:
             if len(term_lower) < 3:
                 return False
             
-            # Invalid words
-            if term_lower in invalid:
-                return False
-            
-            # Contains pronouns
-            words = term_lower.split()
-            if any(w in invalid for w in words):
+            # Invalid words, pronouns included
+            words = term.split()
+            if any(classes[w] & SKIP_WORD for w in words):
                 return False
             
             # Starts with article
@@ -142,7 +217,7 @@ class NoteProcessor:
                 })
         
         # Pattern 2: "X: definition"
-        pattern2 = r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*):\s+([^.!?\n]{15,})'
+        pattern2 = r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)' + MORE_WORDS + r'):\s+([^.!?\n]{15,})'
         for term, definition in re.findall(pattern2, text):
             if is_valid_term(term):
                 definitions.append({
@@ -151,7 +226,7 @@ class NoteProcessor:
                 })
         
         # Pattern 3: "X is/are Y"
-        pattern3 = r'([A-Z][a-z]+(?:\s+[a-z]+)*)\s+(?:is|are)\s+(the\s+)?([^.!?]{10,})'
+        pattern3 = r'([A-Z][a-z]+(?:\s+[a-z]+)' + MORE_WORDS + r')\s+(?:is|are)\s+(the\s+)?([^.!?]{10,})'
         for term, article, definition in re.findall(pattern3, text):
             if is_valid_term(term):
                 full_def = (article if article else '') + definition
@@ -161,7 +236,8 @@ class NoteProcessor:
                 })
         
         # Pattern 4: "X was/were Y"
-        pattern4 = r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)+)\s+(?:was|were)\s+(an?\s+)?([^.!?]{10,})'
+        pattern4 = (r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)' + f'{{1,{MAX_TERM_WORDS - 1}}}'
+                    + r')\s+(?:was|were)\s+(an?\s+)?([^.!?]{10,})')
         for term, article, definition in re.findall(pattern4, text):
             if is_valid_term(term):
                 full_def = (article if article else '') + definition
@@ -171,7 +247,8 @@ class NoteProcessor:
                 })
         
         # Pattern 5: "X is known as Y"
-        pattern5 = r'([A-Z][a-z]+(?:\s+[a-z]+)*)\s+(?:is|are)\s+(?:known|called|acknowledged)\s+as\s+([^.!?]+)'
+        pattern5 = (r'([A-Z][a-z]+(?:\s+[a-z]+)' + MORE_WORDS
+                    + r')\s+(?:is|are)\s+(?:known|called|acknowledged)\s+as\s+([^.!?]+)')
         for term, definition in re.findall(pattern5, text):
             if is_valid_term(term) and len(definition.strip()) > 5:
                 definitions.append({
@@ -187,75 +264,40 @@ class NoteProcessor:
                 seen.add(defn['term'])
                 unique.append(defn)
         
+        if self.compact:
+            return compact(unique)
         return unique
     
-    def extract_examples(self, text: str) -> List[str]:
+    def extract_examples(self, text: Union[str, SegmentedDocument]) -> List[str]:
         """Extract examples."""
-        patterns = [
-            r'(?:for example|e\.g\.|such as|for instance)[,:]?\s+([^.!?]+)',
-            r'Example:\s+([^.!?\n]+)'
-        ]
-        
+        text = as_document(text).text
+        if self.spans:
+            return [TextSpan(text, *m.span(1))
+                    for pattern in EXAMPLE_PATTERNS for m in pattern.finditer(text)]
         examples = []
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in EXAMPLE_PATTERNS:
+            matches = pattern.findall(text)
             examples.extend([m.strip() for m in matches])
         
         return examples
     
-    def process(self, text: str) -> Dict:
-        """Process note and return structured data."""
+    def process(self, text: Union[str, SegmentedDocument]) -> Dict:
+        """Process note and return structured data (segmented only once)."""
+        doc = as_document(text)
         return {
-            'concepts': self.extract_concepts(text),
-            'definitions': self.extract_definitions(text),
-            'examples': self.extract_examples(text),
-            'word_count': len(text.split())
+            'concepts': self.extract_concepts(doc),
+            'definitions': self.extract_definitions(doc),
+            'examples': self.extract_examples(doc),
+            'word_count': len(doc.words)
         }
     
+    def structure_note(self, text: Union[str, SegmentedDocument]) -> Dict:
+        """Same as process(), under the name batch and the result cache call."""
+        return self.process(text)
+    
     def format_output(self, result: Dict, filename: str = "") -> str:
         """Format results."""
-        lines = []
-        
-        if filename:
-            lines.append(f"\n{'='*70}")
-            lines.append(f"📄 {filename}")
-        
-        lines.append(f"{'='*70}")
-        
-        # Concepts
-        lines.append(f"\n📌 CONCEPTS ({len(result['concepts'])}):")
-        if result['concepts']:
-            for i, concept in enumerate(result['concepts'], 1):
-                lines.append(f"   {i}. {concept}")
-        else:
-            lines.append("   (none found)")
-        
-        # Definitions
-        if result['definitions']:
-            lines.append(f"\n📖 DEFINITIONS ({len(result['definitions'])}):")
-            for defn in result['definitions']:
-                definition = defn['definition']
-                if len(definition) > 65:
-                    definition = definition[:65] + "..."
-                lines.append(f"   • {defn['term']}: {definition}")
-        
-        # Examples
-        if result['examples']:
-            lines.append(f"\n💡 EXAMPLES ({len(result['examples'])}):")
-            for example in result['examples']:
-                if len(example) > 65:
-                    example = example[:65] + "..."
-                lines.append(f"   • {example}")
-        
-        # Stats
-        lines.append(f"\n📊 STATS:")
-        lines.append(f"   Words: {result['word_count']}")
-        lines.append(f"   Concepts: {len(result['concepts'])}")
-        lines.append(f"   Definitions: {len(result['definitions'])}")
-        
-        lines.append(f"{'='*70}\n")
-        
-        return '\n'.join(lines)
+        return '\n'.join(text_lines(result, filename))
 
 
 def main():
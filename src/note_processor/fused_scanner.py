@@ -0,0 +1,154 @@
+"""
+Fused Definition Scanner
+Single-pass alternative engine for UnifiedProcessor.extract_definitions
+
+The classic engine runs 17 full-text re.findall passes. This engine scans
+the note once with a combined anchor regex ("is/are", "was/were", ":",
+"means", "refers to", "known as", "consist", "contain", "which") plus one
+cheap punctuation pass, and records for every anchor the stretch of text a
+match using it could start in. Each pattern is then only tried at those
+start positions, and patterns whose anchors are absent are skipped.
+
+Every match of a pattern contains one of its anchor tokens, and the text
+between the match start and that anchor only holds letters, digits,
+whitespace, ',' and '-'. So trying the pattern at the candidate starts in
+increasing order (skipping past each match, like findall does) yields
+exactly the same matches as re.findall over the whole note.
+"""
+
+import re
+import time
+from bisect import bisect_left
+
+from src.note_processor.definition_patterns import finditer_windows, load_patterns
+
+
+def _anchor_tokens(patterns):
+    tokens = set()
+    for entry in patterns:
+        tokens.update(entry.anchors)
+    tokens.discard(':')
+    # Longest first so 'consists' wins over 'consist'
+    return sorted(tokens, key=len, reverse=True)
+
+
+def build_anchor_regex(patterns):
+    """Compile the combined anchor regex for a pattern table."""
+    words = '|'.join(re.escape(t) for t in _anchor_tokens(patterns))
+    return re.compile(r'\s(' + words + r')(?=\s)|:')
+
+
+def anchor_reach(patterns):
+    """reach() of the anchor regex, for finditer_windows: a space, a token, a lookahead."""
+    chars = max(map(len, _anchor_tokens(patterns)), default=0) + 2
+    return lambda text, end: min(len(text), end + chars)
+
+
+def _stop_reach(text, end):
+    # A stop run cut at a window end splits in two, which leaves the
+    # start windows unchanged
+    return end
+
+
+# Characters that can never appear between a match start and its anchor
+STOP_REGEX = re.compile(r'[^A-Za-z0-9\s,\-]+')
+
+
+class FusedDefinitionScanner:
+    """Find (term, definition) matches for every pattern in one anchor pass."""
+
+    def __init__(self, patterns=None):
+        if patterns is None:
+            patterns = load_patterns()
+        self.patterns = patterns
+        self.anchor_regex = build_anchor_regex(patterns)
+        self.anchor_reach = anchor_reach(patterns)
+        # anchor token -> indices of the patterns it can belong to
+        self.families = {}
+        for idx, entry in enumerate(patterns):
+            for token in entry.anchors:
+                self.families.setdefault(token, []).append(idx)
+
+    def windows(self, text, deadline=None):
+        """
+        Locate every anchor in the text.
+
+        Returns, per pattern index, a list of (lo, hi) windows: a match that
+        uses the anchor at hi must start in [lo, hi). Once
+        time.perf_counter() passes deadline the text is no longer searched,
+        and the windows found so far are returned.
+        """
+        windows = [[] for _ in self.patterns]
+        families = self.families
+        stop_starts = []
+        stop_ends = []
+        for m in finditer_windows(STOP_REGEX, text, deadline=deadline, reach=_stop_reach):
+            stop_starts.append(m.start())
+            stop_ends.append(m.end())
+
+        for m in finditer_windows(self.anchor_regex, text, deadline=deadline,
+                                  reach=self.anchor_reach):
+            token = m.group(1)
+            if token is None:
+                token = ':'
+                anchor = m.start()
+            else:
+                anchor = m.start(1)
+            # The run of allowed characters ends at the last stop before the anchor
+            i = bisect_left(stop_starts, anchor)
+            lo = min(stop_ends[i - 1], anchor) if i else 0
+            for idx in families[token]:
+                windows[idx].append((lo, anchor))
+
+        return windows
+
+    def scan(self, text, as_match=False, deadline=None):
+        """Yield (entry, matches) in table order; matches equal re.findall's.
+
+        as_match=True yields the re.Match objects instead of their groups.
+        A pattern's matches stop at the first candidate start reached after
+        time.perf_counter() passes deadline; if it passed while the anchors
+        were located, every pattern is yielded, so the caller sees it.
+        """
+        windows = self.windows(text, deadline)
+        late = deadline is not None and time.perf_counter() > deadline
+        for entry, spans in zip(self.patterns, windows):
+            if spans:
+                yield entry, self._match_windows(entry, text, spans, as_match, deadline)
+            elif late:
+                yield entry, []
+
+    @staticmethod
+    def _match_windows(entry, text, spans, as_match=False, deadline=None):
+        """Try the pattern at each candidate start inside the windows."""
+        regex = entry.regex
+        start = entry.start
+        matches = []
+        pos = 0
+        lo, hi = spans[0]
+
+        # Windows arrive sorted by anchor; merge the overlapping ones
+        merged = []
+        for s_lo, s_hi in spans[1:]:
+            if s_lo <= hi:
+                hi = s_hi
+            else:
+                merged.append((lo, hi))
+                lo, hi = s_lo, s_hi
+        merged.append((lo, hi))
+
+        for lo, hi in merged:
+            if hi <= pos:
+                continue
+            for cand in start.finditer(text, max(lo, pos), hi):
+                s = cand.start()
+                if s < pos:
+                    continue
+                if deadline is not None and time.perf_counter() > deadline:
+                    return matches
+                m = regex.match(text, s)
+                if m:
+                    matches.append(m if as_match else m.groups())
+                    pos = m.end()
+
+        return matches
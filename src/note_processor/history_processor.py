@@ -8,92 +8,83 @@ Changes from v0.6:
 - Fixed Pattern 13 to handle acronyms (NATO, WWII)
 """
 
-import re
+import time
+
+from src.note_processor.definition_patterns import load_patterns, validate_definition_length
+from src.note_processor.profiling import PatternProfile
+from src.note_processor.records import compact
+from src.note_processor.segmentation import as_document
+
+# Patterns whose terms are screened for pronouns (as substrings)
+PRONOUN_SCREENED = frozenset({'the_was_were', 'simple_colon'})
 
 class HistoryProcessor:
-    """Processor with history-specific definition patterns."""
+    """Processor with history-specific definition patterns.
+    
+    The patterns are the history pack of the shared registry, the same
+    entries UnifiedProcessor runs as patterns 10-13.
     
-    def __init__(self):
+    compact=True returns slotted Definition records instead of dicts.
+    """
+    
+    def __init__(self, profile=False, compact=False):
         self.pronouns = {'he', 'she', 'it', 'they', 'them', 'their', 'bastille'}
+        self.patterns = load_patterns('history')
+        self.compact = compact
+        # Per-pattern statistics, collected only when profiling
+        self.profile = PatternProfile() if profile else None
     
     def extract_definitions(self, text):
         """Extract definitions using BROADENED history-specific patterns."""
+        text = as_document(text).text
         definitions = []
+        if self.profile is not None:
+            self.profile.notes += 1
         
-        # Pattern 10: "The X was/were Y"
-        pattern10 = r'The\s+([A-Z][a-z]+(?:\s+(?:of|the|and|in)\s+[A-Z][a-z]+|\s+[A-Z][a-z]+)*)\s+(?:was|were)\s+(?:a|an|the)?\s*(.+?)(?:\.|Led by|Marked|Involved)'
-        matches10 = re.findall(pattern10, text)
-        for term, definition in matches10:
-            term = term.strip()
-            definition = definition.strip()
-            
-            if len(term) < 3 or len(definition) < 10:
-                continue
-            if any(p in term.lower() for p in self.pronouns):
-                continue
-            
-            if not any(d['term'].lower() == term.lower() for d in definitions):
-                definitions.append({
-                    'term': term,
-                    'definition': definition,
-                    'pattern': 'the_was_were'
-                })
-        
-        # Pattern 11: "The X: definition"
-        pattern11 = r'The\s+([A-Z][a-z]+(?:[-\s][A-Z][a-z]+)*):\s*(.+?)(?:\.|Led by|Marked|Involved)'
-        matches11 = re.findall(pattern11, text)
-        for term, definition in matches11:
-            term = term.strip()
-            definition = definition.strip()
-            
-            if len(term) < 3 or len(definition) < 15:
-                continue
-            
-            if not any(d['term'].lower() == term.lower() for d in definitions):
-                definitions.append({
-                    'term': term,
-                    'definition': definition,
-                    'pattern': 'the_colon'
-                })
-        
-        # Pattern 12: Multi-word with "of"
-        pattern12 = r'([A-Z][a-z]+(?:\s+of\s+(?:the\s+)?[A-Z][a-z]+)+):\s*(.+?)(?:\.|Led by|Marked|Involved)'
-        matches12 = re.findall(pattern12, text)
-        for term, definition in matches12:
-            term = term.strip()
-            definition = definition.strip()
-            
-            if len(definition) < 15:
-                continue
-            
-            if not any(d['term'].lower() == term.lower() for d in definitions):
-                definitions.append({
-                    'term': term,
-                    'definition': definition,
-                    'pattern': 'multiword_of'
-                })
-        
-        # Pattern 13: Simple "Term: definition" - FIXED for Roman numerals & acronyms
-        pattern13 = r'^([A-Z][A-Za-z0-9]+(?:\s+[A-Z][A-Za-z0-9]+)*):\s*(.+?)(?:\.|$)'
-        matches13 = re.findall(pattern13, text, re.MULTILINE)
-        for term, definition in matches13:
-            term = term.strip()
-            definition = definition.strip()
-            
-            if len(term) < 3 or len(definition) < 15:
-                continue
-            if any(p in term.lower() for p in self.pronouns):
-                continue
-            
-            if not any(d['term'].lower() == term.lower() for d in definitions):
-                definitions.append({
-                    'term': term,
-                    'definition': definition,
-                    'pattern': 'simple_colon'
-                })
+        # Patterns 10-13: the history pack
+        for entry in self.patterns:
+            matches, elapsed = self._findall(entry, text)
+            before, valid = len(definitions), 0
+            for term, definition in matches:
+                term = term.strip()
+                definition = definition.strip()
+                
+                if len(definition) < entry.min_len:
+                    continue
+                # Multi-word "of" terms are long enough by construction
+                if entry.validator is not validate_definition_length and len(term) < entry.min_term_len:
+                    continue
+                if entry.label in PRONOUN_SCREENED and any(p in term.lower() for p in self.pronouns):
+                    continue
+                
+                valid += 1
+                if not any(d['term'].lower() == term.lower() for d in definitions):
+                    definitions.append({
+                        'term': term,
+                        'definition': definition,
+                        'pattern': entry.label
+                    })
+            self._record(entry.label, elapsed, matches, valid, len(definitions) - before)
         
+        if self.compact:
+            return compact(definitions)
         return definitions
     
+    def _findall(self, entry, text):
+        """entry.regex.findall plus the seconds it took (0.0 unless profiling)."""
+        if self.profile is None:
+            return entry.regex.findall(text), 0.0
+        start = time.perf_counter()
+        matches = entry.regex.findall(text)
+        return matches, time.perf_counter() - start
+    
+    def _record(self, label, elapsed, matches, valid, accepted):
+        if self.profile is not None:
+            self.profile.record(label, elapsed, len(matches),
+                                rejected=len(matches) - valid,
+                                duplicates=valid - accepted,
+                                accepted=accepted)
+    
     def structure_note(self, text):
         return {'definitions': self.extract_definitions(text), 'concepts': []}
 
@@ -0,0 +1,163 @@
+"""
+Incremental Extraction
+Re-extracts a note after an edit by re-running only what changed.
+
+The note is cut into segments after every line whose last non-blank
+character is a '.'. A definition tail stops at the first '.' or newline,
+and no term or connective reaches across a newline that follows a
+period, so no definition match spans a cut. Concept sentences split on
+'.' and relationships are found per line, so they do not span cuts
+either. Each segment's raw evidence (validated definition matches per
+pattern, concept phrases and words, relationship candidates per line) is
+kept, keyed by the segment's text. After an edit only the segments that
+are new - the edited lines together with their neighbours up to the
+nearest cuts - are matched again; everything is then merged in note
+order under the usual dedupe and ranking rules. The result is identical
+to running the processors on the whole new text.
+"""
+
+import re
+from collections import Counter
+from itertools import chain
+
+from src.note_processor.final_processor import NoteProcessor
+from src.note_processor.relationship_extractor import RelationshipExtractor
+from src.note_processor.unified_processor import UnifiedProcessor
+
+# A line ending with a period: no extraction crosses the end of it
+CUT = re.compile(r'\.[^\S\n]*\n')
+
+
+def segment_spans(text):
+    """(start, end) of each segment; the segments tile the text."""
+    spans = []
+    start = 0
+    for m in CUT.finditer(text):
+        spans.append((start, m.end()))
+        start = m.end()
+    if start < len(text) or not spans:
+        spans.append((start, len(text)))
+    return spans
+
+
+class Segment:
+    """Extraction evidence of one segment, independent of the rest of the note."""
+
+    __slots__ = ('definitions', 'phrases', 'capitalized', 'lowercase', 'relations')
+
+    def __init__(self, definitions, phrases, capitalized, lowercase, relations):
+        self.definitions = definitions  # pattern label -> valid (term, definition) list
+        self.phrases = phrases          # capitalized phrases, in text order
+        self.capitalized = capitalized  # capitalized words, repeats included
+        self.lowercase = lowercase      # meaningful lowercase words, repeats included
+        self.relations = relations      # (line_lower, line matches) candidates
+
+
+class IncrementalProcessor:
+    """Definitions, concepts and relationships of a note, updated per edit.
+
+    update(previous, text) takes the result returned for the previous
+    version of the note. Its 'segments' entry holds the per-segment
+    evidence, so the next update only has to match the segments it has
+    not seen; 'recomputed' counts the segments that were matched again.
+    """
+
+    def __init__(self, processor=None, concept_processor=None, relations=None, top_n=10):
+        self.processor = processor or UnifiedProcessor()
+        self.concept_processor = concept_processor or NoteProcessor()
+        self.relations = relations or RelationshipExtractor()
+        self.top_n = top_n
+
+    def structure_note(self, text):
+        return self.update(None, text)
+
+    def update(self, previous, text):
+        """Result for text, reusing the segments of a previous result."""
+        known = previous['segments'] if previous else {}
+        segments = {}
+        ordered = []
+        recomputed = 0
+        spans = segment_spans(text)
+        last = len(spans) - 1
+
+        for i, (start, end) in enumerate(spans):
+            # The final segment can also end at '$', so it is keyed apart
+            key = (text[start:end], i == last)
+            segment = segments.get(key) or known.get(key)
+            if segment is None:
+                segment = self._segment(text, start, end, key[1])
+                recomputed += 1
+            segments[key] = segment
+            ordered.append(segment)
+
+        definitions = self._definitions(ordered)
+        return {
+            'definitions': definitions,
+            'concepts': self._concepts(ordered),
+            'relationships': self._relationships(ordered, definitions),
+            'segments': segments,
+            'recomputed': recomputed
+        }
+
+    def _segment(self, text, start, end, last):
+        """Match every extractor on text[start:end]."""
+        piece = text[start:end]
+        processor = self.processor
+        classes = processor.token_classes
+        # Matching on the full text keeps '^', '$' and lookarounds exact;
+        # the character after the cut cannot take part in a match.
+        endpos = len(text) if last else end + 1
+
+        definitions = {}
+        for entry, pos in processor.prefilter.plan(piece):
+            valid = []
+            for m in entry.regex.finditer(text, start + pos, endpos):
+                if m.start() >= end:
+                    break
+                term, defn = m.groups()
+                if entry.validator(term, defn, entry, classes):
+                    if entry.title_case:
+                        term = term.strip().title()
+                    valid.append((term, defn))
+            if valid:
+                definitions[entry.label] = valid
+
+        phrases, capitalized, lowercase = self.concept_processor.concept_counts(piece)
+
+        relations = []
+        for line in piece.split('\n'):
+            line_lower = line.lower()
+            found = self.relations.line_matches(line_lower)
+            if found is not None:
+                relations.append((line_lower, found))
+
+        return Segment(definitions, phrases, list(capitalized.elements()),
+                       list(lowercase.elements()), relations)
+
+    def _definitions(self, ordered):
+        """Pattern by pattern, in note order, under the processor's dedupe."""
+        by_label = {}
+        for segment in ordered:
+            for label, matches in segment.definitions.items():
+                by_label.setdefault(label, []).extend(matches)
+
+        definitions = []
+        index = {}
+        add = self.processor._add
+        for entry in self.processor.patterns:
+            for term, defn in by_label.get(entry.label, ()):
+                add(definitions, term, defn, entry.label, index)
+        return definitions
+
+    def _concepts(self, ordered):
+        phrases = list(chain.from_iterable(s.phrases for s in ordered))
+        capitalized = Counter(chain.from_iterable(s.capitalized for s in ordered))
+        lowercase = Counter(chain.from_iterable(s.lowercase for s in ordered))
+        return self.concept_processor.rank_concepts(phrases, capitalized, lowercase, self.top_n)
+
+    def _relationships(self, ordered, definitions):
+        terms = [d['term'].lower() for d in definitions]
+        if len(terms) < 2:
+            return []
+        candidates = list(chain.from_iterable(s.relations for s in ordered))
+        return self.relations.relationships_from(candidates, terms)
@@ -0,0 +1,239 @@
+"""
+Directory Ingest
+Process a directory tree of notes, skipping files that have not changed.
+
+A manifest (SQLite, under database/) records the size, mtime and SHA-256
+of every file processed so far. On a rerun a file whose size and mtime
+match its manifest row is skipped without being read. A file whose stat
+changed is read and hashed; when the content is the same (touched,
+copied, restored from backup) only its manifest row is refreshed. The
+rest go through batch.structure_notes over a process pool, and each
+result is appended to a JSONL file as {"path", "sha256", "result"}.
+
+A file enters the manifest only after its result has been written, and
+the output is flushed and fsynced before every manifest commit, so an
+interrupted run redoes at most the files in flight. A note the processor
+raises on is counted as failed, like an unreadable file, and left out of
+the manifest so the next run tries it again. Files that have
+disappeared are dropped from the manifest. Paths are recorded absolute,
+so the same tree matches its rows however its root is spelled.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from src.note_processor import batch
+from src.note_processor.records import plain
+
+DEFAULT_MANIFEST = os.path.join('database', 'note_manifest.sqlite3')
+EXTENSIONS = ('.txt', '.md')
+COMMIT_EVERY = 1000  # manifest rows per transaction
+
+
+def walk_notes(root, extensions=EXTENSIONS):
+    """Yield (path, size, mtime_ns) of every note file under root, depth first."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+        except OSError:
+            continue
+        for entry in reversed(entries):
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+        for entry in entries:
+            if entry.name.endswith(extensions) and entry.is_file():
+                stat = entry.stat()
+                yield entry.path, stat.st_size, stat.st_mtime_ns
+
+
+class Manifest:
+    """path -> (size, mtime_ns, sha256) of the files already processed."""
+
+    def __init__(self, path=DEFAULT_MANIFEST):
+        self.path = path
+        self.before_commit = None  # called before each commit, to sync what the rows describe
+        if path != ':memory:':
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, sha256 TEXT)")
+        self.db.commit()
+        self._writes = 0
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def entries(self):
+        """{path: (size, mtime_ns, sha256)} of every recorded file."""
+        rows = self.db.execute("SELECT path, size, mtime_ns, sha256 FROM files")
+        return {path: (size, mtime_ns, sha256) for path, size, mtime_ns, sha256 in rows}
+
+    def record(self, path, size, mtime_ns, sha256):
+        self.db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                        (path, size, mtime_ns, sha256))
+        self._wrote()
+
+    def forget(self, paths):
+        self.db.executemany("DELETE FROM files WHERE path = ?", ((path,) for path in paths))
+        self._wrote()
+
+    def _wrote(self):
+        self._writes += 1
+        if self._writes >= COMMIT_EVERY:
+            self.commit()
+
+    def commit(self):
+        if self.before_commit is not None:
+            self.before_commit()
+        self.db.commit()
+        self._writes = 0
+
+    def close(self):
+        self.commit()
+        self.db.close()
+
+
+class Progress:
+    """Live notes/sec and MB/sec on one terminal line."""
+
+    def __init__(self, stream=sys.stderr, interval=1.0):
+        self.stream = stream
+        self.interval = interval
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.notes = 0
+        self.bytes = 0
+
+    def add(self, size):
+        self.notes += 1
+        self.bytes += size
+        now = time.perf_counter()
+        if self.stream is not None and now - self.last >= self.interval:
+            self.last = now
+            self.stream.write(f"\r{self.line()}")
+            self.stream.flush()
+
+    def rates(self):
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        return self.notes / elapsed, self.bytes / elapsed / 1e6
+
+    def line(self):
+        notes_per_second, mb_per_second = self.rates()
+        return (f"{self.notes} notes processed, {notes_per_second:.0f} notes/s, "
+                f"{mb_per_second:.2f} MB/s")
+
+    def finish(self):
+        if self.stream is not None:
+            self.stream.write(f"\r{self.line()}\n")
+            self.stream.flush()
+
+
+def ingest(root, output, processor_cls=None, processor_kwargs=None,
+           manifest=DEFAULT_MANIFEST, workers=None, chunksize=16, force=False,
+           extensions=EXTENSIONS, progress=sys.stderr):
+    """
+    Process every new or changed note under root.
+
+    Args:
+        root: Directory tree of notes (result paths are made absolute)
+        output: JSONL file the results are appended to
+        processor_cls: Processor with structure_note (default: NoteProcessor)
+        processor_kwargs: Constructor arguments for processor_cls
+        manifest: Manifest path (or a Manifest)
+        workers: Worker processes (default: all cores)
+        chunksize: Notes per task sent to a worker
+        force: Process every file, changed or not
+        extensions: File name endings that count as notes
+        progress: Stream for the live rate line (None for silence)
+
+    Returns:
+        Dict of counts: scanned, processed, unchanged (same stat),
+        touched (new stat, same content), removed, failed (unreadable,
+        or the processor raised); plus
+        seconds, notes_per_second and mb_per_second over processed files.
+    """
+    if processor_cls is None:
+        from src.note_processor.final_processor import NoteProcessor
+        processor_cls = NoteProcessor
+    own_manifest = not isinstance(manifest, Manifest)
+    if own_manifest:
+        manifest = Manifest(manifest)
+
+    # 'notes', './notes/' and the absolute path share manifest rows
+    root = os.path.abspath(root)
+    # Manifest rows of files under root; whatever the walk does not meet again is gone
+    prefix = os.path.join(root, '')
+    known = {path: row for path, row in manifest.entries().items() if path.startswith(prefix)}
+    stats = dict.fromkeys(('scanned', 'processed', 'unchanged', 'touched', 'removed', 'failed'), 0)
+    pending = {}  # path -> (size, mtime_ns, sha256) of files sent to the pool
+    meter = Progress(progress)
+
+    def changed_notes():
+        for path, size, mtime_ns in walk_notes(root, extensions):
+            stats['scanned'] += 1
+            previous = known.pop(path, None)
+            if not force and previous is not None and previous[:2] == (size, mtime_ns):
+                stats['unchanged'] += 1
+                continue
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                stats['failed'] += 1
+                continue
+            sha256 = hashlib.sha256(data).hexdigest()
+            if not force and previous is not None and previous[2] == sha256:
+                manifest.record(path, size, mtime_ns, sha256)
+                stats['touched'] += 1
+                continue
+            pending[path] = (size, mtime_ns, sha256)
+            yield path, data.decode('utf-8', errors='replace')
+
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    try:
+        with open(output, 'a', encoding='utf-8') as out:
+            def sync():
+                # Rows committed to the manifest must not outrun the results on disk
+                out.flush()
+                os.fsync(out.fileno())
+
+            manifest.before_commit = sync
+            try:
+                for path, result in batch.structure_notes(
+                        processor_cls, changed_notes(), processor_kwargs, workers=workers,
+                        chunksize=chunksize, ordered=False, sources=True, return_exceptions=True):
+                    size, mtime_ns, sha256 = pending.pop(path)
+                    if isinstance(result, Exception):
+                        stats['failed'] += 1
+                        continue
+                    out.write(json.dumps({'path': path, 'sha256': sha256, 'result': result},
+                                         default=plain) + '\n')
+                    manifest.record(path, size, mtime_ns, sha256)
+                    stats['processed'] += 1
+                    meter.add(size)
+                manifest.forget(known)
+                stats['removed'] = len(known)
+            finally:
+                manifest.commit()
+                manifest.before_commit = None
+    finally:
+        if own_manifest:
+            manifest.close()
+    meter.finish()
+
+    stats['seconds'] = time.perf_counter() - meter.start
+    stats['notes_per_second'], stats['mb_per_second'] = meter.rates()
+    return stats
@@ -0,0 +1,143 @@
+"""
+Keyword Matcher
+Find every occurrence of many literal phrases in one left-to-right scan.
+
+The phrases are merged into a trie and the trie is compiled into a single
+regex (step|second|... becomes s(?:econd|t(?:atistic|ep))|...), so the
+scan walks shared prefixes once per text position instead of once per
+phrase. At each position the regex reports the longest phrase starting
+there; the shorter phrases that are its prefixes start there too and are
+looked up from a table built with the trie (the output sets of an
+Aho-Corasick automaton). Cost grows with the text, barely with the
+number of phrases.
+
+NoteTypeClassifier scores BasicNoteProcessor's note types with it.
+"""
+
+import re
+from bisect import bisect_right
+from collections import Counter
+from typing import Dict, Iterable, List
+
+from src.note_processor.segmentation import as_document
+
+SEPARATOR = '\x00'  # joins a batch; no phrase contains it, so no match crosses notes
+
+NOTE_TYPE_INDICATORS = {
+    'procedural': ('step', 'first', 'second', 'then', 'next', 'finally', 'how to'),
+    'conceptual': ('define', 'concept', 'theory', 'principle', 'means', 'refers to'),
+    'factual': ('fact', 'data', 'statistic', 'number', 'date', 'year'),
+    'analytical': ('compare', 'contrast', 'analyze', 'however', 'whereas', 'although'),
+}
+GENERAL = 'general'  # note type of a note without indicators
+
+
+def _trie_regex(node):
+    """Regex of a trie node; '' marks the end of a phrase."""
+    branches = [re.escape(char) + _trie_regex(child)
+                for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    return '(?:' + body + ')?' if '' in node else body
+
+
+class KeywordMatcher:
+    """All occurrences of a fixed set of phrases, overlapping ones included."""
+
+    def __init__(self, phrases: Iterable[str]):
+        self.phrases = tuple(dict.fromkeys(phrases))
+        if not all(self.phrases) or any(SEPARATOR in phrase for phrase in self.phrases):
+            raise ValueError("phrases must be non-empty and free of NUL characters")
+        trie = {}
+        for phrase in self.phrases:
+            node = trie
+            for char in phrase:
+                node = node.setdefault(char, {})
+            node[''] = {}
+        # phrase -> the phrases that are prefixes of it, itself included
+        self.prefixes = {}
+        for phrase in self.phrases:
+            node, found = trie, []
+            for i, char in enumerate(phrase, 1):
+                node = node[char]
+                if '' in node:
+                    found.append(phrase[:i])
+            self.prefixes[phrase] = tuple(found)
+        self.regex = re.compile(_trie_regex(trie)) if self.phrases else None
+
+    def finditer(self, text: str, pos: int = 0):
+        """Yield (start, phrase) for every occurrence, in order of start."""
+        if self.regex is None:
+            return
+        search = self.regex.search
+        m = search(text, pos)
+        while m:
+            start = m.start()
+            for phrase in self.prefixes[m.group()]:
+                yield start, phrase
+            m = search(text, start + 1)
+
+    def counts(self, text: str) -> Counter:
+        """Occurrences of each phrase in the text."""
+        return Counter(phrase for _, phrase in self.finditer(text))
+
+    def present(self, text: str) -> set:
+        """The phrases that occur in the text; stops once all have been seen."""
+        found = set()
+        for _, phrase in self.finditer(text):
+            found.add(phrase)
+            if len(found) == len(self.phrases):
+                break
+        return found
+
+
+class NoteTypeClassifier:
+    """
+    Score note types by how many of their indicator phrases a note contains.
+
+    The type with the most indicators present wins (earlier types win ties);
+    a note with none is 'general'.
+    """
+
+    def __init__(self, indicators: Dict[str, Iterable[str]] = NOTE_TYPE_INDICATORS):
+        self.types = tuple(indicators)
+        # Every label classify can return
+        self.note_types = frozenset(self.types) | {GENERAL}
+        self.labels = {}  # phrase -> note types it indicates
+        for note_type, phrases in indicators.items():
+            for phrase in phrases:
+                self.labels.setdefault(phrase.lower(), []).append(note_type)
+        self.matcher = KeywordMatcher(self.labels)
+
+    def scores(self, found) -> Dict[str, int]:
+        scores = dict.fromkeys(self.types, 0)
+        for phrase in found:
+            for note_type in self.labels[phrase]:
+                scores[note_type] += 1
+        return scores
+
+    def pick(self, scores) -> str:
+        note_type = max(scores, key=scores.get)
+        return note_type if scores[note_type] > 0 else GENERAL
+
+    def classify(self, text) -> str:
+        """Note type of a note (str or SegmentedDocument)."""
+        return self.pick(self.scores(self.matcher.present(as_document(text).lower)))
+
+    def classify_many(self, texts) -> List[str]:
+        """
+        Note types of many notes from one scan of their joined lowercase text.
+
+        The notes are held in memory together; for an unbounded stream,
+        call classify per note.
+        """
+        lowered = [as_document(text).lower for text in texts]
+        starts, offset = [], 0
+        for text in lowered:
+            starts.append(offset)
+            offset += len(text) + 1
+        found = [set() for _ in lowered]
+        for start, phrase in self.matcher.finditer(SEPARATOR.join(lowered)):
+            found[bisect_right(starts, start) - 1].add(phrase)
+        return [self.pick(self.scores(phrases)) for phrases in found]
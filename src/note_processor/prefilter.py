@@ -0,0 +1,75 @@
+"""
+Trigger Prefilter
+Decides, in one pass over a note, which definition patterns can match.
+
+Every pattern needs one of its anchor tokens ("is/are", "was/were", ":",
+"means", "refers", "known", "consist", "contain", "which") as a
+whitespace-delimited word in any match. The prefilter runs the combined
+anchor regex once, stopping early when every trigger has been seen, and
+records where each trigger first occurs. Patterns with none of their
+triggers in the note are skipped. The others start matching at the
+sentence holding their first trigger: no term contains a '.', so no match
+can begin before the last '.' preceding that trigger.
+"""
+
+import time
+
+from src.note_processor.definition_patterns import finditer_windows, load_patterns
+from src.note_processor.fused_scanner import anchor_reach, build_anchor_regex
+
+
+class TriggerPrefilter:
+    """Skip patterns whose trigger literals are absent from a note."""
+
+    def __init__(self, patterns=None):
+        if patterns is None:
+            patterns = load_patterns()
+        self.patterns = patterns
+        self.anchor_regex = build_anchor_regex(patterns)
+        self.anchor_reach = anchor_reach(patterns)
+        self.tokens = frozenset(token for entry in patterns for token in entry.anchors)
+        # Distinct anchor tuples, and each pattern's index into them
+        self.anchor_sets = list(dict.fromkeys(entry.anchors for entry in patterns))
+        self.entries = [(entry, self.anchor_sets.index(entry.anchors)) for entry in patterns]
+
+    def triggers(self, text, deadline=None):
+        """
+        Map each trigger present in the text to its first position.
+
+        If time.perf_counter() passes deadline before the search is done,
+        the triggers not seen yet are placed at 0, which skips nothing.
+        """
+        first = {}
+        remaining = len(self.tokens)
+        for m in finditer_windows(self.anchor_regex, text, deadline=deadline,
+                                  reach=self.anchor_reach):
+            token = m.group(1) or ':'
+            if token not in first:
+                first[token] = m.start()
+                remaining -= 1
+                if not remaining:
+                    return first
+        if deadline is not None and time.perf_counter() > deadline:
+            for token in self.tokens - first.keys():
+                first[token] = 0
+        return first
+
+    def plan(self, text, deadline=None):
+        """
+        Where each pattern has to start matching.
+
+        Returns (entry, pos) pairs in table order, for the patterns that can
+        match: pos is the start of the sentence holding the pattern's
+        first trigger.
+        """
+        first = self.triggers(text, deadline)
+        if not first:
+            return []
+        starts = []
+        for anchors in self.anchor_sets:
+            pos = None
+            for token in anchors:
+                if token in first and (pos is None or first[token] < pos):
+                    pos = first[token]
+            starts.append(None if pos is None else text.rfind('.', 0, pos) + 1)
+        return [(entry, starts[i]) for entry, i in self.entries if starts[i] is not None]
@@ -0,0 +1,77 @@
+"""
+Pattern Profiling
+Per-pattern cost and yield of definition extraction.
+
+analyze_pattern_usage.py only sees the definitions that survive. A
+PatternProfile also records, per pattern label, the time spent matching,
+the raw match count, how many candidates the validator rejected, how many
+were dropped as duplicates of an earlier definition and how many were
+accepted. Processors fill it only when built with profile=True, and
+profiles of several processes or batches can be merged.
+"""
+
+
+class PatternStats:
+    """Counters for one pattern."""
+
+    __slots__ = ('runs', 'time', 'matches', 'rejected', 'duplicates', 'accepted')
+
+    def __init__(self):
+        self.runs = 0          # notes the pattern was run on
+        self.time = 0.0        # seconds spent matching
+        self.matches = 0       # raw regex matches
+        self.rejected = 0      # matches the validator refused
+        self.duplicates = 0    # valid matches dropped by dedupe
+        self.accepted = 0      # definitions produced
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class PatternProfile:
+    """Per-pattern statistics, aggregated over every note processed."""
+
+    def __init__(self):
+        self.notes = 0
+        self.patterns = {}  # label -> PatternStats, in first-run order
+
+    def record(self, label, time=0.0, matches=0, rejected=0, duplicates=0, accepted=0):
+        """Add one run of a pattern over one note."""
+        stats = self.patterns.get(label)
+        if stats is None:
+            stats = self.patterns[label] = PatternStats()
+        stats.runs += 1
+        stats.time += time
+        stats.matches += matches
+        stats.rejected += rejected
+        stats.duplicates += duplicates
+        stats.accepted += accepted
+
+    def merge(self, other):
+        """Fold another profile (e.g. from a worker process) into this one."""
+        self.notes += other.notes
+        for label, theirs in other.patterns.items():
+            stats = self.patterns.get(label)
+            if stats is None:
+                stats = self.patterns[label] = PatternStats()
+            for name in PatternStats.__slots__:
+                setattr(stats, name, getattr(stats, name) + getattr(theirs, name))
+        return self
+
+    def as_dict(self):
+        return {
+            'notes': self.notes,
+            'patterns': {label: stats.as_dict() for label, stats in self.patterns.items()}
+        }
+
+    def report(self):
+        """Text table, most expensive pattern first."""
+        lines = [f"{'Pattern':<25} {'ms':>8} {'matches':>8} {'rejected':>8} "
+                 f"{'dupes':>6} {'accepted':>8} {'ms/accepted':>11}"]
+        ranked = sorted(self.patterns.items(), key=lambda item: item[1].time, reverse=True)
+        for label, s in ranked:
+            per_accepted = f"{s.time * 1000 / s.accepted:.3f}" if s.accepted else '-'
+            lines.append(f"{label:<25} {s.time * 1000:>8.2f} {s.matches:>8} {s.rejected:>8} "
+                         f"{s.duplicates:>6} {s.accepted:>8} {per_accepted:>11}")
+        lines.append(f"{self.notes} notes profiled")
+        return '\n'.join(lines)
@@ -0,0 +1,210 @@
+"""
+Compact Records
+Slotted record types and a columnar table for extraction results.
+
+Every definition and relationship used to be a dict: a hash table of
+three or four keys per hit, which dominates memory once a corpus-wide
+result set is kept, and pickles slowly between pool workers. Definition
+and Relationship are __slots__ records that read like those dicts
+(d['term'], d.get('pattern'), dict(d), == against a dict), and pickle as
+a bare constructor call. Processors return them when built with
+compact=True.
+
+RecordTable goes further for whole result sets: one column per field
+(plain lists for the strings, an array of codes into an interned label
+list for pattern and relationship type, a float array for confidence)
+and an array of row offsets per note. table[i] gives note i's records.
+"""
+
+from array import array
+from collections.abc import Mapping
+from itertools import accumulate, chain
+from operator import attrgetter
+
+
+class Definition(Mapping):
+    """One definition: term, definition and (for most processors) pattern.
+
+    pattern=None stands for a processor that does not report one, and is
+    then left out of the keys, as in that processor's dicts.
+    """
+
+    __slots__ = ('term', 'definition', 'pattern')
+
+    FIELDS = ('term', 'definition', 'pattern')
+    LABELS = ('pattern',)
+
+    def __init__(self, term, definition, pattern=None):
+        self.term = term
+        self.definition = definition
+        self.pattern = pattern
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['term'], d['definition'], d.get('pattern'))
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS or (key == 'pattern' and self.pattern is None):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.FIELDS if self.pattern is not None else self.FIELDS[:2])
+
+    def __len__(self):
+        return 3 if self.pattern is not None else 2
+
+    def __reduce__(self):
+        return type(self), (self.term, self.definition, self.pattern)
+
+    def as_dict(self):
+        return dict(self)
+
+    def __repr__(self):
+        return f"Definition({self.as_dict()!r})"
+
+
+class Relationship(Mapping):
+    """One relationship edge: source, target, type and confidence."""
+
+    __slots__ = ('source', 'target', 'type', 'confidence')
+
+    FIELDS = ('source', 'target', 'type', 'confidence')
+    LABELS = ('type',)
+
+    def __init__(self, source, target, type, confidence):
+        self.source = source
+        self.target = target
+        self.type = type
+        self.confidence = confidence
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['source'], d['target'], d['type'], d['confidence'])
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return 4
+
+    def __reduce__(self):
+        return type(self), (self.source, self.target, self.type, self.confidence)
+
+    def as_dict(self):
+        return dict(self)
+
+    def __repr__(self):
+        return f"Relationship({self.as_dict()!r})"
+
+
+def compact(records, record_type=Definition):
+    """Convert a list of result dicts (or records) to record_type records."""
+    return [record_type.from_dict(r) for r in records]
+
+
+def plain(value):
+    """
+    json.dumps default= for results: records and DefinitionSpans become
+    dicts, TextSpans (and anything else) strings.
+    """
+    return dict(value) if hasattr(value, 'keys') else str(value)
+
+
+class RecordTable:
+    """Columnar store of the records of many notes.
+
+    Label fields (pattern, type) are stored as codes into self.labels,
+    confidence as a float array, other fields as lists of strings.
+    """
+
+    def __init__(self, record_type=Definition):
+        self.record_type = record_type
+        self.labels = []      # interned label strings, by code
+        self._codes = {}      # label -> code
+        self.columns = {}
+        for name in record_type.FIELDS:
+            if name in record_type.LABELS:
+                self.columns[name] = array('H')
+            elif name == 'confidence':
+                self.columns[name] = array('d')
+            else:
+                self.columns[name] = []
+        self.offsets = array('Q', [0])  # note i's rows are offsets[i]:offsets[i + 1]
+
+    def append(self, records):
+        """Add one note's records (dicts or records)."""
+        return self.extend([records])
+
+    def extend(self, results):
+        """Add the records of several notes, one list per note."""
+        results = [list(records) for records in results]
+        flat = list(chain.from_iterable(results))
+        labels = self.record_type.LABELS
+        as_records = all(isinstance(record, self.record_type) for record in flat)
+        for name, column in self.columns.items():
+            if as_records:
+                values = map(attrgetter(name), flat)
+            else:
+                values = [record.get(name) for record in flat]
+            if name in labels:
+                codes = self._codes
+                values = [codes[value] if value in codes else self._code(value)
+                          for value in values]
+            column.extend(values)
+        base = self.offsets[-1]
+        self.offsets.extend(base + end for end in accumulate(map(len, results)))
+        return self
+
+    def __len__(self):
+        """Number of notes."""
+        return len(self.offsets) - 1
+
+    @property
+    def rows(self):
+        """Number of records over all notes."""
+        return self.offsets[-1]
+
+    def __getitem__(self, note):
+        if note < 0:
+            note += len(self)
+        if not 0 <= note < len(self):
+            raise IndexError(note)
+        return self._records(self.offsets[note], self.offsets[note + 1])
+
+    def __iter__(self):
+        """Each note's records; builds them all in one pass."""
+        records = self._records(0, self.rows)
+        offsets = self.offsets
+        for note in range(len(self)):
+            yield records[offsets[note]:offsets[note + 1]]
+
+    def record(self, row):
+        """The record at a global row index."""
+        return self._records(row, row + 1)[0]
+
+    def _records(self, start, end):
+        labels = self.record_type.LABELS
+        label_of = self.labels.__getitem__
+        columns = [map(label_of, column[start:end]) if name in labels else column[start:end]
+                   for name, column in self.columns.items()]
+        return list(map(self.record_type, *columns))
+
+    def _code(self, label):
+        code = self._codes.get(label)
+        if code is None:
+            code = self._codes[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+    def __getstate__(self):
+        return self.record_type, self.labels, self.columns, self.offsets
+
+    def __setstate__(self, state):
+        self.record_type, self.labels, self.columns, self.offsets = state
+        self._codes = {label: code for code, label in enumerate(self.labels)}
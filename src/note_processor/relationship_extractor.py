@@ -5,43 +5,133 @@ Extracts semantic relationships between concepts for knowledge graph
 
 import re
 
+from src.note_processor.records import Relationship, compact
+from src.note_processor.segmentation import as_document
+
+# The relationship patterns have the shape (\w+(?:\s+\w+)*)\s+ANCHOR\s+(\w+(?:\s+\w+)*).
+# Run by re.search, the greedy first group backtracks over every word of a
+# long line, which is quadratic in the line length. They are matched here
+# with the same result in linear time: a match lies inside one run of
+# whitespace-separated words, the first run holding the anchor followed by
+# another word, and the greedy group picks that run's last such anchor.
+WORD_RUN = re.compile(r'\w+(?:\s+\w+)*')
+NEXT_WORD = re.compile(r'\s+')
+
+EXAMPLE_OF = re.compile(r'(?<=\w)\s+is\s+an?\s+example\s+of(?=\s+\w)')
+PART_OF = re.compile(r'(?<=\w)\s+is\s+(?:a\s+)?part\s+of(?=\s+\w)')
+CONSISTS_OF = re.compile(r'(?<=\w)\s+consists?\s+of(?=\s+\w)')
+REQUIRES = re.compile(r'(?<=\w)\s+requires?(?=\s+\w)')
+BUILDS_ON = re.compile(r'(?<=\w)\s+builds?\s+on(?=\s+\w)')
+# Optional words between the anchor and the second group
+THE = re.compile(r'the\s+(?=\w)')
+UNDERSTANDING_OF = re.compile(r'understanding\s+of\s+(?=\w)')
+
+SUCH_AS = re.compile(r'such\s+as\s+(\w+(?:\s+\w+)*)')
+
+# A literal every relationship pattern needs; lines without one are skipped
+RELATION_WORDS = ('example', 'such', 'part', 'consist', 'require', 'build')
+
+
+def search_relation(line, keyword, anchor, skip=None):
+    r"""
+    Same groups as re.search(r'(W)' + anchor + skip? + r'(W)', line), with
+    W = \w+(?:\s+\w+)*, in linear time. keyword is a literal every anchor
+    contains, used to skip lines quickly. Returns None or (first, second).
+    """
+    if keyword not in line:
+        return None
+    for run in WORD_RUN.finditer(line):
+        words = run.group()
+        last = None
+        for last in anchor.finditer(words):
+            pass
+        if last is None:
+            continue
+        rest = words[NEXT_WORD.match(words, last.end()).end():]
+        if skip is not None:
+            optional = skip.match(rest)
+            if optional:
+                rest = rest[optional.end():]
+        return words[:last.start()], rest
+    return None
+
+
 class RelationshipExtractor:
-    """Extract relationships between concepts."""
+    """Extract relationships between concepts.
+    
+    compact=True returns slotted Relationship records instead of dicts.
+    """
     
-    def __init__(self):
-        pass
+    def __init__(self, compact=False):
+        self.compact = compact
     
     def extract_relationships(self, text, definitions):
         """
         Extract relationships from text given known definitions.
         
         Args:
-            text: Raw note text
+            text: Raw note text or a SegmentedDocument
             definitions: List of extracted definitions with terms
         
         Returns:
             List of relationships: [{'source': term1, 'target': term2, 'type': rel_type}]
         """
-        relationships = []
         terms = [d['term'].lower() for d in definitions]
         
         if len(terms) < 2:
-            return relationships  # Need at least 2 terms for relationships
+            return []  # Need at least 2 terms for relationships
         
-        # RELATIONSHIP TYPE 1: IS_EXAMPLE_OF
-        # Pattern: "X is an example of Y"
-        # Pattern: "For instance, X demonstrates Y"
-        # Pattern: "such as X" after mentioning Y
+        # One pass over the lines that hold a relationship word, each
+        # lowercased once and matched against every family
+        doc = as_document(text)
+        lower_lines = doc.lower_lines
+        candidates = []
+        for index in doc.lines_containing(RELATION_WORDS):
+            line_lower = lower_lines[index]
+            found = self.line_matches(line_lower)
+            if found is not None:
+                candidates.append((line_lower, found))
+        return self.relationships_from(candidates, terms)
+    
+    def line_matches(self, line_lower):
+        """
+        Raw pattern matches on one lowercase line, before any term check:
+        (example_of, such_as, part_of, consists_of, requires, builds_on),
+        or None when nothing matched. They depend on the line alone, so
+        they can be kept for lines that did not change.
+        """
+        such_as = SUCH_AS.search(line_lower)
+        found = (search_relation(line_lower, 'example', EXAMPLE_OF),
+                 such_as.group(1).strip() if such_as else None,
+                 search_relation(line_lower, 'part', PART_OF, THE),
+                 search_relation(line_lower, 'consist', CONSISTS_OF),
+                 search_relation(line_lower, 'require', REQUIRES, UNDERSTANDING_OF),
+                 search_relation(line_lower, 'build', BUILDS_ON))
+        if found == (None,) * 6:
+            return None
+        return found
+    
+    def relationships_from(self, candidates, terms):
+        """
+        Keep the candidate matches whose sides are known terms.
         
-        for line in text.split('\n'):
-            line_lower = line.lower()
+        Args:
+            candidates: (line_lower, line_matches(line_lower)) pairs in line order
+            terms: Lowercase definition terms
+        """
+        examples, parts, prerequisites = [], [], []
+        for line_lower, found in candidates:
+            # RELATIONSHIP TYPE 1: IS_EXAMPLE_OF
+            # Pattern: "X is an example of Y"
+            # Pattern: "For instance, X demonstrates Y"
+            # Pattern: "such as X" after mentioning Y
             
             # "X is an example of Y"
-            match = re.search(r'(\w+(?:\s+\w+)*)\s+is\s+an?\s+example\s+of\s+(\w+(?:\s+\w+)*)', line_lower)
+            match = found[0]
             if match:
-                source, target = match.groups()
+                source, target = match
                 if any(source in t or t in source for t in terms) and any(target in t or t in target for t in terms):
-                    relationships.append({
+                    examples.append({
                         'source': source.strip().title(),
                         'target': target.strip().title(),
                         'type': 'is_example_of',
@@ -49,35 +139,31 @@ class RelationshipExtractor:
                     })
             
             # "such as X" (X is example of previous term)
-            match = re.search(r'such\s+as\s+(\w+(?:\s+\w+)*)', line_lower)
-            if match:
-                example = match.group(1).strip()
+            example = found[1]
+            if example is not None:
                 # Look for term mentioned earlier in same sentence
                 for term in terms:
                     if term in line_lower and term != example:
                         if any(example in t or t in example for t in terms):
-                            relationships.append({
+                            examples.append({
                                 'source': example.title(),
                                 'target': term.title(),
                                 'type': 'is_example_of',
                                 'confidence': 0.7
                             })
                             break
-        
-        # RELATIONSHIP TYPE 2: IS_PART_OF
-        # Pattern: "X is part of Y"
-        # Pattern: "Y consists of X"
-        # Pattern: "Y contains X"
-        
-        for line in text.split('\n'):
-            line_lower = line.lower()
+            
+            # RELATIONSHIP TYPE 2: IS_PART_OF
+            # Pattern: "X is part of Y"
+            # Pattern: "Y consists of X"
+            # Pattern: "Y contains X"
             
             # "X is part of Y"
-            match = re.search(r'(\w+(?:\s+\w+)*)\s+is\s+(?:a\s+)?part\s+of\s+(?:the\s+)?(\w+(?:\s+\w+)*)', line_lower)
+            match = found[2]
             if match:
-                source, target = match.groups()
+                source, target = match
                 if any(source in t or t in source for t in terms) and any(target in t or t in target for t in terms):
-                    relationships.append({
+                    parts.append({
                         'source': source.strip().title(),
                         'target': target.strip().title(),
                         'type': 'is_part_of',
@@ -85,31 +171,28 @@ class RelationshipExtractor:
                     })
             
             # "Y consists of X"
-            match = re.search(r'(\w+(?:\s+\w+)*)\s+consists?\s+of\s+(\w+(?:\s+\w+)*)', line_lower)
+            match = found[3]
             if match:
-                target, source = match.groups()  # Reversed!
+                target, source = match  # Reversed!
                 if any(source in t or t in source for t in terms) and any(target in t or t in target for t in terms):
-                    relationships.append({
+                    parts.append({
                         'source': source.strip().title(),
                         'target': target.strip().title(),
                         'type': 'is_part_of',
                         'confidence': 0.8
                     })
-        
-        # RELATIONSHIP TYPE 3: PREREQUISITE
-        # Pattern: "Before learning X, students must know Y"
-        # Pattern: "X requires understanding of Y"
-        # Pattern: "X builds on Y"
-        
-        for line in text.split('\n'):
-            line_lower = line.lower()
+            
+            # RELATIONSHIP TYPE 3: PREREQUISITE
+            # Pattern: "Before learning X, students must know Y"
+            # Pattern: "X requires understanding of Y"
+            # Pattern: "X builds on Y"
             
             # "X requires Y"
-            match = re.search(r'(\w+(?:\s+\w+)*)\s+requires?\s+(?:understanding\s+of\s+)?(\w+(?:\s+\w+)*)', line_lower)
+            match = found[4]
             if match:
-                source, target = match.groups()
+                source, target = match
                 if any(source in t or t in source for t in terms) and any(target in t or t in target for t in terms):
-                    relationships.append({
+                    prerequisites.append({
                         'source': target.strip().title(),  # Y is prerequisite for X
                         'target': source.strip().title(),
                         'type': 'is_prerequisite_for',
@@ -117,17 +200,22 @@ class RelationshipExtractor:
                     })
             
             # "X builds on Y"
-            match = re.search(r'(\w+(?:\s+\w+)*)\s+builds?\s+on\s+(\w+(?:\s+\w+)*)', line_lower)
+            match = found[5]
             if match:
-                source, target = match.groups()
+                source, target = match
                 if any(source in t or t in source for t in terms) and any(target in t or t in target for t in terms):
-                    relationships.append({
+                    prerequisites.append({
                         'source': target.strip().title(),  # Y is prerequisite for X
                         'target': source.strip().title(),
                         'type': 'is_prerequisite_for',
                         'confidence': 0.7
                     })
         
+        # One family after another, as when each had its own pass
+        relationships = examples + parts + prerequisites
+        
+        if self.compact:
+            return compact(relationships, Relationship)
         return relationships
 
 
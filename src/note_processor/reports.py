@@ -0,0 +1,153 @@
+"""
+Report Rendering
+Stream structured notes to a file-like sink as Markdown, plain text or JSONL.
+
+The renderers are generators of lines, so a report over a whole batch
+(for example straight from structure_notes) is written one line at a
+time and never held in memory. They take results of either processor:
+NoteProcessor's ('concepts', no original text) and BasicNoteProcessor's
+('key_concepts', 'note_type', 'original_text').
+
+The original text is usually the bulk of a report. max_original=None
+keeps it whole, 0 leaves it out and n keeps its first n characters.
+
+NoteProcessor.format_output and BasicNoteProcessor.format_structured_note
+are these renderers joined into one string.
+"""
+
+import json
+
+from src.note_processor.records import plain
+
+FORMATS = ('markdown', 'text', 'jsonl')
+
+
+def _concepts(result):
+    return result['concepts'] if 'concepts' in result else result.get('key_concepts', [])
+
+
+def _original(result, max_original):
+    """The original text to show, or None to leave it out."""
+    text = result.get('original_text')
+    if text is None or max_original == 0:
+        return None
+    if max_original is not None and len(text) > max_original:
+        return text[:max_original] + "..."
+    return text
+
+
+def markdown_lines(result, title="Structured Note", max_original=None):
+    """A structured note as Markdown, line by line."""
+    yield f"# {title}"
+    if 'note_type' in result:
+        yield f"\n**Note Type**: {result['note_type'].title()}"
+        yield f"**Word Count**: {result['word_count']}"
+    else:
+        yield f"\n**Word Count**: {result['word_count']}"
+
+    yield f"\n## Key Concepts"
+    for concept in _concepts(result):
+        yield f"- {concept.title()}"
+
+    if result['definitions']:
+        yield f"\n## Definitions"
+        for defn in result['definitions']:
+            yield f"- **{defn['term']}**: {defn['definition']}"
+
+    if result['examples']:
+        yield f"\n## Examples"
+        for example in result['examples']:
+            yield f"- {example}"
+
+    original = _original(result, max_original)
+    if original is not None:
+        yield f"\n## Original Text"
+        yield f"{original}"
+
+
+def text_lines(result, filename="", max_original=None):
+    """A structured note as the plain-text report, line by line."""
+    if filename:
+        yield f"\n{'='*70}"
+        yield f"📄 {filename}"
+
+    yield f"{'='*70}"
+
+    concepts = _concepts(result)
+    yield f"\n📌 CONCEPTS ({len(concepts)}):"
+    if concepts:
+        for i, concept in enumerate(concepts, 1):
+            yield f"   {i}. {concept}"
+    else:
+        yield "   (none found)"
+
+    if result['definitions']:
+        yield f"\n📖 DEFINITIONS ({len(result['definitions'])}):"
+        for defn in result['definitions']:
+            definition = defn['definition']
+            if len(definition) > 65:
+                definition = definition[:65] + "..."
+            yield f"   • {defn['term']}: {definition}"
+
+    if result['examples']:
+        yield f"\n💡 EXAMPLES ({len(result['examples'])}):"
+        for example in result['examples']:
+            if len(example) > 65:
+                example = example[:65] + "..."
+            yield f"   • {example}"
+
+    original = _original(result, max_original)
+    if original is not None:
+        yield f"\n📝 ORIGINAL TEXT:"
+        yield original
+
+    yield f"\n📊 STATS:"
+    yield f"   Words: {result['word_count']}"
+    yield f"   Concepts: {len(concepts)}"
+    yield f"   Definitions: {len(result['definitions'])}"
+
+    yield f"{'='*70}\n"
+
+
+def jsonl_line(note_id, result, max_original=None):
+    """One JSON object per note; records and spans are written as dicts and strings."""
+    record = {'note_id': note_id}
+    record.update(result)
+    if 'original_text' in result:
+        original = _original(result, max_original)
+        if original is None:
+            del record['original_text']
+        else:
+            record['original_text'] = original
+    return json.dumps(record, default=plain)
+
+
+def write_report(notes, sink, fmt='markdown', max_original=None):
+    """
+    Render (note_id, result) pairs to sink one line at a time.
+
+    Args:
+        notes: Iterable of (note_id, result) pairs, e.g. structure_notes output
+        sink: File-like object with write()
+        fmt: 'markdown', 'text' or 'jsonl'
+        max_original: Original text: None whole, 0 left out, n first n characters
+
+    Returns:
+        Number of notes written
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}, expected one of {FORMATS}")
+    count = 0
+    for note_id, result in notes:
+        if fmt == 'jsonl':
+            sink.write(jsonl_line(note_id, result, max_original) + '\n')
+        else:
+            if fmt == 'markdown':
+                lines = markdown_lines(result, title=note_id, max_original=max_original)
+            else:
+                lines = text_lines(result, filename=note_id, max_original=max_original)
+            for line in lines:
+                sink.write(line)
+                sink.write('\n')
+        count += 1
+    return count
@@ -0,0 +1,240 @@
+"""
+Result Cache
+Content-addressed cache for structure_note results.
+
+Results are keyed by (SHA-256 of the note text, processor class, pattern
+version). A bounded in-memory LRU sits in front of a SQLite store under
+database/, which is itself bounded and evicts the least recently used
+entries. The pattern version fingerprints everything that decides a
+processor's output: its code version (the source of its module and of
+the modules shared by every processor: pattern packs, domain routes,
+token classes), its pattern table (regexes, flags, thresholds and
+validator source), the word sets its validators look up (pronouns, stop
+and skip words) and its configuration (scalar options). It is computed
+on every lookup, so a processor reconfigured after its first lookup gets
+its own entries.
+
+Editing a module changes the code version, so old entries stop matching
+and are purged from disk the next time that processor class is used.
+Two configurations of one class only differ in the key: their entries
+live side by side.
+
+Both tiers hold JSON, so every hit returns a fresh copy the caller may
+modify freely. A miss returns the same JSON form (records and spans as
+dicts, text spans as strings), so callers see one type either way. Disk
+writes are committed in batches (and when the cache is closed or the
+interpreter exits): a lost entry only costs a recompute.
+"""
+
+import functools
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import sqlite3
+import sys
+import time
+import weakref
+from collections import OrderedDict
+
+from src.note_processor.records import plain
+from src.note_processor.token_classes import TokenClasses
+
+DEFAULT_PATH = os.path.join('database', 'note_cache.sqlite3')
+COMMIT_EVERY = 64  # disk writes per transaction
+# Modules whose tables decide extraction for every processor
+SHARED_MODULES = ('src.note_processor.definition_patterns',
+                  'src.note_processor.domain_routing',
+                  'src.note_processor.token_classes')
+
+
+@functools.lru_cache(maxsize=None)
+def source_digest(obj):
+    """SHA-256 of a module's or function's source, read once per process."""
+    return hashlib.sha256(inspect.getsource(obj).encode()).hexdigest()
+
+
+def code_version(processor):
+    """Fingerprint of the source of the processor's module and the shared modules."""
+    digest = hashlib.sha256()
+    digest.update(source_digest(sys.modules[type(processor).__module__]).encode())
+    for name in SHARED_MODULES:
+        digest.update(source_digest(importlib.import_module(name)).encode())
+    return digest.hexdigest()[:16]
+
+
+def pattern_version(processor):
+    """Fingerprint of the code, patterns and settings behind a processor's output."""
+    digest = hashlib.sha256(code_version(processor).encode())
+
+    for entry in getattr(processor, 'patterns', ()):
+        digest.update(repr((entry.label, entry.regex.pattern, entry.flags, entry.min_len,
+                            entry.min_term_len, entry.title_case)).encode())
+        digest.update(source_digest(entry.validator).encode())
+
+    # The word sets as the validators see them, wherever they come from
+    classes = getattr(processor, 'token_classes', None)
+    if isinstance(classes, TokenClasses):
+        for name in ('pronouns', 'stop_words', 'skip_words'):
+            digest.update(repr((name, sorted(getattr(classes, name)))).encode())
+
+    for name, value in sorted(vars(processor).items()):
+        if isinstance(value, (set, frozenset)):
+            digest.update(repr((name, sorted(value))).encode())
+        elif isinstance(value, (str, int, float, bool, tuple)):
+            digest.update(repr((name, value)).encode())
+
+    return digest.hexdigest()[:16]
+
+
+class ResultCache:
+    """Two-tier (memory LRU + SQLite) cache of structure_note results.
+
+    path=None keeps the memory tier only.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, max_memory=256, max_disk=100000):
+        self.path = path
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        self.memory = OrderedDict()  # key -> JSON, least recently used first
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        self._checked = set()  # (processor class, code version) already purged on disk
+
+        self.db = None
+        if path is not None:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.db = sqlite3.connect(path)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, processor TEXT, version TEXT,"
+                " value TEXT, accessed REAL)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+            self.db.commit()
+            self._disk_count = self.db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            self._writes = 0
+            self._finalizer = weakref.finalize(self, self.db.commit)
+
+    def structure_note(self, processor, text):
+        """processor.structure_note(text), served from the cache when possible."""
+        key = self.key(processor, text)
+        result = self.get(key)
+        if result is None:
+            result = processor.structure_note(text)
+            value = json.dumps(result, default=plain)
+            # Results cut short by a time budget are not worth keeping
+            if not result.get('aborted'):
+                self._store(key, value, type(processor).__name__, code_version(processor))
+            result = json.loads(value)
+        return result
+
+    def key(self, processor, text):
+        name = type(processor).__name__
+        code = code_version(processor)
+        if self.db is not None and (name, code) not in self._checked:
+            self._invalidate(name, code)
+            self._checked.add((name, code))
+        content = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return f"{content}:{name}:{pattern_version(processor)}"
+
+    def get(self, key):
+        """Cached result for key, or None."""
+        value = self.memory.get(key)
+        if value is not None:
+            self.memory.move_to_end(key)
+            self.memory_hits += 1
+            return json.loads(value)
+
+        if self.db is not None:
+            row = self.db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self.db.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+                self._wrote()
+                self._remember(key, row[0])
+                self.disk_hits += 1
+                return json.loads(row[0])
+
+        self.misses += 1
+        return None
+
+    def put(self, key, result, processor='', version=''):
+        self._store(key, json.dumps(result, default=plain), processor, version)
+
+    def _store(self, key, value, processor, version):
+        """Keep a result already serialized to JSON."""
+        self._remember(key, value)
+        if self.db is None:
+            return
+        existed = self.db.execute("SELECT 1 FROM results WHERE key = ?", (key,)).fetchone()
+        self.db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                        (key, processor, version, value, time.time()))
+        if not existed:
+            self._disk_count += 1
+        if self._disk_count > self.max_disk:
+            excess = self._disk_count - self.max_disk
+            self.db.execute("DELETE FROM results WHERE key IN "
+                            "(SELECT key FROM results ORDER BY accessed LIMIT ?)", (excess,))
+            self._disk_count -= excess
+            self.disk_evictions += excess
+        self._wrote()
+
+    def stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            'memory_entries': len(self.memory),
+            'disk_entries': self._disk_count if self.db is not None else 0,
+            'evictions': self.evictions,
+            'disk_evictions': self.disk_evictions
+        }
+
+    def clear(self):
+        self.memory.clear()
+        if self.db is not None:
+            self.db.execute("DELETE FROM results")
+            self.db.commit()
+            self._disk_count = 0
+
+    def flush(self):
+        """Commit pending disk writes."""
+        if self.db is not None:
+            self.db.commit()
+            self._writes = 0
+
+    def close(self):
+        if self.db is not None:
+            self._finalizer()  # final commit
+            self.db.close()
+            self.db = None
+
+    def _wrote(self):
+        self._writes += 1
+        if self._writes >= COMMIT_EVERY:
+            self.flush()
+
+    def _remember(self, key, value):
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory:
+            self.memory.popitem(last=False)
+            self.evictions += 1
+
+    def _invalidate(self, processor, version):
+        """Drop this processor's entries made with other code versions."""
+        removed = self.db.execute("DELETE FROM results WHERE processor = ? AND version != ?",
+                                  (processor, version)).rowcount
+        if removed:
+            self._disk_count -= removed
+            self.db.commit()
@@ -0,0 +1,140 @@
+"""
+Segmented Document
+Per-note segmentation index shared by all extractors.
+
+Every processor used to re-split the same note itself: sentences with
+re.split(r'[.!?]+'), lines with text.split('\\n') (three times in the
+relationship extractor), plus a fresh text.lower() per method.
+SegmentedDocument does this once per note. Line and sentence boundaries
+are kept as integer offset arrays into the original text. The lowercase
+text and the token lists are built lazily, the first time a processor
+asks for them, and then reused.
+
+All processors accept either a plain string or a SegmentedDocument.
+"""
+
+import re
+from array import array
+from bisect import bisect_right
+
+SENTENCE_END = re.compile(r'[.!?]+')
+LINE_END = re.compile(r'\n')
+
+
+def split_spans(text, separator):
+    """Start/end offsets of the pieces re.split(separator, text) returns."""
+    starts = array('q')
+    ends = array('q')
+    pos = 0
+    for m in separator.finditer(text):
+        starts.append(pos)
+        ends.append(m.start())
+        pos = m.end()
+    starts.append(pos)
+    ends.append(len(text))
+    return starts, ends
+
+
+class SegmentedDocument:
+    """One note, segmented once: text, lowercase text, lines, sentences, tokens."""
+
+    __slots__ = ('text', '_lower', '_line_spans', '_sentence_spans',
+                 '_lines', '_lower_lines', '_sentences', '_words')
+
+    def __init__(self, text):
+        self.text = text
+        self._lower = None
+        self._line_spans = None
+        self._sentence_spans = None
+        self._lines = None
+        self._lower_lines = None
+        self._sentences = None
+        self._words = None
+
+    def __len__(self):
+        return len(self.text)
+
+    @property
+    def lower(self):
+        """text.lower(), computed once."""
+        if self._lower is None:
+            self._lower = self.text.lower()
+        return self._lower
+
+    @property
+    def line_spans(self):
+        """(starts, ends) offset arrays of text.split('\\n')."""
+        if self._line_spans is None:
+            self._line_spans = split_spans(self.text, LINE_END)
+        return self._line_spans
+
+    @property
+    def sentence_spans(self):
+        """(starts, ends) offset arrays of re.split(r'[.!?]+', text)."""
+        if self._sentence_spans is None:
+            self._sentence_spans = split_spans(self.text, SENTENCE_END)
+        return self._sentence_spans
+
+    @property
+    def lines(self):
+        """Same list as text.split('\\n')."""
+        if self._lines is None:
+            self._lines = self._slices(self.text, self.line_spans)
+        return self._lines
+
+    @property
+    def lower_lines(self):
+        """Same list as [line.lower() for line in text.split('\\n')]."""
+        if self._lower_lines is None:
+            if self.text.isascii():
+                # Lowercasing ASCII keeps offsets, so slice the shared copy
+                self._lower_lines = self._slices(self.lower, self.line_spans)
+            else:
+                self._lower_lines = [line.lower() for line in self.lines]
+        return self._lower_lines
+
+    def lines_containing(self, words):
+        """
+        Sorted indices of the lines whose lowercase text holds any of the
+        (lowercase) words. The words are found with str.find over the
+        lowercase note, so lines without them cost nothing.
+        """
+        lower = self.lower
+        if len(lower) == len(self.text):
+            starts = self.line_spans[0]
+        else:
+            # Lowercasing lengthened some character: offsets of the copy's own lines
+            starts = split_spans(lower, LINE_END)[0]
+        found = set()
+        for word in words:
+            pos = lower.find(word)
+            while pos != -1:
+                found.add(bisect_right(starts, pos) - 1)
+                pos = lower.find(word, pos + 1)
+        return sorted(found)
+
+    @property
+    def sentences(self):
+        """Same list as re.split(r'[.!?]+', text)."""
+        if self._sentences is None:
+            self._sentences = self._slices(self.text, self.sentence_spans)
+        return self._sentences
+
+    @property
+    def words(self):
+        """Same list as text.split()."""
+        if self._words is None:
+            self._words = self.text.split()
+        return self._words
+
+    @staticmethod
+    def _slices(text, spans):
+        starts, ends = spans
+        return [text[s:e] for s, e in zip(starts, ends)]
+
+
+def as_document(text):
+    """Wrap a plain string; pass a SegmentedDocument through unchanged."""
+    if isinstance(text, SegmentedDocument):
+        return text
+    return SegmentedDocument(text)
@@ -0,0 +1,169 @@
+"""
+Concept Sketch
+Approximate corpus-wide concept counts in bounded memory.
+
+Summing exact Counters of concepts over hundreds of thousands of notes
+grows with the vocabulary. ConceptSketch is a Count-Min sketch (depth
+rows of width counters; an item adds its count to one hashed counter per
+row and is estimated by the smallest of them) plus a bounded list of
+heavy-hitter candidates.
+
+With width = ceil(e / epsilon) and depth = ceil(ln(1 / delta)), an
+estimate is never below the true count and, with probability at least
+1 - delta, exceeds it by at most epsilon * total, total being the sum of
+all counts added.
+
+Sketches built with the same epsilon, delta and seed merge by adding
+their tables, which gives exactly the sketch of the combined stream: each
+worker sketches its shard and the shards combine into a course-level or
+global view. The candidates of both sides are re-estimated against the
+merged table and the top ones kept. Hashes are keyed BLAKE2b, so they are
+the same in every process. Sketches are saved to and loaded from one .npz
+file.
+"""
+
+import math
+import os
+from collections import Counter
+from collections.abc import Mapping
+from hashlib import blake2b
+
+import numpy as np
+
+
+class ConceptSketch:
+    """Count-Min sketch of concept counts with the top_k heavy hitters.
+
+    Args:
+        epsilon: Overestimate bound, as a fraction of the total count
+        delta: Probability that an estimate exceeds that bound
+        top_k: Heavy-hitter candidates kept
+        seed: Hash seed; only sketches with the same seed merge
+    """
+
+    def __init__(self, epsilon=0.001, delta=0.01, top_k=100, seed=0):
+        if not 0 < epsilon < 1 or not 0 < delta < 1:
+            raise ValueError("epsilon and delta must be between 0 and 1")
+        if top_k < 1:
+            raise ValueError("top_k must be at least 1")
+        self.epsilon = epsilon
+        self.delta = delta
+        self.top_k = top_k
+        self.seed = seed
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.table = np.zeros((self.depth, self.width), dtype=np.int64)
+        self.total = 0
+        self.heavy = {}  # candidate -> estimate when last seen
+        self._key = seed.to_bytes(8, 'little')
+        self._rows = np.arange(self.depth)[:, None]
+
+    @property
+    def error_bound(self):
+        """Largest overestimate, with probability 1 - delta."""
+        return self.epsilon * self.total
+
+    def _columns(self, items):
+        """(depth, len(items)) counter columns: double hashing of one keyed digest."""
+        key = self._key
+        digests = b''.join(blake2b(item.encode(), digest_size=16, key=key).digest()
+                           for item in items)
+        h = np.frombuffer(digests, dtype='<u8').reshape(-1, 2)
+        rows = self._rows.astype(np.uint64)
+        columns = (h[:, 0] + rows * (h[:, 1] | np.uint64(1))) % np.uint64(self.width)
+        return columns.astype(np.intp)
+
+    def add(self, item, count=1):
+        self.update({item: count})
+
+    def update(self, counts):
+        """Add a Mapping of item -> count, or an iterable of items counted once each."""
+        if not isinstance(counts, Mapping):
+            counts = Counter(counts)
+        if not counts:
+            return
+        items = list(counts)
+        values = np.fromiter(counts.values(), dtype=np.int64, count=len(items))
+        columns = self._columns(items)
+        rows = np.broadcast_to(self._rows, columns.shape)
+        np.add.at(self.table, (rows, columns), values)
+        self.total += int(values.sum())
+        self._offer(items, self.table[rows, columns].min(axis=0))
+
+    def estimate(self, item):
+        """Estimated count: at least the true count, rarely more than error_bound above."""
+        return int(self._estimates([item])[0])
+
+    def _estimates(self, items):
+        if not items:
+            return np.zeros(0, dtype=np.int64)
+        return self.table[self._rows, self._columns(items)].min(axis=0)
+
+    def _offer(self, items, estimates):
+        self.heavy.update(zip(items, estimates.tolist()))
+        if len(self.heavy) > 2 * self.top_k:
+            self._trim()
+
+    def _trim(self):
+        """Keep the top_k candidates by current estimate."""
+        items = list(self.heavy)
+        estimates = self._estimates(items)
+        if len(items) > self.top_k:
+            keep = np.argpartition(-estimates, self.top_k - 1)[:self.top_k]
+        else:
+            keep = range(len(items))
+        self.heavy = {items[i]: int(estimates[i]) for i in sorted(keep)}
+
+    def top(self, n=None):
+        """[(item, estimate)] of the heaviest candidates, largest first."""
+        items = list(self.heavy)
+        estimates = self._estimates(items).tolist()
+        ranked = sorted(zip(items, estimates), key=lambda pair: (-pair[1], pair[0]))
+        return ranked[:self.top_k if n is None else min(n, self.top_k)]
+
+    def merge(self, other):
+        """Add another sketch's counts into this one; returns self."""
+        if (other.width, other.depth, other.seed) != (self.width, self.depth, self.seed):
+            raise ValueError("Sketches differ in epsilon, delta or seed and cannot merge")
+        self.table += other.table
+        self.total += other.total
+        for item in other.heavy:
+            self.heavy.setdefault(item, 0)
+        self._trim()
+        return self
+
+    @classmethod
+    def from_notes(cls, texts, processor=None, top_n=10, **kwargs):
+        """Sketch of how many notes list each concept among their top_n."""
+        if processor is None:
+            from src.note_processor.final_processor import NoteProcessor
+            processor = NoteProcessor()
+        sketch = cls(**kwargs)
+        for text in texts:
+            sketch.update(dict.fromkeys(processor.extract_concepts(text, top_n), 1))
+        return sketch
+
+    def save(self, path):
+        """Write the sketch to path, replacing the old file atomically."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, table=self.table,
+                     settings=np.array([self.epsilon, self.delta]),
+                     sizes=np.array([self.top_k, self.seed, self.total], dtype=np.int64),
+                     items=np.array(list(self.heavy), dtype=str),
+                     estimates=np.array(list(self.heavy.values()), dtype=np.int64))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            epsilon, delta = data['settings'].tolist()
+            top_k, seed, total = data['sizes'].tolist()
+            sketch = cls(epsilon, delta, top_k, seed)
+            sketch.table = data['table']
+            sketch.total = total
+            sketch.heavy = dict(zip(data['items'].tolist(), data['estimates'].tolist()))
+        return sketch
@@ -0,0 +1,53 @@
+"""
+Source Text
+structure_note results that refer to their note instead of holding it.
+
+A result normally carries the whole note as 'original_text', so a batch
+that keeps its results holds the corpus a second time, and pool workers
+pickle every note back to the parent that sent it. StructuredNote stores
+'source' (the note's file path) instead and reads the text from there
+each time 'original_text' is asked for. The text is not kept, so the
+result stays small for as long as it lives.
+
+result['original_text'] and result.get('original_text') work as on a
+plain result, so formatters need no changes; 'original_text' in result
+is False. JSON and pickle carry just the reference.
+
+The result also keeps 'source_sha256', the digest of the text it was
+built from. A file edited since then no longer matches it, and reading
+the original text raises ValueError instead of returning the new text.
+"""
+
+import hashlib
+
+
+def read_source(source):
+    """The text of a note file, decoded as ingest decodes it."""
+    with open(source, 'rb') as f:
+        return f.read().decode('utf-8', errors='replace')
+
+
+def text_digest(text):
+    """SHA-256 of a note's text, as stored in 'source_sha256'."""
+    return hashlib.sha256(text.encode('utf-8', errors='surrogatepass')).hexdigest()
+
+
+class StructuredNote(dict):
+    """A structure_note result whose original text is read from result['source']."""
+
+    __slots__ = ()
+
+    def __missing__(self, key):
+        if key == 'original_text' and 'source' in self:
+            source = self['source']
+            text = read_source(source)
+            digest = dict.get(self, 'source_sha256')
+            if digest is not None and text_digest(text) != digest:
+                raise ValueError(f"{source} has changed since the note was structured")
+            return text
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in self or (key == 'original_text' and 'source' in self):
+            return self[key]
+        return default
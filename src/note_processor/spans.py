@@ -0,0 +1,110 @@
+"""
+Span Results
+Extraction results stored as character offsets into the source note.
+
+A definition dict holds two freshly sliced and stripped strings; over a
+large batch they take more memory than the notes themselves. A span
+result keeps a reference to the note text and the (start, end) offsets
+of the stripped term and definition, and slices the strings only when
+they are read. The offsets also let a UI highlight the source text
+without searching for it again.
+
+DefinitionSpan supports the dict-style reads the rest of the pipeline
+uses (d['term'], d.get('pattern')), and as_dict() gives the exact dict a
+processor returns in the default mode.
+"""
+
+
+def strip_span(text, start, end):
+    """Offsets of text[start:end].strip() within text."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+class TextSpan:
+    """A stripped piece of a note, sliced on demand."""
+
+    __slots__ = ('source', 'start', 'end')
+
+    def __init__(self, source, start, end):
+        self.source = source
+        self.start, self.end = strip_span(source, start, end)
+
+    @property
+    def span(self):
+        return self.start, self.end
+
+    def __str__(self):
+        return self.source[self.start:self.end]
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __getitem__(self, key):
+        return str(self)[key]
+
+    def __eq__(self, other):
+        if isinstance(other, (str, TextSpan)):
+            return str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __repr__(self):
+        return f"TextSpan({self.start}, {self.end}, {str(self)!r})"
+
+
+class DefinitionSpan:
+    """One definition as offsets of its term and definition in the note."""
+
+    __slots__ = ('source', 'term_start', 'term_end', 'definition_start', 'definition_end',
+                 'pattern', 'title_case')
+
+    KEYS = ('term', 'definition', 'pattern')
+
+    def __init__(self, source, match, pattern, title_case=False):
+        """match is the pattern's re.Match; group 1 is the term, group 2 the definition."""
+        self.source = source
+        self.term_start, self.term_end = strip_span(source, *match.span(1))
+        self.definition_start, self.definition_end = strip_span(source, *match.span(2))
+        self.pattern = pattern
+        self.title_case = title_case  # the term is reported title-cased
+
+    @property
+    def term(self):
+        term = self.source[self.term_start:self.term_end]
+        return term.title() if self.title_case else term
+
+    @property
+    def definition(self):
+        return self.source[self.definition_start:self.definition_end]
+
+    @property
+    def term_span(self):
+        return self.term_start, self.term_end
+
+    @property
+    def definition_span(self):
+        return self.definition_start, self.definition_end
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.KEYS else default
+
+    def keys(self):
+        return self.KEYS
+
+    def as_dict(self):
+        return {'term': self.term, 'definition': self.definition, 'pattern': self.pattern}
+
+    def __repr__(self):
+        return (f"DefinitionSpan(term={self.term_span}, definition={self.definition_span}, "
+                f"pattern={self.pattern!r})")
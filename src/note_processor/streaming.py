@@ -0,0 +1,150 @@
+"""
+Streaming Extraction
+Bounded-memory processing for textbook-sized notes.
+
+The file is read in chunks of chunk_size characters, cut at line breaks.
+Each segment handed to the patterns is the new chunk plus a carried window
+from the previous segment: its last `overlap` characters, which were not
+emitted yet, and `overlap` characters of context before them. A definition
+or example up to `overlap` characters long that straddles a chunk boundary
+is therefore still seen whole.
+
+Every match is reported by exactly one segment, the one whose emit region
+contains the match's end. Regions tile the file. Within a segment,
+definitions are emitted in text-offset order. Peak memory is about
+chunk_size + 2 * overlap + one line, whatever the file size. The only state
+kept across segments is the normalized terms already emitted, with the
+pattern that defined each.
+
+Whole-text extraction keeps, for each term, the definition of the
+earliest pattern in the table that defines it. A later segment can hold
+such a definition for a term an earlier segment already emitted from a
+lower-priority pattern; the term is then emitted again, and the last
+definition emitted for a term is the one whole-text extraction keeps.
+"""
+
+import re
+from collections import Counter
+
+from src.note_processor.unified_processor import UnifiedProcessor
+from src.note_processor.final_processor import EXAMPLE_PATTERNS, NoteProcessor
+
+CONCEPT_WORD = re.compile(r'\b[a-z]{5,}\b')
+
+
+class StreamingExtractor:
+    """
+    Incremental definitions, examples and concept counts from a file.
+
+    Yields events as they are found:
+        ('definition', {'term', 'definition', 'pattern'}), superseding any
+            earlier definition of the same normalized term
+        ('example', text)
+        ('concepts', Counter of meaningful words in the chunk just read)
+    """
+
+    def __init__(self, processor=None, chunk_size=1 << 20, overlap=8192):
+        if overlap < 0 or chunk_size <= overlap:
+            raise ValueError("chunk_size must be larger than overlap (and overlap >= 0)")
+        self.processor = processor or UnifiedProcessor()
+        self.stop_words = NoteProcessor().stop_words
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+
+    def stream_file(self, path, encoding='utf-8'):
+        """Stream events from a note file on disk."""
+        with open(path, 'r', encoding=encoding) as f:
+            yield from self.stream(f)
+
+    def stream(self, fileobj):
+        """Stream events from any text file-like object."""
+        index = {}  # normalized term -> definition, across the whole stream
+        ranks = {}  # normalized term -> table position of the pattern that defined it
+        carry = ''  # overlap context + deferred tail of the previous segment
+        lo = 0      # matches ending at or before lo were already emitted
+        pending = ''
+
+        while True:
+            data = fileobj.read(self.chunk_size)
+            final = not data
+            block = pending + data
+
+            if final:
+                body, pending = block, ''
+            else:
+                cut = self._block_end(block)
+                body, pending = block[:cut], block[cut:]
+                if not body:
+                    continue
+
+            segment = carry + body
+            if final:
+                hi = len(segment)
+            else:
+                # Defer the last `overlap` characters: a match ending there
+                # may still grow once the next chunk arrives
+                hi = max(self._line_start(segment, len(segment) - self.overlap), lo)
+
+            yield from self._extract(segment, lo, hi, index, ranks)
+
+            if final:
+                return
+            # Keep `overlap` characters of context before the emit boundary
+            context = hi - self.overlap
+            start = min(self._line_start(segment, context), hi) if context > 0 else 0
+            carry = segment[start:]
+            lo = hi - start
+
+    def _block_end(self, block):
+        """Where to cut a freshly read block: after its last line break."""
+        cut = block.rfind('\n') + 1
+        if cut == 0 and len(block) >= self.chunk_size:
+            # One huge line (e.g. an OCR dump): cut at whitespace, else hard cut
+            cut = max(block.rfind(' '), block.rfind('\t')) + 1 or len(block)
+        return cut
+
+    @staticmethod
+    def _line_start(text, pos):
+        """First line start (or, failing that, word start) at or after pos."""
+        newline = text.find('\n', pos)
+        if newline != -1:
+            return newline + 1
+        space = text.find(' ', pos)
+        return space + 1 if space != -1 else len(text)
+
+    def _extract(self, segment, lo, hi, index, ranks):
+        """Emit matches of segment whose end lies in (lo, hi]."""
+        processor = self.processor
+        classes = processor.token_classes
+        best = {}  # normalized term -> (rank, start, term, definition, label) in this segment
+        for rank, entry in enumerate(processor.patterns):
+            for m in entry.regex.finditer(segment):
+                if not lo < m.end() <= hi:
+                    continue
+                term, defn = m.groups()
+                if entry.validator(term, defn, entry, classes):
+                    if entry.title_case:
+                        term = term.strip().title()
+                    key = processor._normalize_term(term)
+                    if key not in best or (rank, m.start()) < best[key][:2]:
+                        best[key] = (rank, m.start(), term, defn, entry.label)
+
+        added = []
+        for key, (rank, _, term, defn, label) in sorted(best.items(), key=lambda item: item[1][1]):
+            if ranks.get(key, rank + 1) <= rank:
+                continue  # an earlier segment had this or a higher-priority pattern
+            ranks[key] = rank
+            index.pop(key, None)
+            processor._add(added, term, defn, label, index)
+        for definition in added:
+            yield 'definition', definition
+
+        for pattern in EXAMPLE_PATTERNS:
+            for m in pattern.finditer(segment):
+                if lo < m.end() <= hi:
+                    yield 'example', m.group(1).strip()
+
+        region = segment[lo:hi].lower()
+        counts = Counter(w for w in CONCEPT_WORD.findall(region) if w not in self.stop_words)
+        if counts:
+            yield 'concepts', counts
@@ -0,0 +1,180 @@
+"""
+TF-IDF Concept Ranking
+Rank a note's concepts against document frequencies over the whole corpus.
+
+NoteProcessor and BasicNoteProcessor score concepts by how often they
+occur in the note alone, so words every note uses rank as high as the
+note's real subject. ConceptIndex keeps, for every concept term, the
+number of notes it occurs in. Notes are added and removed one at a time,
+each touching only its own terms' counts.
+
+A note's terms are scored by sublinear term frequency times smoothed
+inverse document frequency,
+
+    (1 + log tf) * (log((1 + N) / (1 + df)) + 1)
+
+computed with NumPy over the note's distinct terms, so ranking costs
+O(note size) whatever the size of the corpus. rank_notes() scores many
+notes at once as one sparse (CSR) note x term matrix.
+
+Terms are NoteProcessor's concept evidence, lowercased: capitalized
+words of 4+ letters, other words of 5+, neither stop words nor pronouns,
+and capitalized phrases. The index is saved to and loaded from one .npz
+file under database/.
+"""
+
+import os
+from collections import Counter
+
+import numpy as np
+
+from src.note_processor.final_processor import (
+    CONCEPT_TOKEN, GENERIC_WORDS, PHRASE_SKIP, NoteProcessor)
+from src.note_processor.segmentation import as_document
+from src.note_processor.token_classes import PRONOUN, STOP_WORD
+
+DEFAULT_PATH = os.path.join('database', 'concept_index.npz')
+
+
+def top_indices(scores, top_n):
+    """Indices of the top_n scores, best first; ties in index order."""
+    if top_n <= 0:
+        return scores[:0].astype(np.int64)
+    if len(scores) > top_n:
+        kth = np.partition(scores, len(scores) - top_n)[len(scores) - top_n]
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.lexsort((candidates, -scores[candidates]))][:top_n]
+
+
+class ConceptIndex:
+    """Document frequencies of concept terms over a corpus of notes."""
+
+    def __init__(self, processor=None):
+        self.processor = processor or NoteProcessor()
+        self.vocabulary = {}  # term -> column
+        self.terms = []       # column -> term
+        self.df = np.zeros(1024, dtype=np.int64)  # notes per column (over-allocated)
+        self.notes = {}       # note_id -> (columns, counts) arrays
+
+    def __len__(self):
+        return len(self.notes)
+
+    def __contains__(self, note_id):
+        return note_id in self.notes
+
+    def concept_terms(self, text):
+        """Counter of the note's lowercased concept terms, in order of first occurrence."""
+        classes = self.processor.token_classes
+        terms = Counter()
+        for token, count in Counter(CONCEPT_TOKEN.findall(as_document(text).text)).items():
+            if token.isalpha():
+                words = (token,)
+            else:
+                words = token.split()
+                phrase = ' '.join(words).lower()
+                if words[0] not in PHRASE_SKIP and not any(g in phrase for g in GENERIC_WORDS):
+                    terms[phrase] += count
+            for word in words:
+                shortest = 4 if word[0].isupper() else 5
+                if len(word) >= shortest and not classes[word] & (PRONOUN | STOP_WORD):
+                    terms[word.lower()] += count
+        return terms
+
+    def add(self, note_id, text):
+        """Count a note's terms; a note already indexed under note_id is replaced."""
+        if note_id in self.notes:
+            self.remove(note_id)
+        terms = self.concept_terms(text)
+        columns = np.fromiter(map(self._column, terms), dtype=np.int64, count=len(terms))
+        counts = np.fromiter(terms.values(), dtype=np.int64, count=len(terms))
+        self.df[columns] += 1
+        self.notes[note_id] = (columns, counts)
+
+    def remove(self, note_id):
+        """Uncount a note's terms. Raises KeyError for an unknown note_id."""
+        columns, _ = self.notes.pop(note_id)
+        self.df[columns] -= 1
+
+    def _column(self, term):
+        column = self.vocabulary.get(term)
+        if column is None:
+            column = self.vocabulary[term] = len(self.terms)
+            self.terms.append(term)
+            if column == len(self.df):
+                self.df = np.concatenate([self.df, np.zeros_like(self.df)])
+        return column
+
+    def idf(self, df):
+        """Smoothed inverse document frequency for document counts df."""
+        return np.log((1 + len(self.notes)) / (1 + df)) + 1.0
+
+    def rank(self, text, top_n=10):
+        """The note's top_n concepts by TF-IDF against the index, best first."""
+        return self.rank_notes([text], top_n)[0]
+
+    def rank_notes(self, texts, top_n=10):
+        """
+        rank() for many notes.
+
+        The notes' term frequencies form one CSR matrix (data, indices,
+        indptr); terms the index has never seen get column -1, with df 0.
+        Document frequencies are read at the notes' own columns only, so
+        the cost does not grow with the vocabulary. The matrix is weighted
+        in one vectorized step and each row's top_n picked with a partial
+        sort.
+        """
+        rows = []
+        indptr = [0]
+        indices = []
+        counts = []
+        for text in texts:
+            terms = self.concept_terms(text)
+            rows.append(list(terms))
+            indices.extend(self.vocabulary.get(term, -1) for term in terms)
+            counts.extend(terms.values())
+            indptr.append(len(indices))
+
+        indices = np.asarray(indices, dtype=np.int64)
+        df = np.where(indices >= 0, self.df[np.maximum(indices, 0)], 0)
+        weights = (1.0 + np.log(np.asarray(counts, dtype=np.float64))) * self.idf(df)
+
+        ranked = []
+        for terms, start, end in zip(rows, indptr, indptr[1:]):
+            ranked.append([terms[i].title() for i in top_indices(weights[start:end], top_n)])
+        return ranked
+
+    def save(self, path=DEFAULT_PATH):
+        """Write the index to path, replacing the old file atomically."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        note_ids = list(self.notes)
+        postings = [self.notes[note_id] for note_id in note_ids]
+        empty = np.zeros(0, dtype=np.int64)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f,
+                     terms=np.array(self.terms, dtype=str),
+                     note_ids=np.array(note_ids, dtype=str),
+                     lengths=np.array([len(c) for c, _ in postings], dtype=np.int64),
+                     columns=np.concatenate([c for c, _ in postings]) if postings else empty,
+                     counts=np.concatenate([n for _, n in postings]) if postings else empty)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH, processor=None):
+        """An index saved with save(); note ids come back as strings."""
+        index = cls(processor)
+        with np.load(path, allow_pickle=False) as data:
+            index.terms = data['terms'].tolist()
+            columns = data['columns']
+            counts = data['counts']
+            bounds = np.cumsum(data['lengths'])[:-1]
+            note_ids = data['note_ids'].tolist()
+        index.vocabulary = {term: column for column, term in enumerate(index.terms)}
+        index.notes = dict(zip(note_ids, zip(np.split(columns, bounds), np.split(counts, bounds))))
+        size = max(len(index.df), len(index.terms))
+        index.df = np.bincount(columns, minlength=size).astype(np.int64)
+        return index
@@ -0,0 +1,72 @@
+"""
+Token Classes
+Classify each distinct token once: pronoun, stop word, skip word.
+
+Validators used to lowercase and split every candidate term and test
+each word against one or more word sets, building the union of those
+sets on every call for multi-word terms. TokenClasses maps a token
+(exactly as str.split() yields it) to an integer of class bits, computed
+the first time the token is seen and looked up after that. A term check
+is then one dict lookup and one AND per word, and the memo is shared by
+every note the processor sees.
+
+Processors declare their word lists as WordSet attributes: assigning a
+new set rebuilds the processor's TokenClasses on next use. The sets are
+kept as frozensets, so an in-place change (processor.pronouns.add(...)),
+which the memo could not see, raises AttributeError instead of being
+silently ignored.
+"""
+
+PRONOUN = 1
+STOP_WORD = 2
+SKIP_WORD = 4  # processor-specific words a term must not contain
+
+# Tokens remembered before the memo starts over
+MAX_TOKENS = 1 << 16
+
+
+class TokenClasses(dict):
+    """token -> class bits, filled in on first lookup."""
+
+    def __init__(self, pronouns=(), stop_words=(), skip_words=()):
+        super().__init__()
+        self.pronouns = frozenset(pronouns)
+        self.stop_words = frozenset(stop_words)
+        self.skip_words = frozenset(skip_words)
+
+    def __missing__(self, token):
+        lower = token.lower()
+        bits = 0
+        if lower in self.pronouns:
+            bits |= PRONOUN
+        if lower in self.stop_words:
+            bits |= STOP_WORD
+        if lower in self.skip_words:
+            bits |= SKIP_WORD
+        if len(self) >= MAX_TOKENS:
+            self.clear()
+        self[token] = bits
+        return bits
+
+    def any(self, term, mask):
+        """Whether a whitespace-separated word of term has a class in mask."""
+        for word in term.split():
+            if self[word] & mask:
+                return True
+        return False
+
+
+class WordSet:
+    """A processor's frozen word-list attribute; assigning one drops its TokenClasses."""
+
+    def __set_name__(self, owner, name):
+        self.name = '_' + name
+
+    def __get__(self, processor, owner=None):
+        if processor is None:
+            return self
+        return getattr(processor, self.name)
+
+    def __set__(self, processor, words):
+        setattr(processor, self.name, frozenset(words))
+        processor._token_classes = None
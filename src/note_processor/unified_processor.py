@@ -3,139 +3,207 @@ Unified Note Processor - v0.8 FIXED
 Eliminates duplicate extractions with smart normalization
 """
 
-import re
+import time
+
+from src.note_processor import batch
+from src.note_processor.definition_patterns import (MULTIWORD_SKIP_WORDS, finditer_windows,
+                                                    load_patterns)
+from src.note_processor.domain_routing import DomainClassifier, route_patterns
+from src.note_processor.fused_scanner import FusedDefinitionScanner
+from src.note_processor.prefilter import TriggerPrefilter
+from src.note_processor.profiling import PatternProfile
+from src.note_processor.records import Definition
+from src.note_processor.segmentation import as_document
+from src.note_processor.spans import DefinitionSpan
+from src.note_processor.token_classes import PRONOUN, TokenClasses, WordSet
+
+ENGINES = ('classic', 'fused')
+
 
 class UnifiedProcessor:
-    """Unified processor with all 13 patterns + duplicate elimination."""
+    """Unified processor with all 17 patterns + duplicate elimination.
+    
+    engine='classic' runs one re.findall per pattern, after a trigger
+    prefilter has dropped the patterns that cannot match; engine='fused'
+    scans the note once for anchors and only tries each pattern next to
+    them. Both return identical definitions.
+    
+    time_budget caps the seconds spent matching one note. When it runs out
+    the remaining matches and patterns are skipped, and self.aborted
+    records which pattern was running, the elapsed time and the patterns
+    that never ran. The searches then run in bounded windows of the note
+    (see definition_patterns.finditer_windows), so the budget is checked
+    even while no match turns up.
+    
+    profile=True collects per-pattern time, match, rejection, duplicate
+    and acceptance counts over every note into self.profile.
+    
+    spans=True returns each definition as a DefinitionSpan: offsets of the
+    term and definition in the note, sliced only when read.
     
-    def __init__(self):
+    compact=True returns slotted Definition records instead of dicts.
+    
+    extract_definitions(text, domain=...) runs only the patterns routed to
+    that domain (see domain_routing); routing=True guesses the domain of
+    every note with a DomainClassifier. Unknown domains run every pattern.
+    
+    packs names the pattern packs to run (see definition_patterns; default
+    all of them); only those packs are compiled.
+    
+    Validators look term words up in self.token_classes, built from
+    self.pronouns, a frozenset; assign a new set to change the pronouns.
+    """
+    
+    pronouns = WordSet()
+    
+    def __init__(self, engine='classic', time_budget=None, profile=False, spans=False,
+                 compact=False, routing=False, packs=()):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}")
         self.pronouns = {
             'he', 'she', 'it', 'they', 'them', 'their', 'his', 'her',
             'we', 'us', 'our', 'you', 'your', 'i', 'me', 'my', 'this',
             'that', 'these', 'those', 'what', 'which', 'who', 'when',
             'bastille'
         }
+        self.packs = packs
+        self.patterns = load_patterns(*packs)
+        self.engine = engine
+        self.scanner = FusedDefinitionScanner(self.patterns) if engine == 'fused' else None
+        self.prefilter = TriggerPrefilter(self.patterns)
+        self.time_budget = time_budget
+        self.aborted = None  # abort record of the last note, if any
+        self.profile = PatternProfile() if profile else None
+        self.spans = spans
+        self.compact = compact
+        self.routing = routing
+        self.classifier = DomainClassifier() if routing else None
+        # domain -> (patterns, prefilter, scanner); None runs everything
+        self.routes = {None: (self.patterns, self.prefilter, self.scanner)}
     
-    def extract_definitions(self, text):
-        """Extract using ALL 13 patterns (9 biology + 4 history)."""
-        definitions = []
-        
-        # BIOLOGY PATTERNS (1-9)
-        
-        p1 = r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:is|are)\s+(?:a|an|the)?\s*(.+?)(?:\.|$)'
-        for term, defn in re.findall(p1, text, re.MULTILINE):
-            if self._validate(term, defn, 10):
-                self._add(definitions, term, defn, 'is_are')
-        
-        p2 = r'^([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:was|were)\s+(?:a|an|the)?\s*(.+?)(?:\.|$)'
-        for term, defn in re.findall(p2, text, re.MULTILINE):
-            if self._validate(term, defn, 10):
-                self._add(definitions, term, defn, 'was_were')
-        
-        p3 = r'^([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*):\s*(.+?)(?:\.|$)'
-        for term, defn in re.findall(p3, text, re.MULTILINE):
-            if self._validate(term, defn, 10):
-                self._add(definitions, term, defn, 'colon')
-        
-        p4 = r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*),?\s+which\s+(?:is|are|was|were)\s+(.+?)(?:\.|$)'
-        for term, defn in re.findall(p4, text):
-            if self._validate(term, defn, 10):
-                self._add(definitions, term, defn, 'which')
-        
-        p5 = r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+means\s+(.+?)(?:\.|$)'
-        for term, defn in re.findall(p5, text):
-            if self._validate(term, defn, 10):
-                self._add(definitions, term, defn, 'means')
-        
-        p6 = r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+refers to\s+(.+?)(?:\.|$)'
-        for term, defn in re.findall(p6, text):
-            if self._validate(term, defn, 10):
-                self._add(definitions, term, defn, 'refers_to')
-        
-        p7 = r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:is |are )?known as\s+(.+?)(?:\.|$)'
-        for term, defn in re.findall(p7, text):
-            if self._validate(term, defn, 10):
-                self._add(definitions, term, defn, 'known_as')
-        
-        p8 = r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+consists? of\s+(.+?)(?:\.|$)'
-        for term, defn in re.findall(p8, text):
-            if self._validate(term, defn, 10):
-                self._add(definitions, term, defn, 'consists_of')
-        
-        p9 = r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+contains?\s+(.+?)(?:\.|$)'
-        for term, defn in re.findall(p9, text):
-            if self._validate(term, defn, 10):
-                self._add(definitions, term, defn, 'contains')
-        
-        # HISTORY PATTERNS (10-13)
-        
-        # HISTORY PATTERNS (10-13)
-        
-        p10 = r'The\s+([A-Z][a-z]+(?:\s+(?:of|the|and|in)\s+[A-Z][a-z]+|\s+[A-Z][a-z]+)*)\s+(?:was|were)\s+(?:a|an|the)?\s*(.+?)(?:\.|Led by|Marked|Involved)'
-        for term, defn in re.findall(p10, text):
-            if self._validate(term, defn, 10):
-                self._add(definitions, term, defn, 'the_was_were')
-        
-        p11 = r'The\s+([A-Z][a-z]+(?:[-\s][A-Z][a-z]+)*):\s*(.+?)(?:\.|Led by|Marked|Adopted)'
-        for term, defn in re.findall(p11, text):
-            if self._validate(term, defn, 15):
-                self._add(definitions, term, defn, 'the_colon')
-        
-        p12 = r'([A-Z][a-z]+(?:\s+of\s+(?:the\s+)?[A-Z][a-z]+)+):\s*(.+?)(?:\.|Led by|Adopted)'
-        for term, defn in re.findall(p12, text):
-            if len(defn) >= 15:
-                self._add(definitions, term, defn, 'multiword_of')
-        
-        p13 = r'^([A-Z][A-Za-z0-9]+(?:\s+[A-Z][A-Za-z0-9]+)*):\s*(.+?)(?:\.|$)'
-        for term, defn in re.findall(p13, text, re.MULTILINE):
-            if self._validate(term, defn, 15):
-                self._add(definitions, term, defn, 'simple_colon')
-                
-        # Pattern 14: "A/An X is Y" (math and literature style!)
-        # Catches: "A derivative is...", "A metaphor is...", "A triangle is..."
-        p14 = r'[Aa]n?\s+([a-z][a-z]+(?:\s+[a-z]+)*)\s+(?:is|are)\s+(?:a|an|the)?\s*(.+?)(?:\.|$)'
-        for term, defn in re.findall(p14, text, re.MULTILINE):
-            term_capitalized = term.strip().title()
-            if len(term) >= 3 and len(defn) >= 10:
-                if not any(p in term.lower().split() for p in self.pronouns):
-                    self._add(definitions, term_capitalized, defn.strip(), 'a_an_is')
-        
-        # Pattern 15: "The X is/are Y" (present tense with article)
-        # Catches: "The mean is...", "The limit is...", "The chain rule is..."
-        p15 = r'The\s+([A-Za-z][a-z]+(?:\s+[a-z]+)*)\s+(?:is|are)\s+(?:a|an|the)?\s*(.+?)(?:\.|$)'
-        for term, defn in re.findall(p15, text, re.MULTILINE):
-            if self._validate(term, defn, 10):
-                self._add(definitions, term, defn, 'the_is_are')
+    @property
+    def token_classes(self):
+        """TokenClasses of the validators: pronouns and multi-word skip words."""
+        if self._token_classes is None:
+            self._token_classes = TokenClasses(pronouns=self.pronouns,
+                                               skip_words=MULTIWORD_SKIP_WORDS)
+        return self._token_classes
+    
+    def extract_definitions(self, text, domain=None):
+        """Extract using ALL 17 patterns from the precompiled registry.
         
-        # Pattern 16: Multi-word with lowercase second word + colon (conservative)
-        # Catches: "Factory system:", "Labor unions:", but keeps high threshold
-        p16 = r'^([A-Z][a-z]+\s+[a-z]+):\s*(.+?)(?:\.|$)'
-        for term, defn in re.findall(p16, text, re.MULTILINE):
-            # Higher thresholds to avoid false positives
-            if len(term) >= 8 and len(defn) >= 20:
-                term_words = term.lower().split()
-                # Skip if contains pronouns or common words
-                skip_words = self.pronouns | {'key', 'main', 'new', 'old', 'first', 'last', 'next'}
-                if not any(w in skip_words for w in term_words):
-                    self._add(definitions, term.strip().title(), defn.strip(), 'multiword_lower')
+        text may be a plain string or a SegmentedDocument. domain (one of
+        domain_routing.DOMAINS) restricts the patterns to that domain's.
+        """
+        text = as_document(text).text
+        route = self._route(text, domain)
+        definitions = []
+        index = {}  # normalized term -> definition, for O(1) dedupe
+        self.aborted = None
+        start = time.perf_counter()
+        deadline = None if self.time_budget is None else start + self.time_budget
         
-        # Pattern 17: Multi-word starting with capital, lowercase words, then is/are
-        # Catches: "Rational numbers are...", "Prime numbers are..."
-        p17 = r'^([A-Z][a-z]+\s+[a-z]+(?:\s+[a-z]+)*)\s+(?:is|are)\s+(?:a|an|the)?\s*(.+?)(?:\.|$)'
-        for term, defn in re.findall(p17, text, re.MULTILINE):
-            if len(term) >= 8 and len(defn) >= 15:
-                term_words = term.lower().split()
-                if not any(w in self.pronouns for w in term_words):
-                    self._add(definitions, term.strip().title(), defn.strip(), 'multiword_cap_lower_are')
+        profile = self.profile
+        if profile is None:
+            scan = ((entry, matches, None) for entry, matches in self._scan(text, route, deadline))
+        else:
+            scan = self._profiled_scan(text, route, deadline)
         
+        spans = self.spans
+        classes = self.token_classes
+        for entry, matches, elapsed in scan:
+            matched = valid = 0
+            before = len(definitions)
+            for found in matches:
+                if deadline is not None and time.perf_counter() > deadline:
+                    if profile is not None:
+                        self._record(entry, elapsed, matched, valid, len(definitions) - before)
+                    self._abort(entry, start, route)
+                    return definitions
+                matched += 1
+                # Span mode scans re.Match objects, the default mode group tuples
+                term, defn = found.groups() if spans else found
+                if entry.validator(term, defn, entry, classes):
+                    valid += 1
+                    if entry.title_case:
+                        term = term.strip().title()
+                    span = DefinitionSpan(text, found, entry.label, entry.title_case) if spans else None
+                    self._add(definitions, term, defn, entry.label, index, span)
+            if profile is not None:
+                self._record(entry, elapsed, matched, valid, len(definitions) - before)
+            if deadline is not None and time.perf_counter() > deadline:
+                self._abort(entry, start, route)
+                return definitions
+
         return definitions
     
+    def _route(self, text, domain=None):
+        """(patterns, prefilter, scanner) for the note's domain."""
+        if domain is None and self.classifier is not None:
+            domain = self.classifier.classify(text)
+        route = self.routes.get(domain)
+        if route is None:
+            patterns = route_patterns(self.patterns, domain)
+            scanner = FusedDefinitionScanner(patterns) if self.engine == 'fused' else None
+            route = self.routes[domain] = (patterns, TriggerPrefilter(patterns), scanner)
+        return route
+    
+    def _scan(self, text, route=None, deadline=None):
+        """Yield (pattern entry, findall-style matches) in table order.
+        
+        In span mode the matches are re.Match objects instead. With a
+        deadline, the matches of a pattern stop once it has passed.
+        """
+        _, prefilter, scanner = route or self.routes[None]
+        if scanner is not None:
+            return scanner.scan(text, as_match=self.spans, deadline=deadline)
+        plan = prefilter.plan(text, deadline)
+        if deadline is not None:
+            # Lazy matches searched in bounded windows, so the budget is
+            # checked between them even while no match turns up
+            matches = ((entry, finditer_windows(entry.regex, text, pos, deadline))
+                       for entry, pos in plan)
+            if self.spans:
+                return matches
+            return ((entry, (m.groups() for m in found)) for entry, found in matches)
+        if self.spans:
+            return ((entry, entry.regex.finditer(text, pos)) for entry, pos in plan)
+        return ((entry, entry.regex.findall(text, pos)) for entry, pos in plan)
+    
+    def _profiled_scan(self, text, route=None, deadline=None):
+        """_scan, as (entry, matches, seconds spent matching) for self.profile."""
+        self.profile.notes += 1
+        scan = self._scan(text, route, deadline)
+        while True:
+            start = time.perf_counter()
+            item = next(scan, None)
+            if item is None:
+                return
+            entry, matches = item
+            matches = list(matches)
+            yield entry, matches, time.perf_counter() - start
+    
+    def _record(self, entry, elapsed, matches, valid, accepted):
+        """Add one pattern's run, complete or cut short by the time budget, to self.profile."""
+        self.profile.record(entry.label, elapsed, matches,
+                            rejected=matches - valid,
+                            duplicates=valid - accepted,
+                            accepted=accepted)
+    
+    def _abort(self, entry, start, route=None):
+        """Record that the time budget ran out while entry was matching."""
+        patterns = (route or self.routes[None])[0]
+        labels = [e.label for e in patterns]
+        self.aborted = {
+            'pattern': entry.label,
+            'elapsed': time.perf_counter() - start,
+            'skipped': labels[labels.index(entry.label) + 1:]
+        }
+    
     def _validate(self, term, definition, min_len=10):
         if len(term) < 3 or len(definition) < min_len:
             return False
-        if any(p in term.lower().split() for p in self.pronouns):
-            return False
-        return True
+        return not self.token_classes.any(term, PRONOUN)
     
     def _normalize_term(self, term):
         """Normalize term by removing leading articles."""
@@ -145,25 +213,64 @@ class UnifiedProcessor:
                 return term_normalized[len(article):]
         return term_normalized
     
-    def _add(self, definitions, term, definition, pattern):
-        """Add definition, avoiding duplicates (normalize 'The X' vs 'X')."""
+    def _add(self, definitions, term, definition, pattern, index=None, span=None):
+        """Add definition, avoiding duplicates (normalize 'The X' vs 'X').
+        
+        index maps normalized term -> definition already in the list. Pass
+        the same dict for every _add call on one list to make the duplicate
+        check O(1); without it the index is rebuilt from the list.
+        
+        span, a DefinitionSpan of the same match, is stored instead of a dict.
+        """
         term_normalized = self._normalize_term(term)
         
-        # Check if this term already exists (normalized comparison)
-        for existing in definitions:
-            existing_normalized = self._normalize_term(existing['term'])
-            if term_normalized == existing_normalized:
-                return  # Duplicate found, skip
+        if index is None:
+            index = {self._normalize_term(d['term']): d for d in definitions}
+        
+        # First occurrence wins
+        if term_normalized in index:
+            return
+        
+        if span is not None:
+            entry = span
+        elif self.compact:
+            entry = Definition(term.strip(), definition.strip(), pattern)
+        else:
+            entry = {
+                'term': term.strip(),
+                'definition': definition.strip(),
+                'pattern': pattern
+            }
+        index[term_normalized] = entry
+        definitions.append(entry)
+    
+    def structure_note(self, text, domain=None):
+        result = {'definitions': self.extract_definitions(text, domain)}
+        if self.time_budget is not None:
+            result['aborted'] = self.aborted
+        return result
+    
+    def structure_notes(self, notes, workers=None, chunksize=16, ordered=True):
+        """
+        Batch version of structure_note over a process pool.
+        
+        Args:
+            notes: Iterable of (note_id, text) pairs
+            workers: Number of worker processes (default: all cores)
+            chunksize: Notes per task sent to a worker
+            ordered: Yield in input order, or as soon as chunks complete
+        
+        Yields:
+            (note_id, result) pairs
         
-        # Not a duplicate, add it
-        definitions.append({
-            'term': term.strip(),
-            'definition': definition.strip(),
-            'pattern': pattern
-        })
-    
-    def structure_note(self, text):
-        return {'definitions': self.extract_definitions(text)}
+        With profiling on, the workers' pattern statistics are merged into
+        self.profile as their chunks come back.
+        """
+        kwargs = {'engine': self.engine, 'time_budget': self.time_budget, 'spans': self.spans,
+                  'compact': self.compact, 'routing': self.routing, 'packs': self.packs}
+        return batch.structure_notes(type(self), notes, kwargs,
+                                     workers=workers, chunksize=chunksize, ordered=ordered,
+                                     profile=self.profile)
 
 
 def test_unified():
@@ -4,6 +4,7 @@ Validate that improvements are real, not random chance
 """
 
 from src.note_processor.unified_processor import UnifiedProcessor
+from src.note_processor.result_cache import ResultCache
 import json
 import numpy as np
 from scipy import stats
@@ -11,6 +12,7 @@ from collections import defaultdict
 
 def run_statistical_tests():
     processor = UnifiedProcessor()
+    cache = ResultCache()  # unchanged notes are not re-extracted
     
     # Baseline results (v0.3.1 - from Week 1)
     baseline_bio = [0.67, 0.89, 0.80, 0.67, 0.67]  # 5 notes
@@ -43,7 +45,7 @@ def run_statistical_tests():
                 with open(f'data/research_dataset/annotations/{note_id}.json', 'r') as f:
                     annotation = json.load(f)
                 
-                extracted = processor.structure_note(text)
+                extracted = cache.structure_note(processor, text)
                 
                 gt = [d['term'].lower() for d in annotation['ground_truth']['definitions']]
                 ex = [d['term'].lower() for d in extracted['definitions']]
@@ -0,0 +1,154 @@
+"""
+Test: worst-case inputs take time linear in their size
+OCR dumps with no periods, 50k-word single lines and long capitalized
+runs used to make the definition and relationship regexes backtrack
+quadratically. Four times the input must now cost about four times as much.
+"""
+
+import glob
+import re
+import time
+
+from src.note_processor.definition_patterns import MAX_DEFINITION_CHARS
+from src.note_processor.unified_processor import UnifiedProcessor
+from src.note_processor.history_processor import HistoryProcessor
+from src.note_processor.final_processor import NoteProcessor
+from src.note_processor.relationship_extractor import RelationshipExtractor
+
+
+def dataset_words():
+    words = []
+    for path in sorted(glob.glob('data/research_dataset/notes/*.txt')):
+        with open(path, 'r') as f:
+            words += re.findall(r'[A-Za-z]+', f.read())
+    return words
+
+
+def ocr_dump(n):
+    """Dataset words, punctuation and line breaks stripped, on one line."""
+    words = dataset_words()
+    return ' '.join(words[i % len(words)] for i in range(n))
+
+
+# Each generator returns a single line of about n words
+ADVERSARIAL_INPUTS = {
+    'ocr_no_periods': ocr_dump,
+    'capitalized_run': lambda n: ' '.join(['Cell Membrane Protein'] * (n // 3)),
+    'lowercase_run': lambda n: 'A ' + ' '.join(['cell'] * n),
+    'the_of_chain': lambda n: 'The ' + ' of '.join(['Treaty'] * (n // 2)),
+    'anchor_without_period': lambda n: ' '.join(['Photosynthesis is the process'] * (n // 4)),
+    'relation_anchors': lambda n: ' '.join(['cells require energy and build on'] * (n // 6)),
+    'example_without_of': lambda n: ' '.join(['Mitosis is an example'] * (n // 4)),
+}
+
+DEFINITIONS = [{'term': 'Cells'}, {'term': 'Energy'}, {'term': 'Mitosis'}]
+
+
+def extractors():
+    unified = UnifiedProcessor()
+    fused = UnifiedProcessor(engine='fused')
+    history = HistoryProcessor()
+    notes = NoteProcessor()
+    relations = RelationshipExtractor()
+    return {
+        'unified': unified.extract_definitions,
+        'unified_fused': fused.extract_definitions,
+        'history': history.extract_definitions,
+        'final': notes.extract_definitions,
+        'relationships': lambda text: relations.extract_relationships(text, DEFINITIONS),
+    }
+
+
+def best_time(func, text, repeats=2):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def test_worst_case_is_linear():
+    print("=" * 70)
+    print("WORST-CASE INPUTS: 5k -> 20k words on one line")
+    print("=" * 70)
+
+    for name, make in ADVERSARIAL_INPUTS.items():
+        small, large = make(5000), make(20000)
+        for label, func in extractors().items():
+            t_small = best_time(func, small)
+            t_large = best_time(func, large)
+            ratio = t_large / max(t_small, 1e-4)
+            print(f"  {name:<22} {label:<14} {t_small * 1000:>8.1f} ms -> "
+                  f"{t_large * 1000:>8.1f} ms ({ratio:.1f}x)")
+            # 4x the input: linear is ~4x, quadratic would be ~16x
+            assert ratio < 9, f"{label} is super-linear on {name}"
+
+
+def test_fifty_thousand_word_line():
+    line = ocr_dump(50000)
+    for label, func in extractors().items():
+        start = time.perf_counter()
+        func(line)
+        elapsed = time.perf_counter() - start
+        print(f"  50k-word line, {label:<14} {elapsed:.2f}s")
+        assert elapsed < 10
+
+
+def test_time_budget_aborts():
+    text = ADVERSARIAL_INPUTS['anchor_without_period'](40000)
+    processor = UnifiedProcessor(time_budget=0)
+    result = processor.structure_note(text)
+    aborted = result['aborted']
+    assert aborted['pattern'] == processor.patterns[0].label
+    assert aborted['skipped'] == [e.label for e in processor.patterns[1:]]
+    assert aborted['elapsed'] >= 0
+
+    # A generous budget changes nothing
+    processor = UnifiedProcessor(time_budget=60)
+    with open('data/research_dataset/notes/bio_001.txt', 'r') as f:
+        note = f.read()
+    result = processor.structure_note(note)
+    assert result['aborted'] is None
+    assert result['definitions'] == UnifiedProcessor().extract_definitions(note)
+    assert 'aborted' not in UnifiedProcessor().structure_note(note)
+
+
+def test_time_budget_bounds_overrun():
+    # Single searches that would run for seconds are cut into windows
+    budget = 0.1
+    for name in ('ocr_no_periods', 'anchor_without_period', 'example_without_of'):
+        text = ADVERSARIAL_INPUTS[name](400000)
+        for engine in ('classic', 'fused'):
+            processor = UnifiedProcessor(engine=engine, time_budget=budget)
+            start = time.perf_counter()
+            result = processor.structure_note(text)
+            elapsed = time.perf_counter() - start
+            print(f"  {name:<22} {engine:<8} budget {budget}s: {elapsed:.3f}s")
+            assert result['aborted'] is not None
+            assert elapsed < 3 * budget, f"{engine} overran its budget on {name}"
+
+def test_long_definition_is_cut_off():
+    # Longer than MAX_DEFINITION_CHARS: cut off at the limit, not dropped
+    clause = 'how plants turn light into chemical energy'
+    text = 'Photosynthesis is ' + ' and '.join([clause] * 40) + '.'
+    limit = MAX_DEFINITION_CHARS
+    for processor in (UnifiedProcessor(), UnifiedProcessor(engine='fused'),
+                      UnifiedProcessor(spans=True)):
+        definitions = processor.extract_definitions(text)
+        assert [d['term'] for d in definitions] == ['Photosynthesis']
+        definition = definitions[0]['definition']
+        assert len(definition) <= limit and text[18:].startswith(definition)
+        assert len(definition) > limit - len(clause)
+
+    history = HistoryProcessor().extract_definitions('The Estates General: ' + 'x' * (2 * limit))
+    assert [len(d['definition']) for d in history] == [limit]
+
+
+if __name__ == "__main__":
+    test_worst_case_is_linear()
+    test_fifty_thousand_word_line()
+    test_time_budget_aborts()
+    test_time_budget_bounds_overrun()
+    test_long_definition_is_cut_off()
+    print("✅ Worst-case inputs run in linear time")
@@ -0,0 +1,73 @@
+"""
+Test: UnifiedProcessor.structure_notes batch API matches serial processing,
+and return_exceptions hands back a failing note's error without stopping
+"""
+
+import glob
+
+from src.note_processor import batch
+from src.note_processor.unified_processor import UnifiedProcessor
+
+
+class FragileProcessor(UnifiedProcessor):
+    """Raises on empty notes."""
+
+    def structure_note(self, text):
+        if not text:
+            raise ValueError("empty note")
+        return super().structure_note(text)
+
+
+def load_notes():
+    notes = []
+    for path in sorted(glob.glob('data/research_dataset/notes/*.txt')):
+        with open(path, 'r') as f:
+            notes.append((path.split('/')[-1][:-4], f.read()))
+    return notes
+
+
+def test_batch_matches_serial():
+    processor = UnifiedProcessor()
+    notes = load_notes()
+    expected = [(note_id, processor.structure_note(text)) for note_id, text in notes]
+
+    # In input order, across a real pool
+    ordered = list(processor.structure_notes(iter(notes), workers=2, chunksize=3))
+    assert ordered == expected
+
+    # As completed: same results, any order
+    unordered = list(processor.structure_notes(notes, workers=2, chunksize=5, ordered=False))
+    assert sorted(unordered, key=lambda r: r[0]) == sorted(expected, key=lambda r: r[0])
+
+    # Single worker runs in-process
+    assert list(processor.structure_notes(notes, workers=1)) == expected
+
+    # The engine choice travels to the workers
+    fused = UnifiedProcessor(engine='fused')
+    assert list(fused.structure_notes(notes, workers=2, chunksize=8)) == expected
+    print(f"✅ {len(notes)} notes: batch results match serial processing")
+
+
+def test_exceptions_are_returned():
+    notes = load_notes()[:6]
+    notes.insert(3, ('empty', ''))
+    expected = [(note_id, UnifiedProcessor(compact=True).structure_note(text))
+                for note_id, text in notes if text]
+    for workers in (1, 2):
+        results = list(batch.structure_notes(FragileProcessor, notes, {'compact': True},
+                                             workers=workers, chunksize=4,
+                                             return_exceptions=True))
+        [(note_id, error)] = [(i, r) for i, r in results if isinstance(r, Exception)]
+        assert note_id == 'empty' and isinstance(error, ValueError)
+        assert [(i, r) for i, r in results if i != 'empty'] == expected
+
+    try:
+        list(batch.structure_notes(FragileProcessor, notes, workers=1))
+        assert False, "exception swallowed without return_exceptions"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    test_batch_matches_serial()
+    test_exceptions_are_returned()
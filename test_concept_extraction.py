@@ -0,0 +1,100 @@
+"""
+Test: the single-scan concept extraction ranks exactly like the original
+three passes (sentence phrases, capitalized words, lowercase words)
+"""
+
+import glob
+import random
+import re
+import sys
+from collections import Counter
+
+from src.note_processor.final_processor import LOWER_CHANGES_WORDS, NoteProcessor
+
+
+def load_notes():
+    notes = []
+    for path in sorted(glob.glob('data/research_dataset/notes/*.txt')):
+        with open(path, 'r') as f:
+            notes.append(f.read())
+    return notes
+
+
+def three_pass_concepts(processor, text, top_n=10):
+    """extract_concepts as it was: one pass per method and a full sort."""
+    phrases = []
+    for sentence in re.split(r'[.!?]+', text):
+        for phrase in re.findall(r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,4})\b', sentence):
+            phrase = phrase.strip()
+            if phrase.split()[0] in ['The', 'But', 'And', 'Or', 'A', 'An']:
+                continue
+            if any(g in phrase.lower() for g in ['summary', 'class', 'chapter', 'book']):
+                continue
+            phrases.append(phrase)
+    capitalized = Counter(re.findall(r'\b[A-Z][a-z]{3,}\b', text))
+    words = re.findall(r'\b[a-z]{5,}\b', text.lower())
+    lowercase = Counter(w for w in words if w not in processor.stop_words)
+
+    concepts = [(phrase, 10.0) for phrase in phrases]
+    for word, freq in capitalized.items():
+        if word in ['The', 'This', 'That', 'These', 'Those', 'Some', 'There']:
+            continue
+        if word.lower() in processor.pronouns or word.lower() in processor.stop_words:
+            continue
+        concepts.append((word, freq * 2.0))
+    for word, freq in lowercase.items():
+        if freq >= 3:
+            concepts.append((word.capitalize(), freq * 0.8))
+    concept_dict = {}
+    for concept, score in concepts:
+        key = concept.lower().strip()
+        if len(key) >= 3:
+            if key not in concept_dict or score > concept_dict[key][1]:
+                concept_dict[key] = (concept, score)
+    ranked = sorted(concept_dict.values(), key=lambda x: x[1], reverse=True)
+    return [concept for concept, score in ranked[:top_n]]
+
+
+def test_same_concepts():
+    processor = NoteProcessor()
+    for text in load_notes():
+        for top_n in (1, 10, 40):
+            assert processor.extract_concepts(text, top_n) == three_pass_concepts(processor, text, top_n)
+
+    rng = random.Random(16)
+    words = ['Cell', 'Membrane', 'Protein', 'The', 'And', 'Dr', 'Summary', 'energy',
+             'cells', 'water', 'They', 'Abcd', 'ABCD', 'x1', 'Café', 'naïve', 'Zeta9',
+             'under_score', 'Kelvin', 'mitochondria', 'İstanbul']
+    separators = [' ', ' ', '\n', '\t', '. ', '? ', ', ', '-', ':', '(', '']
+    for _ in range(2000):
+        text = ''.join(rng.choice(words) + rng.choice(separators)
+                       for _ in range(rng.randint(0, 60)))
+        assert processor.extract_concepts(text, 5) == three_pass_concepts(processor, text, 5)
+
+
+def test_lowercase_changes_words():
+    # Characters whose lowercase is ASCII, longer, or a different word class
+    found = ''.join(c for c in map(chr, range(128, sys.maxunicode + 1))
+                    if c.lower() != c and (len(c.lower()) != 1 or c.lower().isascii()
+                                           or c.isalnum() != c.lower().isalnum()))
+    assert found == LOWER_CHANGES_WORDS
+
+
+def long_note(words=20000):
+    text = '\n\n'.join(load_notes())
+    while len(text.split()) < words:
+        text += '\n\n' + text
+    return text
+
+
+def test_same_concepts_on_long_notes():
+    text = long_note()
+    processor = NoteProcessor()
+    assert processor.extract_concepts(text) == three_pass_concepts(processor, text)
+
+
+if __name__ == "__main__":
+    test_same_concepts()
+    test_lowercase_changes_words()
+    test_same_concepts_on_long_notes()
+    print("✅ Concept extraction OK")
@@ -0,0 +1,76 @@
+"""
+Test: duplicate elimination in UnifiedProcessor scales near-linearly
+Glossary-style notes with 10 -> 10,000 "Term: definition" lines
+"""
+
+import string
+import time
+
+from src.note_processor.unified_processor import UnifiedProcessor
+
+
+def make_term(i):
+    """Unique single-word term: Glossa, Glossb, ..., Glossaa, ..."""
+    letters = ''
+    i += 1
+    while i:
+        i, r = divmod(i - 1, 26)
+        letters = string.ascii_lowercase[r] + letters
+    return 'Gloss' + letters
+
+
+def glossary_note(n):
+    lines = [f"{make_term(i)}: a glossary entry describing item number {i} in detail."
+             for i in range(n)]
+    # Repeat every term with a second pattern so the duplicate path is hit too
+    lines += [f"The {make_term(i)}: a repeated entry that must be dropped." for i in range(n)]
+    return '\n'.join(lines)
+
+
+def time_extract(processor, text, repeats=3):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = processor.extract_definitions(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def test_dedupe_scaling():
+    processor = UnifiedProcessor()
+
+    print("=" * 70)
+    print("DEDUPE SCALING: definitions per note 10 -> 10,000")
+    print("=" * 70)
+
+    timings = {}
+    for n in (10, 100, 1000, 10000):
+        elapsed, result = time_extract(processor, glossary_note(n))
+        assert len(result) == n
+        # First-wins: "The X:" normalizes to "X" and is dropped
+        assert all(d['pattern'] == 'colon' for d in result)
+        timings[n] = elapsed
+        print(f"  {n:>6} definitions: {elapsed * 1000:>9.2f} ms "
+              f"({elapsed / n * 1e6:.1f} us/definition)")
+
+    # 10x more definitions should cost ~10x, not ~100x
+    ratio = timings[10000] / timings[1000]
+    print(f"\n  1,000 -> 10,000 time ratio: {ratio:.1f}x (linear = 10x)")
+    assert ratio < 25
+
+
+def test_dedupe_first_wins():
+    processor = UnifiedProcessor()
+    definitions = []
+    index = {}
+    processor._add(definitions, 'The Cell', 'first definition here', 'is_are', index)
+    processor._add(definitions, 'cell', 'second definition here', 'colon', index)
+    processor._add(definitions, 'A Cell ', 'third definition here', 'colon')
+    assert definitions == [
+        {'term': 'The Cell', 'definition': 'first definition here', 'pattern': 'is_are'}
+    ]
+
+
+if __name__ == "__main__":
+    test_dedupe_scaling()
+    test_dedupe_first_wins()
@@ -0,0 +1,72 @@
+"""
+Test: domain routing picks the right pattern families, the classifier
+recognizes the dataset's domains, and routing keeps definition F1
+"""
+
+from src.note_processor.unified_processor import UnifiedProcessor
+from src.note_processor.domain_routing import (
+    DOMAINS, DomainClassifier, domain_from_note_id, evaluate_routing, load_dataset,
+    route_patterns)
+
+
+def test_routes():
+    patterns = UnifiedProcessor().patterns
+    assert route_patterns(patterns, None) is patterns
+    history = [e.label for e in route_patterns(patterns, 'history')]
+    math = [e.label for e in route_patterns(patterns, 'math')]
+    assert 'the_was_were' in history and 'a_an_is' not in history
+    assert 'the_was_were' not in math and 'a_an_is' in math
+    assert all(label in [e.label for e in patterns] for label in history + math)
+
+    try:
+        route_patterns(patterns, 'chemistry')
+        assert False, "unknown domain accepted"
+    except ValueError:
+        pass
+
+    assert domain_from_note_id('hist_003') == 'history'
+    assert domain_from_note_id('data/notes/lit_001') == 'literature'
+    assert domain_from_note_id('lecture_01') is None
+
+
+def test_classifier():
+    classifier = DomainClassifier()
+    notes = load_dataset()
+    guesses = [(classifier.classify(text), domain_from_note_id(note_id))
+               for note_id, text, _ in notes]
+    # Never confidently wrong; unsure notes fall back to every pattern
+    assert all(guess in (None, truth) for guess, truth in guesses)
+    assert sum(guess == truth for guess, truth in guesses) >= 0.9 * len(notes)
+    assert classifier.classify("") is None
+    assert classifier.classify("The King signed the Treaty after the War.") == 'history'
+
+
+def test_routing_keeps_f1():
+    notes = load_dataset()
+    report = evaluate_routing(notes, rounds=2)
+    print(report)
+    assert report['within_tolerance']
+
+    # Outside history, the skipped history family never produced a definition
+    plain = UnifiedProcessor()
+    for note_id, text, _ in notes:
+        domain = domain_from_note_id(note_id)
+        if domain != 'history':
+            assert plain.extract_definitions(text, domain=domain) == plain.extract_definitions(text)
+
+
+def test_routing_in_batch():
+    notes = [(note_id, text) for note_id, text, _ in load_dataset()]
+    routed = UnifiedProcessor(routing=True)
+    expected = [routed.structure_note(text) for _, text in notes]
+    pooled = UnifiedProcessor(routing=True).structure_notes(notes, workers=2, chunksize=8)
+    assert [result for _, result in pooled] == expected
+    assert set(routed.routes) <= set(DOMAINS) | {None}
+
+
+if __name__ == "__main__":
+    test_routes()
+    test_classifier()
+    test_routing_keeps_f1()
+    test_routing_in_batch()
+    print("✅ Domain routing OK")
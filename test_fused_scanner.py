@@ -0,0 +1,60 @@
+"""
+Test: fused definition engine returns exactly what the classic engine does
+"""
+
+import glob
+import random
+
+from src.note_processor.unified_processor import UnifiedProcessor
+
+
+def load_notes():
+    notes = {}
+    for path in sorted(glob.glob('data/research_dataset/notes/*.txt')):
+        with open(path, 'r') as f:
+            notes[path.split('/')[-1][:-4]] = f.read()
+    return notes
+
+
+def test_fused_matches_classic():
+    classic = UnifiedProcessor()
+    fused = UnifiedProcessor(engine='fused')
+    notes = load_notes()
+
+    # Shuffled line mixtures exercise anchors at odd places
+    rnd = random.Random(0)
+    lines = [line for text in notes.values() for line in text.split('\n')]
+    for i in range(20):
+        notes[f'mix_{i}'] = rnd.choice(['\n', ' ', '']).join(rnd.sample(lines, 30))
+
+    print("=" * 70)
+    print("FUSED ENGINE EQUIVALENCE")
+    print("=" * 70)
+
+    for note_id, text in notes.items():
+        expected = classic.extract_definitions(text)
+        assert fused.extract_definitions(text) == expected, note_id
+
+    print(f"✅ {len(notes)} notes: identical definitions and pattern labels")
+
+
+def test_fused_edge_cases():
+    classic = UnifiedProcessor()
+    fused = UnifiedProcessor(engine='fused')
+    cases = [
+        "",
+        "Cell\nMembrane is a thin layer around the cell",
+        "McDonald is a very old family name here",
+        "Mitochondria, which is the powerhouse of the cell.",
+        "Enzyme: a protein catalyst that speeds reactions.:Term: again here ok",
+        "The Treaty of Versailles was signed in 1919 Led by nobody",
+        "Canada is a country with many lakes and rivers",
+        "Result is is is is a long chain without any punctuation at all",
+    ]
+    for text in cases:
+        assert fused.extract_definitions(text) == classic.extract_definitions(text), text
+
+
+if __name__ == "__main__":
+    test_fused_matches_classic()
+    test_fused_edge_cases()
@@ -0,0 +1,99 @@
+"""
+Test: incremental re-extraction after edits equals extraction of the whole
+new text, and an edit only re-matches the segments around it
+"""
+
+import glob
+import random
+import time
+
+from src.note_processor.incremental import IncrementalProcessor, segment_spans
+from src.note_processor.unified_processor import UnifiedProcessor
+from src.note_processor.final_processor import NoteProcessor
+from src.note_processor.relationship_extractor import RelationshipExtractor
+
+TOKENS = ['Cell', 'Cells', 'is', 'are', 'was', 'were', 'The', 'the', 'a', 'an', 'of',
+          'means', 'refers to', 'known as', 'which', 'consists of', 'contains', ':',
+          '.', '. ', '\n', '.\n', ' \n', '\n\n', 'Energy', 'energy', 'Mitochondria',
+          'Photosynthesis', 'process', 'example', 'such as', 'part of', 'requires',
+          'builds on', 'Big Bang', '!', '?', 'membrane', ',']
+
+
+def load_notes():
+    texts = []
+    for path in sorted(glob.glob('data/research_dataset/notes/*.txt')):
+        with open(path, 'r') as f:
+            texts.append(f.read())
+    return texts
+
+
+def full_result(text):
+    definitions = UnifiedProcessor().extract_definitions(text)
+    return {
+        'definitions': definitions,
+        'concepts': NoteProcessor().extract_concepts(text),
+        'relationships': RelationshipExtractor().extract_relationships(text, definitions)
+    }
+
+
+def same(result, text):
+    expected = full_result(text)
+    return all(result[key] == expected[key] for key in expected)
+
+
+def test_segments_tile_text():
+    for text in ["", "no cut", "A.\n", "A. \nB\nC.\n\nD", ".\n.\n"]:
+        spans = segment_spans(text)
+        assert ''.join(text[s:e] for s, e in spans) == text
+
+
+def test_random_edits_match_full_extraction():
+    rng = random.Random(0)
+    notes = load_notes()
+    processor = IncrementalProcessor()
+    for text in notes[::4]:
+        result = processor.structure_note(text)
+        assert same(result, text)
+        for _ in range(5):
+            pos = rng.randint(0, len(text))
+            removed = rng.randint(0, min(30, len(text) - pos))
+            inserted = ' '.join(rng.choice(TOKENS) for _ in range(rng.randint(0, 8)))
+            text = text[:pos] + inserted + text[pos + removed:]
+            result = processor.update(result, text)
+            assert same(result, text)
+
+    for _ in range(300):
+        text = ' '.join(rng.choice(TOKENS) for _ in range(rng.randint(0, 40)))
+        assert same(processor.structure_note(text), text)
+
+
+def test_edit_on_long_note():
+    text = '\n'.join(load_notes())
+    while len(text.split()) < 10000:  # about 20 pages
+        text += '\n' + text
+    processor = IncrementalProcessor()
+
+    start = time.perf_counter()
+    result = processor.structure_note(text)
+    full_time = time.perf_counter() - start
+
+    middle = text.index('.\n', len(text) // 2) + 2
+    edited = text[:middle] + "Osmosis is the movement of water across a membrane.\n" + text[middle:]
+    start = time.perf_counter()
+    updated = processor.update(result, edited)
+    edit_time = time.perf_counter() - start
+
+    print(f"20-page note: full {full_time * 1000:.1f} ms, edit {edit_time * 1000:.1f} ms")
+    assert updated['recomputed'] == 1
+    assert any(d['term'] == 'Osmosis' for d in updated['definitions'])
+    assert same(updated, edited)
+
+    # Undoing the edit reuses every segment
+    assert processor.update(updated, text)['recomputed'] <= 1
+
+
+if __name__ == "__main__":
+    test_segments_tile_text()
+    test_random_edits_match_full_extraction()
+    test_edit_on_long_note()
+    print("✅ Incremental extraction OK")
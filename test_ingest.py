@@ -0,0 +1,199 @@
+"""
+Test: directory ingest processes every note once, writes NoteProcessor's
+results as JSONL, and on reruns skips unchanged files, refreshes touched
+ones, reprocesses edited ones and forgets deleted ones; results reach
+disk before the manifest rows that describe them, and a note the
+processor raises on is counted as failed without stopping the run
+"""
+
+import glob
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from src.note_processor import ingest as ingest_module
+from src.note_processor.final_processor import NoteProcessor
+from src.note_processor.ingest import Manifest, ingest, walk_notes
+
+
+def make_tree(tmp):
+    root = os.path.join(tmp, 'notes')
+    for path in sorted(glob.glob('data/research_dataset/notes/*.txt')):
+        name = os.path.basename(path)
+        domain = name.split('_')[0]
+        os.makedirs(os.path.join(root, domain), exist_ok=True)
+        shutil.copy(path, os.path.join(root, domain, name))
+    with open(os.path.join(root, 'README.json'), 'w') as f:
+        f.write('{}')  # not a note
+    return root
+
+
+class FragileProcessor(NoteProcessor):
+    """Raises on notes that mention the Treaty of Paris."""
+
+    def structure_note(self, text, **kwargs):
+        if 'Treaty of Paris' in text:
+            raise RuntimeError("cannot structure this note")
+        return super().structure_note(text, **kwargs)
+
+
+class CheckedManifest(Manifest):
+    """Fails if a commit records a file whose result is not on disk yet."""
+
+    def __init__(self, path, output):
+        super().__init__(path)
+        self.output = output
+        self.commits = 0
+
+    def commit(self):
+        super().commit()
+        self.commits += 1
+        written = set()
+        if os.path.exists(self.output):
+            written = {record['path'] for record in read_results(self.output)}
+        assert set(self.entries()) <= written
+
+
+def read_results(output):
+    with open(output, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_ingest_and_rerun():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_tree(tmp)
+        output = os.path.join(tmp, 'out', 'notes.jsonl')
+        manifest = os.path.join(tmp, 'manifest.sqlite3')
+        paths = [path for path, _, _ in walk_notes(root)]
+        assert len(paths) == len(glob.glob('data/research_dataset/notes/*.txt'))
+
+        stats = ingest(root, output, manifest=manifest, workers=2, chunksize=4, progress=None)
+        assert stats['processed'] == stats['scanned'] == len(paths)
+        assert stats['notes_per_second'] > 0 and stats['mb_per_second'] > 0
+        results = read_results(output)
+        assert sorted(r['path'] for r in results) == sorted(paths)
+        processor = NoteProcessor()
+        for r in results:
+            with open(r['path'], 'r') as f:
+                assert r['result'] == processor.process(f.read())
+
+        # Nothing changed: nothing read, nothing written
+        stats = ingest(root, output, manifest=manifest, workers=2, progress=None)
+        assert stats['unchanged'] == len(paths) and stats['processed'] == 0
+        assert len(read_results(output)) == len(paths)
+
+        touched, edited, deleted = paths[0], paths[1], paths[2]
+        os.utime(touched, ns=(time.time_ns(), time.time_ns() + 10**9))
+        with open(edited, 'a') as f:
+            f.write("\nOsmosis is the movement of water across a membrane.\n")
+        os.remove(deleted)
+        new = os.path.join(root, 'extra', 'new_note.md')
+        os.makedirs(os.path.dirname(new))
+        with open(new, 'w') as f:
+            f.write("Diffusion is the spread of particles from high to low concentration.")
+
+        stats = ingest(root, output, manifest=manifest, workers=1, progress=None)
+        assert (stats['processed'], stats['touched'], stats['removed']) == (2, 1, 1)
+        assert stats['unchanged'] == len(paths) - 3
+        latest = read_results(output)[len(paths):]
+        assert sorted(r['path'] for r in latest) == sorted([edited, new])
+        assert len(Manifest(manifest)) == len(paths)
+
+        stats = ingest(root, output, manifest=manifest, workers=1, force=True, progress=None)
+        assert stats['processed'] == len(paths)
+
+
+def test_other_roots_are_kept():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_tree(tmp)
+        manifest = Manifest(os.path.join(tmp, 'manifest.sqlite3'))
+        manifest.record('/elsewhere/note.txt', 1, 1, 'x')
+        output = os.path.join(tmp, 'notes.jsonl')
+        stats = ingest(os.path.join(root, 'bio'), output, manifest=manifest, workers=1,
+                       progress=None)
+        assert stats['removed'] == 0 and stats['processed'] > 0
+        assert '/elsewhere/note.txt' in manifest.entries()
+        manifest.close()
+
+
+def test_root_spellings_share_rows():
+    with tempfile.TemporaryDirectory() as tmp:
+        make_tree(tmp)
+        manifest = Manifest(os.path.join(tmp, 'manifest.sqlite3'))
+        output = os.path.join(tmp, 'notes.jsonl')
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            first = ingest('notes', output, manifest=manifest, workers=1, progress=None)
+            for root in ('./notes', 'notes/', os.path.join(tmp, 'notes')):
+                stats = ingest(root, output, manifest=manifest, workers=1, progress=None)
+                assert stats['unchanged'] == first['processed'] > 0
+                assert stats['processed'] == stats['removed'] == 0
+        finally:
+            os.chdir(cwd)
+        assert len(manifest.entries()) == first['processed']
+        assert all(os.path.isabs(record['path']) for record in read_results(output))
+        manifest.close()
+
+
+def test_span_results_are_written():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'notes')
+        os.makedirs(root)
+        text = "Mitosis is cell division. For example, skin cells divide by mitosis."
+        with open(os.path.join(root, 'bio.txt'), 'w') as f:
+            f.write(text)
+        output = os.path.join(tmp, 'notes.jsonl')
+        ingest(root, output, NoteProcessor, {'spans': True},
+               manifest=os.path.join(tmp, 'manifest.sqlite3'), workers=1, progress=None)
+        [record] = read_results(output)
+        assert record['result'] == json.loads(json.dumps(NoteProcessor().structure_note(text)))
+        assert record['result']['examples'] == ['skin cells divide by mitosis']
+
+
+def test_results_reach_disk_before_manifest_commits():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_tree(tmp)
+        output = os.path.join(tmp, 'notes.jsonl')
+        manifest = CheckedManifest(os.path.join(tmp, 'manifest.sqlite3'), output)
+        every = ingest_module.COMMIT_EVERY
+        ingest_module.COMMIT_EVERY = 3
+        try:
+            stats = ingest(root, output, manifest=manifest, workers=1, progress=None)
+        finally:
+            ingest_module.COMMIT_EVERY = every
+        assert manifest.commits > stats['processed'] // 3 > 0
+        manifest.close()
+
+
+def test_failing_note_is_counted():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_tree(tmp)
+        output = os.path.join(tmp, 'notes.jsonl')
+        manifest = os.path.join(tmp, 'manifest.sqlite3')
+        fragile = {path for path, _, _ in walk_notes(root)
+                   if 'Treaty of Paris' in open(path).read()}
+        assert fragile
+        stats = ingest(root, output, FragileProcessor, manifest=manifest, workers=1,
+                       progress=None)
+        assert stats['failed'] == len(fragile)
+        assert stats['processed'] == stats['scanned'] - len(fragile)
+
+        # Failed notes stay out of the manifest and are retried
+        stats = ingest(root, output, FragileProcessor, manifest=manifest, workers=2,
+                       chunksize=4, progress=None)
+        assert stats['failed'] == len(fragile) and stats['processed'] == 0
+        assert not fragile & set(Manifest(manifest).entries())
+        assert not fragile & {record['path'] for record in read_results(output)}
+
+
+if __name__ == "__main__":
+    test_ingest_and_rerun()
+    test_other_roots_are_kept()
+    test_root_spellings_share_rows()
+    test_span_results_are_written()
+    test_results_reach_disk_before_manifest_commits()
+    test_failing_note_is_counted()
+    print("✅ Directory ingest OK")
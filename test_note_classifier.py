@@ -0,0 +1,105 @@
+"""
+Test: hashed features and batch scores match a dense computation, the
+linear classifier learns the dataset's domains, classifies batches like
+single notes and round-trips through disk, and BasicNoteProcessor takes
+note-type models but refuses domain models
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+from src.note_processor.basic_processor import BasicNoteProcessor
+from src.note_processor.domain_routing import domain_from_note_id, load_dataset
+from src.note_processor.note_classifier import (LinearNoteClassifier, cross_validate,
+                                                feature_hasher)
+
+
+def test_features_and_scores():
+    model = LinearNoteClassifier(n_features=256)
+    texts = ["The cell membrane", "", "cell cell cell", "Treaty of Paris, 1783"]
+    rows = model.features(texts).toarray()
+    assert np.allclose(np.linalg.norm(rows, axis=1), [1, 0, 1, 1])
+    assert np.allclose(rows[2], model.features(["Cell  cell, cell"]).toarray()[0])
+    # Same columns in every process
+    assert np.array_equal(rows, feature_hasher(256).transform(texts).toarray())
+
+    rng = np.random.default_rng(0)
+    model.weights = rng.normal(size=(256, 3)).astype(np.float32)
+    model.bias = rng.normal(size=3).astype(np.float32)
+    assert np.allclose(model.decision(texts), rows @ model.weights + model.bias, atol=1e-5)
+
+    try:
+        LinearNoteClassifier(1000)
+        assert False, "n_features must be a power of two"
+    except ValueError:
+        pass
+
+
+def test_learns_domains():
+    notes = load_dataset()
+    texts = [text for _, text, _ in notes]
+    labels = [domain_from_note_id(note_id) for note_id, _, _ in notes]
+
+    model = LinearNoteClassifier().fit(texts, labels)
+    assert model.predict(texts) == labels
+    assert [model.predict([text])[0] for text in texts[:8]] == model.predict(texts[:8])
+    assert np.allclose(model.predict_proba(texts).sum(axis=1), 1)
+
+    predictions = cross_validate(texts, labels, folds=5)
+    accuracy = sum(p == label for p, label in zip(predictions, labels)) / len(labels)
+    print(f"cross-validated domain accuracy: {accuracy:.1%}")
+    assert accuracy >= 0.8
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'models', 'domain.npz')
+        model.save(path)
+        loaded = LinearNoteClassifier.load(path)
+    assert loaded.labels == model.labels and loaded.weights.dtype == np.float32
+    assert loaded.predict(texts) == labels
+
+    # Two labels: one logistic column, stored as two softmax columns
+    pair = [i for i, label in enumerate(labels) if label in labels[:1] + labels[-1:]]
+    binary = LinearNoteClassifier().fit([texts[i] for i in pair], [labels[i] for i in pair])
+    assert binary.weights.shape[1] == 2
+    assert binary.predict([texts[i] for i in pair]) == [labels[i] for i in pair]
+
+    # A domain model is not a note-type model
+    try:
+        BasicNoteProcessor(note_classifier=loaded)
+        assert False, "domain model accepted as note types"
+    except ValueError:
+        pass
+
+
+def test_note_types_in_processor():
+    notes = load_dataset()
+    texts = [text for _, text, _ in notes]
+    labels = BasicNoteProcessor().identify_note_types(texts)
+    model = LinearNoteClassifier().fit(texts, labels)
+    processor = BasicNoteProcessor(note_classifier=model)
+    assert processor.identify_note_types(texts) == model.predict(texts)
+    assert processor.structure_note(texts[0])['note_type'] == model.predict(texts[:1])[0]
+
+
+def test_errors():
+    for labels in (['a', 'a'], ['a']):
+        try:
+            LinearNoteClassifier().fit(["one note", "another"], labels)
+            assert False, "bad labels accepted"
+        except ValueError:
+            pass
+    try:
+        LinearNoteClassifier().predict(["untrained"])
+        assert False, "untrained model predicted"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    test_features_and_scores()
+    test_learns_domains()
+    test_note_types_in_processor()
+    test_errors()
+    print("✅ Note classifier OK")
@@ -0,0 +1,84 @@
+"""
+Test: the keyword matcher finds every occurrence, overlapping and nested
+ones included, and note-type classification (single and batch) agrees
+with scanning the text once per indicator phrase
+"""
+
+import glob
+import random
+
+from src.note_processor.basic_processor import BasicNoteProcessor
+from src.note_processor.keyword_matcher import (NOTE_TYPE_INDICATORS, KeywordMatcher,
+                                                NoteTypeClassifier)
+
+
+def per_phrase_note_type(text):
+    """identify_note_type as it was: one substring test per indicator."""
+    text_lower = text.lower()
+    scores = {note_type: sum(1 for ind in phrases if ind in text_lower)
+              for note_type, phrases in NOTE_TYPE_INDICATORS.items()}
+    note_type = max(scores, key=scores.get)
+    return note_type if scores[note_type] > 0 else 'general'
+
+
+def brute_counts(phrases, text):
+    counts = {}
+    for phrase in phrases:
+        n = sum(text.startswith(phrase, i) for i in range(len(text)))
+        if n:
+            counts[phrase] = n
+    return counts
+
+
+def random_texts(n, seed=0):
+    rng = random.Random(seed)
+    pieces = [p for phrases in NOTE_TYPE_INDICATORS.values() for p in phrases]
+    pieces += ['the', 'xt', 'nu', 'mber', 'Data', 'HOW TO', ' ', '.', 'factual', 'ye']
+    return [''.join(rng.choice(pieces) for _ in range(rng.randint(0, 12))) for _ in range(n)]
+
+
+def test_matcher_finds_everything():
+    phrases = ['a', 'ab', 'abc', 'bc', 'c', 'fact', 'factual', 'then', 'next', 'how to']
+    matcher = KeywordMatcher(phrases)
+    rng = random.Random(1)
+    for _ in range(500):
+        text = ''.join(rng.choice(['a', 'b', 'c', 'then', 'ext', 'factual', 'how to', ' '])
+                       for _ in range(rng.randint(0, 20)))
+        assert dict(matcher.counts(text)) == brute_counts(phrases, text)
+        assert matcher.present(text) == set(brute_counts(phrases, text))
+    assert list(matcher.finditer("thenext")) == [(0, 'then'), (3, 'next')]
+    assert list(KeywordMatcher([]).finditer("anything")) == []
+    for bad in ([''], ['a\x00b']):
+        try:
+            KeywordMatcher(bad)
+            assert False, "bad phrase accepted"
+        except ValueError:
+            pass
+
+
+def test_note_types_unchanged():
+    processor = BasicNoteProcessor()
+    texts = []
+    for path in sorted(glob.glob('data/research_dataset/notes/*.txt')):
+        with open(path, 'r') as f:
+            texts.append(f.read())
+    texts += random_texts(2000)
+    expected = [per_phrase_note_type(text) for text in texts]
+    assert [processor.identify_note_type(text) for text in texts] == expected
+    assert processor.identify_note_types(texts) == expected
+    assert processor.identify_note_types([]) == []
+    assert set(expected) == {'procedural', 'conceptual', 'factual', 'analytical', 'general'}
+
+
+def test_shared_phrases():
+    classifier = NoteTypeClassifier({'a': ('data', 'step'), 'b': ('data', 'Theory')})
+    assert classifier.classify("The theory, then data") == 'b'
+    assert classifier.classify("data only") == 'a'  # tie goes to the first type
+    assert classifier.classify_many(["nothing", "THEORY"]) == ['general', 'b']
+
+
+if __name__ == "__main__":
+    test_matcher_finds_everything()
+    test_note_types_unchanged()
+    test_shared_phrases()
+    print("✅ Note-type keyword matcher OK")
@@ -0,0 +1,89 @@
+"""
+Test: pattern packs are compiled only when first loaded, processors
+share the same compiled entries, composing packs gives the same
+patterns and definitions as routing the full table, and batch workers
+run the packs of the processor that sent them
+"""
+
+import glob
+import subprocess
+import sys
+
+from src.note_processor import definition_patterns
+from src.note_processor.definition_patterns import PACKS, PATTERN_SPECS, load_patterns
+from src.note_processor.domain_routing import DOMAINS, route_patterns
+from src.note_processor.history_processor import HistoryProcessor
+from src.note_processor.unified_processor import UnifiedProcessor
+
+LAZY_CHECK = """
+from src.note_processor import definition_patterns as patterns
+from src.note_processor.unified_processor import UnifiedProcessor
+from src.note_processor.history_processor import HistoryProcessor
+assert not patterns._compiled
+HistoryProcessor()
+assert set(patterns._compiled) == set(patterns.PACKS['history'])
+UnifiedProcessor(packs=('math', 'literature'))
+assert set(patterns._compiled) == set(patterns.PACKS['history'] + patterns.PACKS['math'])
+print('lazy')
+"""
+
+NOTE_PATHS = sorted(glob.glob('data/research_dataset/notes/*.txt'))
+
+
+def note_texts():
+    texts = []
+    for path in NOTE_PATHS:
+        with open(path, 'r') as f:
+            texts.append(f.read())
+    return texts
+
+
+def test_packs_load_lazily():
+    out = subprocess.run([sys.executable, '-c', LAZY_CHECK], capture_output=True, text=True)
+    assert out.stdout.strip() == 'lazy', out.stderr
+
+
+def test_one_compiled_source():
+    table = load_patterns()
+    assert [entry.label for entry in table] == list(PATTERN_SPECS)
+    assert definition_patterns.UNIFIED_PATTERNS is table
+    assert UnifiedProcessor().patterns is table
+    assert load_patterns('history', 'general') is load_patterns('general', 'history')
+
+    # HistoryProcessor runs the very entries UnifiedProcessor does
+    history = HistoryProcessor().patterns
+    assert [entry.label for entry in history] == list(PACKS['history'])
+    assert all(any(entry is other for other in table) for entry in history)
+
+    try:
+        load_patterns('chemistry')
+        assert False, "unknown pack accepted"
+    except ValueError:
+        pass
+
+
+def test_composed_packs_match_routing():
+    texts = note_texts()
+    full = UnifiedProcessor()
+    for domain in DOMAINS:
+        composed = UnifiedProcessor(packs=('general', domain))
+        assert list(composed.patterns) == list(route_patterns(full.patterns, domain))
+        for text in texts:
+            assert composed.extract_definitions(text) == full.extract_definitions(text, domain=domain)
+
+
+def test_batch_keeps_packs():
+    notes = [(path, text) for path, text in zip(NOTE_PATHS, note_texts())]
+    processor = UnifiedProcessor(packs=('history',))
+    serial = [(note_id, processor.structure_note(text)) for note_id, text in notes]
+    assert any(result['definitions'] for _, result in serial)
+    for workers in (1, 2):
+        assert list(processor.structure_notes(notes, workers=workers, chunksize=8)) == serial
+
+
+if __name__ == "__main__":
+    test_packs_load_lazily()
+    test_one_compiled_source()
+    test_composed_packs_match_routing()
+    test_batch_keeps_packs()
+    print("✅ Pattern packs OK")
@@ -0,0 +1,151 @@
+"""
+Test: per-pattern profiling counts add up and change no results, runs
+each validator once per match, and keeps the partial counts of a pattern
+cut short by the time budget
+"""
+
+import glob
+import string
+import time
+
+from src.note_processor.unified_processor import UnifiedProcessor
+from src.note_processor.history_processor import HistoryProcessor
+
+
+def load_notes():
+    notes = []
+    for path in sorted(glob.glob('data/research_dataset/notes/*.txt')):
+        with open(path, 'r') as f:
+            notes.append((path.split('/')[-1][:-4], f.read()))
+    return notes
+
+
+def check_profile(profile, total_definitions, notes):
+    assert profile.notes == notes
+    assert sum(s.accepted for s in profile.patterns.values()) == total_definitions
+    for stats in profile.patterns.values():
+        assert stats.matches == stats.rejected + stats.duplicates + stats.accepted
+        assert min(stats.rejected, stats.duplicates, stats.accepted) >= 0
+        assert stats.time >= 0
+
+
+def test_profiling_is_opt_in():
+    assert UnifiedProcessor().profile is None
+    assert HistoryProcessor().profile is None
+
+
+def test_unified_profile():
+    notes = load_notes()
+    for engine in ('classic', 'fused'):
+        plain = UnifiedProcessor(engine=engine)
+        profiled = UnifiedProcessor(engine=engine, profile=True)
+        total = 0
+        for _, text in notes:
+            definitions = profiled.extract_definitions(text)
+            assert definitions == plain.extract_definitions(text)
+            total += len(definitions)
+        check_profile(profiled.profile, total, len(notes))
+
+    # Raw match counts are those of re.findall over each note
+    profile = profiled.profile
+    for entry in profiled.patterns:
+        raw = sum(len(entry.regex.findall(text)) for _, text in notes)
+        stats = profile.patterns.get(entry.label)  # absent if always prefiltered out
+        assert (stats.matches if stats else 0) == raw
+
+    print(profile.report())
+
+
+def test_history_profile():
+    notes = load_notes()
+    plain = HistoryProcessor()
+    profiled = HistoryProcessor(profile=True)
+    total = 0
+    for _, text in notes:
+        definitions = profiled.extract_definitions(text)
+        assert definitions == plain.extract_definitions(text)
+        total += len(definitions)
+    check_profile(profiled.profile, total, len(notes))
+    assert list(profiled.profile.patterns) == ['the_was_were', 'the_colon', 'multiword_of', 'simple_colon']
+
+
+class CountingValidators:
+    """Wrap every pattern's validator to count (and optionally slow) its calls."""
+
+    def __init__(self, patterns, delay=0.0):
+        self.patterns = patterns
+        self.delay = delay
+        self.calls = 0
+
+    def __enter__(self):
+        self.originals = [entry.validator for entry in self.patterns]
+        for entry, validator in zip(self.patterns, self.originals):
+            entry.validator = self.wrap(validator)
+        return self
+
+    def __exit__(self, *exc):
+        for entry, validator in zip(self.patterns, self.originals):
+            entry.validator = validator
+
+    def wrap(self, validator):
+        def counted(*args):
+            self.calls += 1
+            time.sleep(self.delay)
+            return validator(*args)
+        return counted
+
+
+def test_validators_run_once():
+    notes = load_notes()
+    plain = UnifiedProcessor()
+    profiled = UnifiedProcessor(profile=True)
+    counts = {}
+    for processor in (plain, profiled):
+        with CountingValidators(processor.patterns) as counter:
+            for _, text in notes:
+                processor.extract_definitions(text)
+        counts[processor.profile is None] = counter.calls
+    assert counts[True] == counts[False] > 0
+
+
+def test_aborted_pattern_is_profiled():
+    terms = [f"Gloss{a}{b}" for a in string.ascii_lowercase for b in string.ascii_lowercase]
+    text = '\n'.join(f"{term}: a glossary entry describing this item in detail."
+                     for term in terms[:200])
+    processor = UnifiedProcessor(profile=True, time_budget=0.05)
+    with CountingValidators(processor.patterns, delay=0.02):
+        processor.extract_definitions(text)
+    aborted = processor.aborted
+    assert aborted is not None
+    stats = processor.profile.patterns[aborted['pattern']]
+    assert stats.runs == 1 and stats.time > 0
+    assert 0 < stats.matches < 200
+    assert stats.matches == stats.rejected + stats.duplicates + stats.accepted
+
+
+def test_batch_profile_merges_workers():
+    notes = load_notes()
+    serial = UnifiedProcessor(profile=True)
+    for _, text in notes:
+        serial.extract_definitions(text)
+
+    pooled = UnifiedProcessor(profile=True)
+    results = list(pooled.structure_notes(notes, workers=2, chunksize=4))
+    assert len(results) == len(notes)
+
+    expected = serial.profile.as_dict()
+    merged = pooled.profile.as_dict()
+    assert merged['notes'] == expected['notes'] == len(notes)
+    for label, stats in expected['patterns'].items():
+        for key in ('runs', 'matches', 'rejected', 'duplicates', 'accepted'):
+            assert merged['patterns'][label][key] == stats[key]
+
+
+if __name__ == "__main__":
+    test_profiling_is_opt_in()
+    test_unified_profile()
+    test_history_profile()
+    test_validators_run_once()
+    test_aborted_pattern_is_profiled()
+    test_batch_profile_merges_workers()
+    print("✅ Pattern profiling OK")
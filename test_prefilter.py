@@ -0,0 +1,54 @@
+"""
+Test: the trigger prefilter only drops work, never matches
+Patterns it skips have no matches, and patterns it starts late find the
+same matches as re.findall over the whole note.
+"""
+
+import glob
+
+from src.note_processor.prefilter import TriggerPrefilter
+from src.note_processor.unified_processor import UnifiedProcessor
+
+SHORT_NOTE = ("Photosynthesis is the process plants use to make food.\n"
+              "Chlorophyll is a green pigment found in leaves.\n")
+
+
+def load_notes():
+    notes = []
+    for path in sorted(glob.glob('data/research_dataset/notes/*.txt')):
+        with open(path, 'r') as f:
+            notes.append(f.read())
+    return notes
+
+
+def test_prefilter_keeps_every_match():
+    prefilter = TriggerPrefilter()
+    notes = load_notes()
+    notes += ["", "No triggers here", "Key Terms:\nCell: the unit of life.",
+              "Intro. Then. The Treaty of Paris was signed in 1783. Osmosis means diffusion of water."]
+
+    for text in notes:
+        planned = dict((entry.label, pos) for entry, pos in prefilter.plan(text))
+        for entry in prefilter.patterns:
+            expected = entry.regex.findall(text)
+            if entry.label not in planned:
+                assert expected == []
+            else:
+                assert entry.regex.findall(text, planned[entry.label]) == expected
+
+
+def test_short_note_skips_patterns():
+    prefilter = TriggerPrefilter()
+    labels = [entry.label for entry, _ in prefilter.plan(SHORT_NOTE)]
+    # Only the "is/are" family has its trigger in the note
+    assert labels == ['is_are', 'a_an_is', 'the_is_are', 'multiword_cap_lower_are']
+
+    processor = UnifiedProcessor()
+    unfiltered = [(entry, entry.regex.findall(SHORT_NOTE)) for entry in processor.patterns]
+    assert list(processor._scan(SHORT_NOTE)) == [(e, m) for e, m in unfiltered if e.label in labels]
+
+
+if __name__ == "__main__":
+    test_prefilter_keeps_every_match()
+    test_short_note_skips_patterns()
+    print("✅ Trigger prefilter drops only patterns that cannot match")
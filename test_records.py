@@ -0,0 +1,131 @@
+"""
+Test: compact records read exactly like the result dicts they replace,
+round-trip through RecordTable and pickling, and take less memory
+"""
+
+import glob
+import pickle
+import tracemalloc
+
+from src.note_processor.unified_processor import UnifiedProcessor
+from src.note_processor.history_processor import HistoryProcessor
+from src.note_processor.final_processor import NoteProcessor
+from src.note_processor.basic_processor import BasicNoteProcessor
+from src.note_processor.relationship_extractor import RelationshipExtractor
+from src.note_processor.records import Definition, Relationship, RecordTable
+
+
+def load_notes():
+    notes = []
+    for path in sorted(glob.glob('data/research_dataset/notes/*.txt')):
+        with open(path, 'r') as f:
+            notes.append((path.split('/')[-1][:-4], f.read()))
+    return notes
+
+
+def test_records_read_like_dicts():
+    d = Definition('Osmosis', 'diffusion of water', 'is_are')
+    assert d['term'] == 'Osmosis' and d.get('pattern') == 'is_are'
+    assert dict(d) == {'term': 'Osmosis', 'definition': 'diffusion of water', 'pattern': 'is_are'}
+    assert d == dict(d) and dict(d) == d
+
+    # Processors without a pattern label have two keys
+    bare = Definition('Osmosis', 'diffusion of water')
+    assert list(bare) == ['term', 'definition'] and 'pattern' not in bare
+    assert bare.get('pattern') is None
+
+    r = Relationship('Cell', 'Tissue', 'is_part_of', 0.9)
+    assert r['confidence'] == 0.9 and len(r) == 4
+    assert pickle.loads(pickle.dumps(r)) == r
+
+
+def test_compact_processors_match_dicts():
+    processors = [
+        (UnifiedProcessor, {}),
+        (UnifiedProcessor, {'engine': 'fused'}),
+        (HistoryProcessor, {}),
+        (NoteProcessor, {}),
+        (BasicNoteProcessor, {}),
+    ]
+    notes = load_notes()
+    relations = RelationshipExtractor()
+    compact_relations = RelationshipExtractor(compact=True)
+    for cls, kwargs in processors:
+        plain = cls(**kwargs)
+        compact = cls(compact=True, **kwargs)
+        for _, text in notes:
+            expected = plain.extract_definitions(text)
+            found = compact.extract_definitions(text)
+            assert all(isinstance(d, Definition) for d in found)
+            assert found == expected
+
+            links = compact_relations.extract_relationships(text, found)
+            assert all(isinstance(r, Relationship) for r in links)
+            assert links == relations.extract_relationships(text, expected)
+
+
+def test_record_table_round_trip():
+    notes = load_notes()
+    processor = UnifiedProcessor(compact=True)
+    results = [processor.extract_definitions(text) for _, text in notes]
+
+    table = RecordTable().extend(results)
+    assert len(table) == len(notes) and table.rows == sum(map(len, results))
+    assert list(table) == results
+    assert table[3] == results[3] and table[-1] == results[-1]
+    assert table.labels == list(dict.fromkeys(d.pattern for r in results for d in r))
+
+    # Dicts go in just as well
+    plain = [UnifiedProcessor().extract_definitions(text) for _, text in notes]
+    one_by_one = RecordTable()
+    for definitions in plain:
+        one_by_one.append(definitions)
+    assert list(one_by_one) == plain
+
+    copy = pickle.loads(pickle.dumps(table))
+    assert list(copy) == results
+    copy.append(results[0])
+    assert copy[-1] == results[0] and copy.labels == table.labels
+
+    edges = RecordTable(Relationship).append([Relationship('A', 'B', 'is_part_of', 0.8)])
+    assert edges[0][0]['confidence'] == 0.8
+
+
+def test_compact_batch():
+    notes = load_notes()
+    expected = [UnifiedProcessor().structure_note(text) for _, text in notes]
+    pooled = UnifiedProcessor(compact=True).structure_notes(notes, workers=2, chunksize=8)
+    results = [result for _, result in pooled]
+    assert results == expected
+    assert all(isinstance(d, Definition) for r in results for d in r['definitions'])
+
+
+def test_compact_memory():
+    texts = [text for _, text in load_notes()]
+    plain = [UnifiedProcessor().extract_definitions(text) for text in texts]
+
+    def retained(build):
+        # Only the containers: the strings are shared with plain
+        tracemalloc.start()
+        result = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del result
+        return size
+
+    as_dicts = retained(lambda: [[dict(d) for d in r] for r in plain])
+    as_records = retained(lambda: [[Definition.from_dict(d) for d in r] for r in plain])
+    as_table = retained(lambda: RecordTable().extend(plain))
+    print(f"Containers: dicts {as_dicts // 1024} KB, records {as_records // 1024} KB, "
+          f"table {as_table // 1024} KB")
+    assert as_records * 2 < as_dicts
+    assert as_table * 2 < as_records
+
+
+if __name__ == "__main__":
+    test_records_read_like_dicts()
+    test_compact_processors_match_dicts()
+    test_record_table_round_trip()
+    test_compact_batch()
+    test_compact_memory()
+    print("✅ Compact records OK")
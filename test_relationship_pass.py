@@ -0,0 +1,121 @@
+"""
+Test: the single-pass relationship extractor gives exactly the output of
+the original three passes (split, lowercase and re.search per family),
+on the dataset and on shuffled lines, for plain text and SegmentedDocument
+"""
+
+import glob
+import random
+import re
+
+from src.note_processor.relationship_extractor import RELATION_WORDS, RelationshipExtractor
+from src.note_processor.segmentation import SegmentedDocument
+from src.note_processor.unified_processor import UnifiedProcessor
+
+WORDS = r'(\w+(?:\s+\w+)*)'
+
+TEMPLATES = ("{} is an example of {}.", "Organelles such as {} belong to {}.",
+             "The {} is part of the {}", "{} consists of {} and more",
+             "{} requires understanding of {}", "Studying {} builds on {}",
+             "- {} requires {}; it is a part of the poem")
+RELATED = ['Mitochondria', 'Cell', 'Algebra', 'Calculus', 'Treaty of Paris',
+           'World War', 'Metaphor', 'Poetry', 'Photosynthesis', 'Plants']
+
+
+def three_pass_relationships(text, definitions):
+    """The extractor before the single pass: one split and lowercase per family."""
+    relationships = []
+    terms = [d['term'].lower() for d in definitions]
+    if len(terms) < 2:
+        return relationships
+
+    def known(side):
+        return any(side in t or t in side for t in terms)
+
+    def relation(source, target, rel_type, confidence):
+        return {'source': source.strip().title(), 'target': target.strip().title(),
+                'type': rel_type, 'confidence': confidence}
+
+    for line in text.split('\n'):
+        line_lower = line.lower()
+        match = re.search(WORDS + r'\s+is\s+an?\s+example\s+of\s+' + WORDS, line_lower)
+        if match and known(match.group(1)) and known(match.group(2)):
+            relationships.append(relation(*match.groups(), 'is_example_of', 0.9))
+        match = re.search(r'such\s+as\s+' + WORDS, line_lower)
+        if match:
+            example = match.group(1).strip()
+            for term in terms:
+                if term in line_lower and term != example:
+                    if known(example):
+                        relationships.append(relation(example, term, 'is_example_of', 0.7))
+                        break
+
+    for line in text.split('\n'):
+        line_lower = line.lower()
+        match = re.search(WORDS + r'\s+is\s+(?:a\s+)?part\s+of\s+(?:the\s+)?' + WORDS, line_lower)
+        if match and known(match.group(1)) and known(match.group(2)):
+            relationships.append(relation(*match.groups(), 'is_part_of', 0.9))
+        match = re.search(WORDS + r'\s+consists?\s+of\s+' + WORDS, line_lower)
+        if match and known(match.group(1)) and known(match.group(2)):
+            relationships.append(relation(match.group(2), match.group(1), 'is_part_of', 0.8))
+
+    for line in text.split('\n'):
+        line_lower = line.lower()
+        match = re.search(WORDS + r'\s+requires?\s+(?:understanding\s+of\s+)?' + WORDS, line_lower)
+        if match and known(match.group(1)) and known(match.group(2)):
+            relationships.append(relation(match.group(2), match.group(1), 'is_prerequisite_for', 0.8))
+        match = re.search(WORDS + r'\s+builds?\s+on\s+' + WORDS, line_lower)
+        if match and known(match.group(1)) and known(match.group(2)):
+            relationships.append(relation(match.group(2), match.group(1), 'is_prerequisite_for', 0.7))
+
+    return relationships
+
+
+def dataset_cases():
+    """(text, definitions) for every dataset note."""
+    processor = UnifiedProcessor()
+    cases = []
+    for path in sorted(glob.glob('data/research_dataset/notes/*.txt')):
+        with open(path, 'r') as f:
+            text = f.read()
+        cases.append((text, processor.extract_definitions(text)))
+    return cases
+
+
+def test_lines_containing():
+    text = "Such as\nnothing here\nİİ part of\n\nBUILDS ON it\nrequire"
+    doc = SegmentedDocument(text)
+    lower_lines = doc.lower_lines
+    expected = [i for i, line in enumerate(lower_lines)
+                if any(word in line for word in RELATION_WORDS)]
+    assert doc.lines_containing(RELATION_WORDS) == expected == [0, 2, 4, 5]
+    assert SegmentedDocument("").lines_containing(RELATION_WORDS) == []
+
+
+def test_matches_three_passes():
+    extractor = RelationshipExtractor()
+    cases = dataset_cases()
+    rnd = random.Random(7)
+    lines = [line for text, _ in cases for line in text.split('\n')]
+    terms = [d for _, definitions in cases for d in definitions]
+    # The dataset has few relationship lines: mix in sentences of every family
+    lines += [template.format(*rnd.sample(RELATED, 2)) for template in TEMPLATES for _ in range(20)]
+    for _ in range(200):
+        text = '\n'.join(rnd.choice(lines) for _ in range(30))
+        definitions = rnd.sample(terms, 10) + [{'term': t} for t in rnd.sample(RELATED, 4)]
+        cases.append((text, definitions))
+    cases.append(("Cells such as neurons.\nA cell is part of the tissue.", [{'term': 'Cell'}]))
+
+    found = 0
+    for text, definitions in cases:
+        expected = three_pass_relationships(text, definitions)
+        assert extractor.extract_relationships(text, definitions) == expected
+        assert extractor.extract_relationships(SegmentedDocument(text), definitions) == expected
+        found += len(expected)
+    assert found > 0
+
+
+if __name__ == "__main__":
+    test_lines_containing()
+    test_matches_three_passes()
+    print("✅ Single-pass relationships OK")
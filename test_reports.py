@@ -0,0 +1,115 @@
+"""
+Test: streamed reports match format_output and format_structured_note,
+omit or truncate the original text on request, write valid JSONL, and
+use the same memory for 5000 notes as for 500
+"""
+
+import glob
+import io
+import json
+import tracemalloc
+
+from src.note_processor.basic_processor import BasicNoteProcessor
+from src.note_processor.final_processor import NoteProcessor
+from src.note_processor.reports import markdown_lines, text_lines, write_report
+
+
+def load_texts():
+    texts = []
+    for path in sorted(glob.glob('data/research_dataset/notes/*.txt')):
+        with open(path, 'r') as f:
+            texts.append((path, f.read()))
+    return texts
+
+
+class NullSink:
+    """Counts what is written and keeps none of it."""
+
+    def __init__(self):
+        self.chars = 0
+
+    def write(self, text):
+        self.chars += len(text)
+
+
+def test_matches_formatters():
+    processor, basic = NoteProcessor(), BasicNoteProcessor()
+    notes = load_texts()
+    for path, text in notes:
+        result = processor.process(text)
+        assert '\n'.join(text_lines(result, path)) == processor.format_output(result, path)
+        structured = basic.structure_note(text)
+        assert '\n'.join(markdown_lines(structured)) == basic.format_structured_note(structured)
+
+    results = [(path, processor.process(text)) for path, text in notes]
+    sink = io.StringIO()
+    assert write_report(iter(results), sink, fmt='text') == len(notes)
+    assert sink.getvalue() == ''.join(processor.format_output(result, path) + '\n'
+                                      for path, result in results)
+
+
+def test_original_text_options():
+    basic = BasicNoteProcessor()
+    path, text = load_texts()[0]
+    structured = basic.structure_note(text)
+    assert len(text) > 100
+
+    full = '\n'.join(markdown_lines(structured, title=path))
+    assert full.startswith(f"# {path}\n") and full.endswith(text)
+    omitted = '\n'.join(markdown_lines(structured, max_original=0))
+    assert "## Original Text" not in omitted
+    assert omitted == basic.format_structured_note(structured).split("\n\n## Original Text")[0]
+    truncated = '\n'.join(markdown_lines(structured, max_original=40))
+    assert truncated.endswith("## Original Text\n" + text[:40] + "...")
+
+    plain = '\n'.join(text_lines(structured, max_original=40))
+    assert "📝 ORIGINAL TEXT:\n" + text[:40] + "..." in plain
+    assert "ORIGINAL TEXT" not in '\n'.join(text_lines(structured, max_original=0))
+
+    sink = io.StringIO()
+    write_report([(path, structured)] * 3, sink, fmt='jsonl', max_original=0)
+    records = [json.loads(line) for line in sink.getvalue().splitlines()]
+    assert len(records) == 3 and 'original_text' not in records[0]
+    assert records[0]['note_id'] == path
+    assert records[0]['key_concepts'] == structured['key_concepts']
+
+    sink = io.StringIO()
+    write_report([(path, structured)], sink, fmt='jsonl', max_original=10)
+    assert json.loads(sink.getvalue())['original_text'] == text[:10] + "..."
+
+    try:
+        write_report([], sink, fmt='html')
+        assert False, "unknown format accepted"
+    except ValueError:
+        pass
+
+
+def test_constant_memory():
+    basic = BasicNoteProcessor()
+    path, text = load_texts()[0]
+    structured = basic.structure_note(text)
+
+    def notes(n):
+        for i in range(n):
+            # Each note gets its own large original text, built on demand
+            yield f"note{i}", dict(structured, original_text=text * 50 + str(i))
+
+    peaks = []
+    for n in (500, 5000):
+        for fmt in ('markdown', 'jsonl'):
+            sink = NullSink()
+            tracemalloc.start()
+            write_report(notes(n), sink, fmt=fmt, max_original=200)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            assert sink.chars > n * 200
+    print(f"peak bytes (500 md, 500 jsonl, 5000 md, 5000 jsonl): {peaks}")
+    assert max(peaks) < 4 * len(text) * 50
+    assert peaks[2] < 2 * peaks[0] and peaks[3] < 2 * peaks[1]
+
+
+if __name__ == "__main__":
+    test_matches_formatters()
+    test_original_text_options()
+    test_constant_memory()
+    print("✅ Streaming reports OK")
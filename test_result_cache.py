@@ -0,0 +1,189 @@
+"""
+Test: cached structure_note results equal fresh ones, tiers and counters
+behave, span results come back as plain JSON on misses and hits alike,
+a pattern or skip-word change invalidates old entries, and only code
+changes purge them from disk
+"""
+
+import glob
+import os
+import tempfile
+
+from src.note_processor import unified_processor
+from src.note_processor.result_cache import ResultCache, pattern_version
+from src.note_processor.unified_processor import UnifiedProcessor
+from src.note_processor.history_processor import HistoryProcessor
+from src.note_processor.basic_processor import BasicNoteProcessor
+from src.note_processor.final_processor import NoteProcessor
+
+
+def load_notes():
+    texts = []
+    for path in sorted(glob.glob('data/research_dataset/notes/*.txt')):
+        with open(path, 'r') as f:
+            texts.append(f.read())
+    return texts
+
+
+def test_cache_tiers():
+    notes = load_notes()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cache.sqlite3')
+        for processor in (UnifiedProcessor(), HistoryProcessor(), BasicNoteProcessor()):
+            cache = ResultCache(path)
+            expected = [processor.structure_note(text) for text in notes]
+
+            assert [cache.structure_note(processor, t) for t in notes] == expected
+            assert cache.stats()['misses'] == len(notes)
+            assert [cache.structure_note(processor, t) for t in notes] == expected
+            assert cache.stats()['memory_hits'] == len(notes)
+            cache.close()
+
+            # A new process starts with an empty memory tier
+            cache = ResultCache(path)
+            assert [cache.structure_note(processor, t) for t in notes] == expected
+            stats = cache.stats()
+            assert stats['disk_hits'] == len(notes) and stats['misses'] == 0
+            cache.close()
+
+
+def test_hits_are_copies():
+    cache = ResultCache(path=None)
+    processor = UnifiedProcessor()
+    text = "Osmosis is the diffusion of water across a membrane."
+    first = cache.structure_note(processor, text)
+    first['definitions'].clear()
+    assert cache.structure_note(processor, text)['definitions']
+
+
+def test_span_results():
+    notes = load_notes()[:10] + [
+        "Mitosis is cell division. For example, skin cells divide by mitosis.\n"
+        "Example: root tips grow quickly"]
+    for spans, default in ((NoteProcessor(spans=True), NoteProcessor()),
+                           (UnifiedProcessor(spans=True), UnifiedProcessor())):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResultCache(os.path.join(tmp, 'cache.sqlite3'))
+            for text in notes:
+                miss = cache.structure_note(spans, text)
+                hit = cache.structure_note(spans, text)
+                assert miss == hit == default.structure_note(text)
+                assert all(type(d) is dict for d in miss['definitions'])
+                assert all(type(e) is str for e in miss.get('examples', []))
+            assert cache.stats()['misses'] == len(notes)
+            if isinstance(spans, NoteProcessor):
+                assert len(miss['examples']) == 2  # TextSpans, read back as strings
+            cache.close()
+
+
+def test_eviction():
+    notes = load_notes()
+    processor = UnifiedProcessor()
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResultCache(os.path.join(tmp, 'cache.sqlite3'), max_memory=5, max_disk=10)
+        for text in notes:
+            cache.structure_note(processor, text)
+        stats = cache.stats()
+        assert stats['memory_entries'] == 5 and stats['evictions'] == len(notes) - 5
+        assert stats['disk_entries'] == 10 and stats['disk_evictions'] == len(notes) - 10
+
+        # The most recent notes are still served from memory
+        cache.structure_note(processor, notes[-1])
+        assert cache.stats()['memory_hits'] == 1
+        cache.close()
+
+
+def test_pattern_change_invalidates():
+    notes = load_notes()[:5]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cache.sqlite3')
+        cache = ResultCache(path)
+        processor = UnifiedProcessor()
+        for text in notes:
+            cache.structure_note(processor, text)
+
+        changed = UnifiedProcessor()
+        changed.pronouns = changed.pronouns | {'membrane'}
+        assert pattern_version(changed) != pattern_version(processor)
+
+        # Old entries do not match, but stay on disk for the original word sets
+        for text in notes:
+            assert cache.structure_note(changed, text) == changed.structure_note(text)
+        stats = cache.stats()
+        assert stats['misses'] == 2 * len(notes) and stats['disk_entries'] == 2 * len(notes)
+        cache.close()
+
+        # Entries written by other code are dropped from disk on first use
+        cache = ResultCache(path)
+        cache.put('stale', {}, 'UnifiedProcessor', 'old code')
+        cache.flush()
+        cache.close()
+        cache = ResultCache(path)
+        assert cache.stats()['disk_entries'] == 2 * len(notes) + 1
+        cache.structure_note(processor, notes[0])
+        stats = cache.stats()
+        assert stats['disk_hits'] == 1 and stats['disk_entries'] == 2 * len(notes)
+        cache.close()
+
+
+def test_configurations_share_disk():
+    text = load_notes()[0]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cache.sqlite3')
+        for processor in (UnifiedProcessor(), UnifiedProcessor(engine='fused'), UnifiedProcessor()):
+            cache = ResultCache(path)
+            cache.structure_note(processor, text)
+            cache.close()
+        assert cache.stats()['disk_hits'] == 1 and cache.stats()['misses'] == 0
+
+
+def test_reconfigured_processor():
+    text = "Osmosis is the diffusion of water across a membrane."
+    cache = ResultCache(path=None)
+    processor = UnifiedProcessor()
+    assert cache.structure_note(processor, text)['definitions']
+    processor.pronouns = processor.pronouns | {'osmosis'}
+    assert cache.structure_note(processor, text) == processor.structure_note(text)
+    assert cache.stats()['misses'] == 2
+
+
+def test_skip_words_change_invalidates():
+    notes = load_notes()[:5]
+    cache = ResultCache(path=None)
+    processor = UnifiedProcessor()
+    for text in notes:
+        cache.structure_note(processor, text)
+
+    original = unified_processor.MULTIWORD_SKIP_WORDS
+    unified_processor.MULTIWORD_SKIP_WORDS = original | {'factory'}
+    try:
+        changed = UnifiedProcessor()
+        assert pattern_version(changed) != pattern_version(processor)
+        for text in notes:
+            assert cache.structure_note(changed, text) == changed.structure_note(text)
+        assert cache.stats()['misses'] == 2 * len(notes)
+    finally:
+        unified_processor.MULTIWORD_SKIP_WORDS = original
+    assert pattern_version(UnifiedProcessor()) == pattern_version(processor)
+
+
+def test_aborted_results_are_not_cached():
+    cache = ResultCache(path=None)
+    processor = UnifiedProcessor(time_budget=0)
+    text = "Osmosis is the diffusion of water across a membrane."
+    cache.structure_note(processor, text)
+    cache.structure_note(processor, text)
+    assert cache.stats()['misses'] == 2
+
+
+if __name__ == "__main__":
+    test_cache_tiers()
+    test_hits_are_copies()
+    test_span_results()
+    test_eviction()
+    test_pattern_change_invalidates()
+    test_configurations_share_disk()
+    test_reconfigured_processor()
+    test_skip_words_change_invalidates()
+    test_aborted_results_are_not_cached()
+    print("✅ Result cache OK")
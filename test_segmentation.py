@@ -0,0 +1,56 @@
+"""
+Test: SegmentedDocument matches the ad-hoc splits it replaces, and every
+processor gives the same result for a document as for the raw string
+"""
+
+import glob
+import re
+
+from src.note_processor.segmentation import SegmentedDocument, as_document
+from src.note_processor.unified_processor import UnifiedProcessor
+from src.note_processor.history_processor import HistoryProcessor
+from src.note_processor.final_processor import NoteProcessor
+from src.note_processor.basic_processor import BasicNoteProcessor
+from src.note_processor.relationship_extractor import RelationshipExtractor
+
+
+def test_segments_match_splits():
+    texts = [open(p).read() for p in sorted(glob.glob('data/research_dataset/notes/*.txt'))]
+    texts += ["", "\n", "no terminator", "A. B! C? ...", "Ünïcödé\nİstanbul Σ.\nÉtat"]
+
+    for text in texts:
+        doc = SegmentedDocument(text)
+        assert doc.lines == text.split('\n')
+        assert doc.lower_lines == [line.lower() for line in text.split('\n')]
+        assert doc.sentences == re.split(r'[.!?]+', text)
+        assert doc.lower == text.lower()
+        assert doc.words == text.split()
+        assert as_document(doc) is doc
+
+
+def test_processors_accept_documents():
+    unified = UnifiedProcessor()
+    history = HistoryProcessor()
+    final = NoteProcessor()
+    basic = BasicNoteProcessor()
+    relations = RelationshipExtractor()
+
+    for path in sorted(glob.glob('data/research_dataset/notes/*.txt')):
+        with open(path, 'r') as f:
+            text = f.read()
+        doc = SegmentedDocument(text)
+
+        definitions = unified.extract_definitions(text)
+        assert unified.extract_definitions(doc) == definitions
+        assert history.extract_definitions(doc) == history.extract_definitions(text)
+        assert final.process(doc) == final.process(text)
+        assert basic.extract_definitions(doc) == basic.extract_definitions(text)
+        assert basic.identify_note_type(doc) == basic.identify_note_type(text)
+        assert relations.extract_relationships(doc, definitions) == \
+            relations.extract_relationships(text, definitions)
+
+
+if __name__ == "__main__":
+    test_segments_match_splits()
+    test_processors_accept_documents()
+    print("✅ Segmented documents match plain-text processing")
@@ -0,0 +1,121 @@
+"""
+Test: the concept sketch never underestimates, stays within its error
+bound, merges shards into exactly the sketch of the whole stream, and
+round-trips through disk
+"""
+
+import glob
+import os
+import random
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.note_processor.final_processor import NoteProcessor
+from src.note_processor.sketch import ConceptSketch
+
+
+def load_texts():
+    texts = []
+    for path in sorted(glob.glob('data/research_dataset/notes/*.txt')):
+        with open(path, 'r') as f:
+            texts.append(f.read())
+    return texts
+
+
+def zipf_stream(n, seed=0, alpha=0.3):
+    """Heavy-tailed stream: a few frequent concepts, thousands of rare ones."""
+    rng = random.Random(seed)
+    return [f"concept{int(rng.paretovariate(alpha))}" for _ in range(n)]
+
+
+def test_error_bounds():
+    stream = zipf_stream(100000)
+    exact = Counter(stream)
+    sketch = ConceptSketch(epsilon=0.002, delta=0.01, top_k=20)
+    for i in range(0, len(stream), 500):
+        sketch.update(stream[i:i + 500])
+    assert sketch.total == len(stream)
+    assert sketch.table.shape == (5, 1360)
+
+    errors = [sketch.estimate(item) - count for item, count in exact.items()]
+    assert min(errors) >= 0
+    over = sum(error > sketch.error_bound for error in errors)
+    print(f"{len(exact)} distinct, bound {sketch.error_bound:.0f}, "
+          f"max error {max(errors)}, over bound {over}")
+    assert over <= 0.01 * len(exact)
+
+    assert [item for item, _ in sketch.top(10)] == [item for item, _ in exact.most_common(10)]
+    assert len(sketch.heavy) <= 2 * sketch.top_k
+    assert sketch.estimate('never seen') <= sketch.error_bound
+
+    sketch.add('concept1', 5)
+    assert sketch.estimate('concept1') >= exact['concept1'] + 5
+
+
+def test_merge_is_lossless():
+    stream = zipf_stream(60000, seed=1)
+    whole = ConceptSketch(top_k=30)
+    whole.update(stream)
+
+    shards = [ConceptSketch(top_k=30) for _ in range(4)]
+    for i, shard in enumerate(shards):
+        for j in range(i * 15000, (i + 1) * 15000, 1000):
+            shard.update(stream[j:j + 1000])
+    merged = shards[0]
+    for shard in shards[1:]:
+        merged.merge(shard)
+
+    assert np.array_equal(merged.table, whole.table)
+    assert merged.total == whole.total
+    assert merged.top(15) == whole.top(15)
+
+    for other in (ConceptSketch(epsilon=0.01), ConceptSketch(seed=1)):
+        try:
+            merged.merge(other)
+            assert False, "incompatible sketches merged"
+        except ValueError:
+            pass
+
+
+def test_worker_shards():
+    texts = load_texts()
+    expected = ConceptSketch.from_notes(texts)
+    processor = NoteProcessor()
+    exact = Counter(concept for text in texts for concept in processor.extract_concepts(text))
+
+    shards = [texts[i::3] for i in range(3)]
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        sketches = list(pool.map(ConceptSketch.from_notes, shards))
+    merged = sketches[0]
+    for sketch in sketches[1:]:
+        merged.merge(sketch)
+
+    assert np.array_equal(merged.table, expected.table)
+    assert merged.top(10) == expected.top(10)
+    for concept, count in merged.top(10):
+        assert count >= exact[concept]
+
+
+def test_save_load():
+    sketch = ConceptSketch(epsilon=0.01, delta=0.05, top_k=5, seed=7)
+    sketch.update(zipf_stream(5000, seed=2))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sketches', 'course.npz')
+        sketch.save(path)
+        loaded = ConceptSketch.load(path)
+    assert (loaded.epsilon, loaded.delta, loaded.top_k, loaded.seed) == (0.01, 0.05, 5, 7)
+    assert np.array_equal(loaded.table, sketch.table) and loaded.total == sketch.total
+    assert loaded.top() == sketch.top()
+    loaded.merge(sketch)
+    assert loaded.total == 2 * sketch.total
+
+
+if __name__ == "__main__":
+    test_error_bounds()
+    test_merge_is_lossless()
+    test_worker_shards()
+    test_save_load()
+    print("✅ Concept sketch OK")
@@ -0,0 +1,112 @@
+"""
+Test: text_reference results hold a source path instead of the note,
+read the original text back on demand (and refuse a file changed since),
+format exactly like inline results, and travel through pickle, JSON and
+the process pool without the text; plain note ids keep the text inline
+"""
+
+import glob
+import io
+import json
+import os
+import pickle
+import shutil
+import tempfile
+
+from src.note_processor import batch
+from src.note_processor.basic_processor import BasicNoteProcessor
+from src.note_processor.reports import write_report
+from src.note_processor.source_text import StructuredNote
+
+
+def copy_notes(tmp):
+    paths = []
+    for path in sorted(glob.glob('data/research_dataset/notes/*.txt')):
+        paths.append(shutil.copy(path, os.path.join(tmp, os.path.basename(path))))
+    return paths
+
+
+def read(path):
+    with open(path, 'r') as f:
+        return f.read()
+
+
+def test_reference_results():
+    inline, referencing = BasicNoteProcessor(), BasicNoteProcessor(text_reference=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in copy_notes(tmp):
+            text = read(path)
+            expected = inline.structure_note(text)
+            result = referencing.structure_note(text, source=path)
+            assert isinstance(result, StructuredNote)
+            assert 'original_text' not in result and result['source'] == path
+            assert result['original_text'] == result.get('original_text') == text
+            assert dict(result, original_text=text, source=None, source_sha256=None) == \
+                dict(expected, source=None, source_sha256=None)
+            assert referencing.format_structured_note(result) == \
+                inline.format_structured_note(expected)
+            assert referencing.structure_note(None, source=path) == result
+
+            restored = pickle.loads(pickle.dumps(result))
+            assert type(restored) is StructuredNote and restored == result
+            assert len(pickle.dumps(result)) < len(pickle.dumps(expected)) - len(text) // 2
+
+        # Without a source there is nothing to refer to
+        assert 'original_text' in referencing.structure_note("A cell is a unit of life.")
+        assert result.get('missing', 0) == 0
+        try:
+            StructuredNote(word_count=1)['original_text']
+            assert False, "no text and no source"
+        except KeyError:
+            pass
+
+        # An edited source is detected, not read back as the note
+        with open(path, 'a') as f:
+            f.write("\nAn edit made after structuring.")
+        for read_back in (lambda: result['original_text'], lambda: result.get('original_text'),
+                          lambda: referencing.format_structured_note(result)):
+            try:
+                read_back()
+                assert False, "changed source read back"
+            except ValueError:
+                pass
+
+
+def test_batch_and_reports():
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = copy_notes(tmp)
+        inline = dict(batch.structure_notes(BasicNoteProcessor,
+                                            ((path, read(path)) for path in paths), workers=1))
+        for workers in (1, 2):
+            results = list(batch.structure_notes(
+                BasicNoteProcessor, ((path, None) for path in paths),
+                {'text_reference': True}, workers=workers, chunksize=4, sources=True))
+            assert [path for path, _ in results] == paths
+            for path, result in results:
+                assert type(result) is StructuredNote and result['source'] == path
+                assert result['original_text'] == inline[path]['original_text']
+
+        markdown, expected = io.StringIO(), io.StringIO()
+        write_report(results, markdown, max_original=80)
+        write_report(((path, inline[path]) for path in paths), expected, max_original=80)
+        assert markdown.getvalue() == expected.getvalue()
+
+        sink = io.StringIO()
+        write_report(results[:1], sink, fmt='jsonl')
+        record = json.loads(sink.getvalue())
+        assert record['source'] == paths[0] and 'original_text' not in record
+
+    # Ids that are not paths: the text stays in the result
+    texts = {os.path.basename(path)[:-4]: read(path)
+             for path in glob.glob('data/research_dataset/notes/*.txt')}
+    for workers in (1, 2):
+        for note_id, result in batch.structure_notes(
+                BasicNoteProcessor, texts.items(), {'text_reference': True}, workers=workers):
+            assert type(result) is dict and 'source' not in result
+            assert result['original_text'] == texts[note_id]
+
+
+if __name__ == "__main__":
+    test_reference_results()
+    test_batch_and_reports()
+    print("✅ Reference-only original text OK")
@@ -0,0 +1,98 @@
+"""
+Test: span-mode results read back exactly as the default string results,
+and their offsets point at the matched text in the note
+"""
+
+import glob
+import tracemalloc
+
+from src.note_processor.unified_processor import UnifiedProcessor
+from src.note_processor.final_processor import NoteProcessor
+from src.note_processor.spans import DefinitionSpan, TextSpan, strip_span
+
+
+def load_notes():
+    notes = []
+    for path in sorted(glob.glob('data/research_dataset/notes/*.txt')):
+        with open(path, 'r') as f:
+            notes.append((path.split('/')[-1][:-4], f.read()))
+    return notes
+
+
+def test_strip_span():
+    for text in ["", "   ", " a ", "\tab c\n", "abc"]:
+        start, end = strip_span(text, 0, len(text))
+        assert text[start:end] == text.strip()
+
+
+def test_definition_spans_match_dicts():
+    notes = load_notes()
+    for engine in ('classic', 'fused'):
+        plain = UnifiedProcessor(engine=engine)
+        spans = UnifiedProcessor(engine=engine, spans=True)
+        for _, text in notes:
+            expected = plain.extract_definitions(text)
+            found = spans.extract_definitions(text)
+            assert all(isinstance(d, DefinitionSpan) for d in found)
+            assert [d.as_dict() for d in found] == expected
+            assert [dict(d) for d in found] == expected
+            for d in found:
+                assert d['term'] == d.term and d.get('missing') is None
+                start, end = d.definition_span
+                assert text[start:end] == d.definition
+                start, end = d.term_span
+                assert text[start:end].lower() == d.term.lower()
+
+
+def test_example_spans_match_strings():
+    plain = NoteProcessor()
+    spans = NoteProcessor(spans=True)
+    for _, text in load_notes():
+        expected = plain.extract_examples(text)
+        found = spans.extract_examples(text)
+        assert all(isinstance(e, TextSpan) for e in found)
+        assert [str(e) for e in found] == expected
+        assert found == expected
+        assert all(text[e.start:e.end] == e for e in found)
+    assert spans.format_output(spans.process(text)) == plain.format_output(plain.process(text))
+
+
+def test_spans_with_budget_profile_and_batch():
+    notes = load_notes()
+    expected = [UnifiedProcessor().extract_definitions(text) for _, text in notes]
+
+    profiled = UnifiedProcessor(spans=True, profile=True, time_budget=60)
+    assert [[d.as_dict() for d in profiled.extract_definitions(text)]
+            for _, text in notes] == expected
+    assert sum(s.accepted for s in profiled.profile.patterns.values()) == \
+        sum(len(e) for e in expected)
+
+    # Spans survive the trip back from worker processes
+    pooled = UnifiedProcessor(spans=True).structure_notes(notes, workers=2, chunksize=8)
+    assert [[d.as_dict() for d in result['definitions']] for _, result in pooled] == expected
+
+
+def test_spans_use_less_memory():
+    texts = [text for _, text in load_notes()]
+
+    def retained(processor):
+        tracemalloc.start()
+        results = [processor.extract_definitions(text) for text in texts]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del results
+        return size
+
+    as_dicts = retained(UnifiedProcessor())
+    as_spans = retained(UnifiedProcessor(spans=True))
+    print(f"Retained: dicts {as_dicts / 1024:.0f} KB, spans {as_spans / 1024:.0f} KB")
+    assert as_spans < as_dicts
+
+
+if __name__ == "__main__":
+    test_strip_span()
+    test_definition_spans_match_dicts()
+    test_example_spans_match_strings()
+    test_spans_with_budget_profile_and_batch()
+    test_spans_use_less_memory()
+    print("✅ Span results OK")
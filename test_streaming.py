@@ -0,0 +1,130 @@
+"""
+Test: streaming extraction finds what whole-text extraction finds, keeps
+the same definition of each term, emits a segment's definitions in text
+order, and has peak memory independent of file size
+"""
+
+import glob
+import io
+import os
+import tempfile
+import tracemalloc
+from collections import Counter
+
+from src.note_processor.streaming import StreamingExtractor, CONCEPT_WORD
+from src.note_processor.unified_processor import UnifiedProcessor
+from src.note_processor.final_processor import NoteProcessor
+
+
+def load_corpus():
+    texts = []
+    for path in sorted(glob.glob('data/research_dataset/notes/*.txt')):
+        with open(path, 'r') as f:
+            texts.append(f.read())
+    return '\n'.join(texts)
+
+
+def latest(definitions, processor):
+    """normalized term -> the last definition emitted for it."""
+    return {processor._normalize_term(d['term']): d for d in definitions}
+
+
+def collect(events):
+    definitions, examples, concepts = [], [], Counter()
+    for kind, value in events:
+        if kind == 'definition':
+            definitions.append(value)
+        elif kind == 'example':
+            examples.append(value)
+        else:
+            concepts.update(value)
+    return definitions, examples, concepts
+
+
+def test_streaming_matches_whole_text():
+    corpus = load_corpus()
+    unified = UnifiedProcessor()
+    notes = NoteProcessor()
+
+    expected = latest(unified.extract_definitions(corpus), unified)
+    expected_examples = notes.extract_examples(corpus)
+    expected_concepts = Counter(w for w in CONCEPT_WORD.findall(corpus.lower())
+                                if w not in notes.stop_words)
+
+    # Chunks much smaller than the corpus force many boundaries
+    for chunk_size, overlap in [(700, 100), (2000, 500), (1 << 20, 8192)]:
+        extractor = StreamingExtractor(chunk_size=chunk_size, overlap=overlap)
+        definitions, examples, concepts = collect(extractor.stream(io.StringIO(corpus)))
+
+        assert latest(definitions, unified) == expected
+        assert examples == expected_examples
+        assert concepts == expected_concepts
+
+
+def test_streaming_memory_is_bounded():
+    corpus = load_corpus()
+    extractor = StreamingExtractor(chunk_size=64 * 1024, overlap=4096)
+    peaks = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for copies in (8, 32):
+            path = os.path.join(tmp, f'textbook_{copies}.txt')
+            with open(path, 'w') as f:
+                for _ in range(copies):
+                    f.write(corpus + '\n')
+
+            tracemalloc.start()
+            for _ in extractor.stream_file(path):
+                pass
+            peaks[copies] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"  {os.path.getsize(path) / 1e6:.1f} MB file: peak {peaks[copies] / 1e6:.2f} MB")
+
+    # 4x the file size, roughly the same peak
+    assert peaks[32] < peaks[8] * 1.5
+
+
+def test_streaming_unpunctuated_single_line():
+    # OCR dump: one long line without a newline anywhere
+    line = ' '.join(['Mitochondria are the powerhouse of the cell'] * 5000)
+    extractor = StreamingExtractor(chunk_size=8192, overlap=1024)
+    definitions, _, concepts = collect(extractor.stream(io.StringIO(line)))
+    assert [d['term'] for d in definitions] == ['Mitochondria']
+    assert concepts['powerhouse'] == 5000
+
+
+def test_same_definition_across_segments():
+    unified = UnifiedProcessor()
+    filler = "Plain sentence without any terms in it at all.\n" * 40
+    # "Chromosomes:" (colon) comes first in the text, but "Chromosomes are"
+    # (is_are) is earlier in the pattern table, so whole-text extraction keeps it
+    note = ("Chromosomes: structures made of DNA and proteins\n" + filler
+            + "Chromosomes are thread-like structures made of DNA and proteins.\n"
+            + "Osmosis: movement of water across a membrane\n")
+    expected = unified.extract_definitions(note)
+    assert [d['pattern'] for d in expected if d['term'] == 'Chromosomes'] == ['is_are']
+
+    extractor = StreamingExtractor(chunk_size=600, overlap=100)
+    definitions, _, _ = collect(extractor.stream(io.StringIO(note)))
+    assert [d['pattern'] for d in definitions] == ['colon', 'is_are', 'colon']
+    assert latest(definitions, unified) == latest(expected, unified)
+
+
+def test_segment_in_text_order():
+    note = ("Membrane transport\n"
+            "Osmosis: movement of water across a membrane\n"
+            "Diffusion is the spread of particles from high to low concentration.\n"
+            "Mitosis: division of a cell into two identical cells\n")
+    extractor = StreamingExtractor(chunk_size=1000, overlap=10)
+    definitions, _, _ = collect(extractor.stream(io.StringIO(note)))
+    # Whole-text extraction lists them in pattern order instead
+    assert [d['term'] for d in definitions] == ['Osmosis', 'Diffusion', 'Mitosis']
+
+
+if __name__ == "__main__":
+    test_streaming_matches_whole_text()
+    test_same_definition_across_segments()
+    test_segment_in_text_order()
+    test_streaming_memory_is_bounded()
+    test_streaming_unpunctuated_single_line()
+    print("✅ Streaming extraction OK")
@@ -0,0 +1,111 @@
+"""
+Test: the concept index updates incrementally exactly like a rebuild,
+survives save/load, and pushes corpus-wide words down the ranking
+"""
+
+import glob
+import os
+import tempfile
+
+import numpy as np
+
+from src.note_processor.final_processor import NoteProcessor
+from src.note_processor.basic_processor import BasicNoteProcessor
+from src.note_processor.tfidf import ConceptIndex, top_indices
+
+
+def load_notes():
+    notes = []
+    for path in sorted(glob.glob('data/research_dataset/notes/*.txt')):
+        with open(path, 'r') as f:
+            notes.append((os.path.basename(path)[:-4], f.read()))
+    return notes
+
+
+def build(notes):
+    index = ConceptIndex()
+    for note_id, text in notes:
+        index.add(note_id, text)
+    return index
+
+
+def same_counts(a, b):
+    return (sorted(a.notes) == sorted(b.notes)
+            and all(a.df[a.vocabulary[t]] == b.df[b.vocabulary[t]] for t in b.terms
+                    if b.df[b.vocabulary[t]])
+            and not any(a.df[a.vocabulary[t]] for t in a.terms if t not in b.vocabulary))
+
+
+def test_incremental_updates_match_rebuild():
+    notes = load_notes()
+    index = build(notes)
+    texts = [text for _, text in notes]
+
+    # Remove half, edit one, re-add: same as building the survivors from scratch
+    for note_id, _ in notes[::2]:
+        index.remove(note_id)
+    index.add(notes[1][0], notes[1][1] + "\nOsmosis moves water. Osmosis needs a membrane.")
+    survivors = [(note_id, text) for note_id, text in notes[1::2]]
+    survivors[0] = (notes[1][0], notes[1][1] + "\nOsmosis moves water. Osmosis needs a membrane.")
+    rebuilt = build(survivors)
+    assert len(index) == len(rebuilt) == len(survivors)
+    assert same_counts(index, rebuilt)
+    assert index.rank_notes(texts, 8) == rebuilt.rank_notes(texts, 8)
+
+    try:
+        index.remove('no_such_note')
+        assert False, "unknown note removed"
+    except KeyError:
+        pass
+
+
+def test_save_load():
+    notes = load_notes()
+    index = build(notes)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'index', 'concepts.npz')
+        index.save(path)
+        loaded = ConceptIndex.load(path)
+        ConceptIndex().save(os.path.join(tmp, 'empty.npz'))
+        assert len(ConceptIndex.load(os.path.join(tmp, 'empty.npz'))) == 0
+    assert same_counts(loaded, index) and same_counts(index, loaded)
+    texts = [text for _, text in notes]
+    assert loaded.rank_notes(texts) == index.rank_notes(texts)
+    loaded.add('extra', "Chemiosmosis drives ATP synthase.")
+    assert 'extra' in loaded and len(loaded) == len(notes) + 1
+
+
+def test_ranking():
+    notes = load_notes()
+    index = build(notes)
+    texts = [text for _, text in notes]
+    ranked = index.rank_notes(texts, 10)
+    assert ranked == [index.rank(text, 10) for text in texts]
+    assert all(len(concepts) == 10 for concepts in ranked)
+
+    # A word in every note ranks below the note's own subject
+    common = "Overview of the topic. "
+    index = build([(note_id, common * 3 + text) for note_id, text in notes])
+    for text in texts[:8]:
+        assert 'Overview' not in index.rank(common * 3 + text, 5)
+    assert index.rank("", 5) == [] and index.rank(texts[0], 0) == []
+
+    # Terms the index has never seen rank as the rarest
+    assert index.rank("Zymogen zymogen zymogen. Cells cells cells.", 1) == ['Zymogen']
+
+    # Ties keep the order of first occurrence
+    scores = np.array([1.0, 3.0, 2.0, 3.0, 2.0])
+    assert top_indices(scores, 3).tolist() == [1, 3, 2]
+    assert top_indices(scores, 9).tolist() == [1, 3, 2, 4, 0]
+
+    # Processors rank against the index when given one
+    assert NoteProcessor(concept_index=index).extract_concepts(texts[0], 5) == index.rank(texts[0], 5)
+    basic = BasicNoteProcessor(concept_index=index).extract_key_concepts(texts[0], 5)
+    assert basic == [concept.lower() for concept in index.rank(texts[0], 5)]
+
+
+if __name__ == "__main__":
+    test_incremental_updates_match_rebuild()
+    test_save_load()
+    test_ranking()
+    print("✅ TF-IDF concept index OK")
@@ -0,0 +1,96 @@
+"""
+Test: token-class lookups give the same verdicts as the word-set checks
+they replace, follow reassigned word sets, and refuse in-place changes
+"""
+
+import glob
+
+from src.note_processor.unified_processor import UnifiedProcessor
+from src.note_processor.final_processor import NoteProcessor
+from src.note_processor.definition_patterns import MULTIWORD_SKIP_WORDS
+from src.note_processor import token_classes
+from src.note_processor.token_classes import PRONOUN, SKIP_WORD, STOP_WORD, TokenClasses
+
+
+def load_texts():
+    texts = []
+    for path in sorted(glob.glob('data/research_dataset/notes/*.txt')):
+        with open(path, 'r') as f:
+            texts.append(f.read())
+    return texts
+
+
+def test_classes_match_word_sets():
+    processor = UnifiedProcessor()
+    classes = processor.token_classes
+    terms = [found[0] for text in load_texts()
+             for _, matches in processor._scan(text) for found in matches]
+    terms += ['This Cell', 'The Main Idea', 'Key Terms', 'Bastille Day', 'It', '']
+    for term in terms:
+        words = term.lower().split()
+        assert classes.any(term, PRONOUN) == any(w in processor.pronouns for w in words)
+        skip = processor.pronouns | MULTIWORD_SKIP_WORDS
+        assert classes.any(term, PRONOUN | SKIP_WORD) == any(w in skip for w in words)
+
+    notes = NoteProcessor()
+    for word in ['The', 'They', 'Protein', 'Which', 'Such', 'Cell']:
+        expected = word.lower() in notes.pronouns or word.lower() in notes.stop_words
+        assert bool(notes.token_classes[word] & (PRONOUN | STOP_WORD)) == expected
+
+
+def test_reassigned_word_sets():
+    processor = UnifiedProcessor()
+    text = "Membrane Proteins are the gatekeepers of every living cell."
+    assert processor.extract_definitions(text)
+    processor.pronouns = processor.pronouns | {'membrane'}
+    assert processor.extract_definitions(text) == []
+
+    notes = NoteProcessor()
+    text = "Mitochondria produce energy. Mitochondria divide. Mitochondria move."
+    assert 'Mitochondria' in notes.extract_concepts(text)
+    notes.stop_words = notes.stop_words | {'mitochondria'}
+    assert 'Mitochondria' not in notes.extract_concepts(text)
+
+
+def test_in_place_changes_fail():
+    processor = UnifiedProcessor()
+    text = "Cell Walls are rigid layers around plant cells."
+    definitions = processor.extract_definitions(text)
+    assert definitions
+    try:
+        processor.pronouns.add('cell')
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("in-place change to a frozen word set")
+    assert processor.extract_definitions(text) == definitions
+
+    notes = NoteProcessor()
+    notes.extract_concepts(text)
+    for words in (notes.stop_words, notes.pronouns):
+        try:
+            words.update({'cell'})
+        except AttributeError:
+            continue
+        raise AssertionError("in-place change to a frozen word set")
+
+
+def test_memo_is_bounded():
+    classes = TokenClasses(pronouns={'it'})
+    limit = token_classes.MAX_TOKENS
+    token_classes.MAX_TOKENS = 8
+    try:
+        for i in range(20):
+            assert classes[f'word{i}'] == 0
+            assert len(classes) <= 8
+        assert classes['It'] == PRONOUN
+    finally:
+        token_classes.MAX_TOKENS = limit
+
+
+if __name__ == "__main__":
+    test_classes_match_word_sets()
+    test_reassigned_word_sets()
+    test_in_place_changes_fail()
+    test_memo_is_bounded()
+    print("✅ Token classes OK")
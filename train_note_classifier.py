@@ -0,0 +1,85 @@
+"""
+Training: hashed-feature linear classifier for template selection
+Trains LinearNoteClassifier on the research dataset, reports its
+cross-validated accuracy and batch throughput next to the keyword
+classifier it would replace, and saves the model for
+BasicNoteProcessor(note_classifier=...).
+
+--target domain (the default) learns the dataset's annotated domains;
+the baseline is domain_routing.DomainClassifier. --target note_type
+learns template types; the dataset has no annotated note types, so the
+labels are the keyword classifier's own (weak labels) and accuracy is
+agreement with it. A note-type model is only saved when it agrees with
+the keyword classifier as well as the classifier agrees with itself, so
+BasicNoteProcessor never loads a model worse than the rules it replaces.
+Each target has its own default output, and only the note-type model can
+be given to BasicNoteProcessor.
+
+Usage:
+    python train_note_classifier.py [--target domain|note_type] [--folds 5]
+        [--output database/domain_classifier.npz]
+"""
+
+import argparse
+import sys
+
+from src.note_processor.basic_processor import BasicNoteProcessor
+from src.note_processor.domain_routing import DomainClassifier, domain_from_note_id, load_dataset
+from src.note_processor.note_classifier import (DEFAULT_PATH, DOMAIN_PATH, LinearNoteClassifier,
+                                                evaluate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--target', choices=('domain', 'note_type'), default='domain')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--copies', type=int, default=100,
+                        help="throughput is timed on the dataset repeated this many times")
+    parser.add_argument('--max-iter', type=int, default=1000)
+    parser.add_argument('--output', help=f"default: {DEFAULT_PATH}, or {DOMAIN_PATH} for domains")
+    args = parser.parse_args()
+    if args.output is None:
+        args.output = DOMAIN_PATH if args.target == 'domain' else DEFAULT_PATH
+
+    notes = load_dataset()
+    texts = [text for _, text, _ in notes]
+    if args.target == 'domain':
+        labels = [domain_from_note_id(note_id) for note_id, _, _ in notes]
+        keywords = DomainClassifier()
+        baseline = lambda batch: [keywords.classify(text) for text in batch]
+    else:
+        processor = BasicNoteProcessor()
+        labels = processor.identify_note_types(texts)
+        baseline = processor.identify_note_types
+
+    report = evaluate(texts, labels, baseline, folds=args.folds, copies=args.copies,
+                      max_iter=args.max_iter)
+    save = args.target == 'domain' or report['accuracy'] >= report['baseline_accuracy']
+    if save:
+        LinearNoteClassifier().fit(texts, labels, max_iter=args.max_iter).save(args.output)
+
+    print("=" * 70)
+    print(f"NOTE CLASSIFIER: {args.target} ({len(notes)} notes, {len(set(labels))} labels)")
+    print("=" * 70)
+    print(f"{'':<22}{'accuracy':>12}{'notes/min':>14}")
+    print(f"{'hashed linear':<22}{report['accuracy']:>12.1%}{report['notes_per_minute']:>14,.0f}")
+    print(f"{'keyword baseline':<22}{report['baseline_accuracy']:>12.1%}"
+          f"{report['baseline_notes_per_minute']:>14,.0f}")
+    if report['baseline_unsure']:
+        print(f"  (baseline unsure on {report['baseline_unsure']} notes)")
+    if args.target == 'note_type':
+        print("  (no annotated note types: labels are the keyword classifier's)")
+    print(f"\nAccuracy: {args.folds}-fold cross-validation; "
+          f"throughput: {len(texts) * args.copies} notes per batch")
+    if not save:
+        print(f"Not saved: the model scores below the keyword baseline, "
+              f"{args.output} is left as it was")
+        print("=" * 70)
+        return 1
+    print(f"Saved {args.output} (loads in {report['load_ms']:.1f} ms)")
+    print("=" * 70)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())